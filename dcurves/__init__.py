@@ -14,7 +14,14 @@ __version__ = "1.0.6.4"
 
 
 from dcurves import load_test_data
-from dcurves.dca import dca
+from dcurves.dca import dca, dca_iter
+from dcurves.counts import dca_from_counts
+from dcurves.streaming import dca_stream, DCAAccumulator
+from dcurves.external import dca_external
+from dcurves.subsample import dca_progressive
+from dcurves.sketch import DCASketch
+from dcurves.fused import DCAPlan
+from dcurves.result import DCAResult
 from dcurves.plot_graphs import plot_graphs
 import os
 
@@ -0,0 +1,119 @@
+"""
+This module houses the array kernels used to turn true and false positive rates
+into net benefit and net interventions avoided over a (models x thresholds)
+block, writing into preallocated buffers when given.
+
+Behavior at the ends of the threshold grid is defined as follows. At threshold
+0 the odds are 0, so net benefit is tp_rate - harm, and net interventions
+avoided, a division by 0, is undefined and NaN for every model (the R package
+gives +inf or -inf where a model's net benefit differs from that of 'all'). At
+threshold 1 the odds are infinite, and odds * fp_rate is taken as 0 wherever
+fp_rate is 0, so a model without false positives keeps a finite net benefit.
+No runtime warnings are raised.
+"""
+
+from typing import Iterable, Optional, Union
+import numpy as np
+
+
+def _calc_threshold_odds(thresholds: Iterable) -> np.ndarray:
+    """
+    Calculate the odds of each threshold value, t / (1 - t), once for a grid.
+
+    Parameters
+    ----------
+    thresholds : Iterable
+        Threshold values (x values)
+
+    Returns
+    -------
+    np.ndarray
+        Threshold odds, inf at threshold 1
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    with np.errstate(divide="ignore"):
+        return thresholds / (1 - thresholds)
+
+
+def _calc_net_benefit(
+    tp_rate: np.ndarray,
+    fp_rate: np.ndarray,
+    harm: Union[np.ndarray, float],
+    odds: np.ndarray,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Calculate net benefit, tp_rate - odds * fp_rate - harm, for a block of
+    models and threshold values.
+
+    Parameters
+    ----------
+    tp_rate : np.ndarray
+        True positive rates of shape (models, thresholds)
+    fp_rate : np.ndarray
+        False positive rates of shape (models, thresholds)
+    harm : np.ndarray or float
+        Harm values broadcastable to (models, thresholds)
+    odds : np.ndarray
+        Threshold odds from _calc_threshold_odds
+    out : np.ndarray
+        Preallocated float64 buffer of shape (models, thresholds) to write into
+
+    Returns
+    -------
+    np.ndarray
+        Net benefit of shape (models, thresholds), out when given
+    """
+
+    fp_rate = np.asarray(fp_rate, dtype=float)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(fp_rate.shape, np.shape(odds)))
+
+    out.fill(0)
+    np.multiply(odds, fp_rate, out=out, where=fp_rate != 0)
+    np.subtract(tp_rate, out, out=out)
+    np.subtract(out, harm, out=out)
+
+    return out
+
+
+def _calc_net_intervention_avoided(
+    net_benefit: np.ndarray,
+    net_benefit_all: np.ndarray,
+    odds: np.ndarray,
+    nper: Union[int, float] = 1,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Calculate net interventions avoided, (net_benefit - net_benefit_all) / odds
+    * nper, subtracting the 'all' reference by broadcasting.
+
+    Parameters
+    ----------
+    net_benefit : np.ndarray
+        Net benefit of shape (models, thresholds)
+    net_benefit_all : np.ndarray
+        Net benefit of the 'all' reference, one value per threshold value
+    odds : np.ndarray
+        Threshold odds from _calc_threshold_odds
+    nper : int or float
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    out : np.ndarray
+        Preallocated float64 buffer of shape (models, thresholds) to write into
+
+    Returns
+    -------
+    np.ndarray
+        Net interventions avoided of shape (models, thresholds), out when given;
+        NaN at threshold 0, where it is undefined
+    """
+
+    with np.errstate(invalid="ignore"):
+        out = np.subtract(net_benefit, net_benefit_all, out=out)
+        np.divide(out, odds, out=out, where=odds != 0)
+        np.multiply(out, nper, out=out)
+    np.copyto(out, np.nan, where=odds == 0)
+
+    return out
@@ -0,0 +1,281 @@
+"""
+This module houses the dataframe backends: the functions used to read the
+columns a decision curve analysis needs from each supported kind of input data
+(a pd.DataFrame with NumPy or Arrow-backed columns, a mapping of column names
+to 1-D arrays, a NumPy structured array, a pyarrow Table, or a Polars
+DataFrame/LazyFrame) and to return results in the caller's frame type. Columns
+are taken as views of the caller's arrays wherever their memory layout allows,
+so wrapping them costs no copy, and a Polars LazyFrame only materializes the
+selected columns. pyarrow and polars are only imported when their data is
+passed.
+"""
+
+import functools
+from typing import Callable, Mapping
+import numpy as np
+import pandas as pd
+
+# Kinds of input data, as identified by _input_backend
+BACKENDS = ["pandas", "mapping", "numpy", "arrow", "polars"]
+
+
+def _comes_from(data, package: str) -> bool:
+    """
+    Check whether an object comes from a package, without importing it.
+
+    Parameters
+    ----------
+    data
+        Any object
+    package : str
+        Top-level package name, e.g. 'pyarrow'
+
+    Returns
+    -------
+    bool
+        Whether the object's type is defined in the package
+    """
+
+    return type(data).__module__.split(".")[0] == package
+
+
+def _is_arrow(data) -> bool:
+    """
+    Check whether an object comes from pyarrow, without importing it.
+
+    Parameters
+    ----------
+    data
+        Any object
+
+    Returns
+    -------
+    bool
+        Whether the object's type is defined in pyarrow
+    """
+
+    return _comes_from(data, "pyarrow")
+
+
+def _input_backend(data) -> str:
+    """
+    Identify the kind of input data.
+
+    Parameters
+    ----------
+    data : pd.DataFrame, Mapping, np.ndarray, pyarrow.Table or polars.DataFrame
+        Input data
+
+    Returns
+    -------
+    str
+        One of BACKENDS
+    """
+
+    if isinstance(data, pd.DataFrame):
+        return "pandas"
+    if isinstance(data, Mapping):
+        return "mapping"
+    if isinstance(data, np.ndarray) and data.dtype.names is not None:
+        return "numpy"
+    if _is_arrow(data) and hasattr(data, "column_names"):
+        return "arrow"
+    if _comes_from(data, "polars") and hasattr(data, "collect_schema"):
+        return "polars"
+    raise ValueError(
+        "data must be a pd.DataFrame, a mapping of column names to arrays, "
+        "a NumPy structured array, a pyarrow Table or a Polars DataFrame/LazyFrame"
+    )
+
+
+def _arrow_to_numpy(arrow_array) -> np.ndarray:
+    """
+    Convert a pyarrow Array or ChunkedArray to a NumPy array, as a view of the
+    Arrow buffer for a single chunk of numbers without nulls. Other columns
+    (several chunks, nulls, booleans, which Arrow stores as bits) are converted.
+
+    Parameters
+    ----------
+    arrow_array : pyarrow.Array or pyarrow.ChunkedArray
+        Arrow column
+
+    Returns
+    -------
+    np.ndarray
+        Column values; nulls become NaN (or None for non-numeric columns)
+    """
+
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    if isinstance(arrow_array, pa.ChunkedArray):
+        if arrow_array.num_chunks == 1:
+            arrow_array = arrow_array.chunk(0)
+        else:
+            arrow_array = arrow_array.combine_chunks()
+
+    try:
+        return arrow_array.to_numpy(zero_copy_only=True)
+    except pa.ArrowInvalid:
+        return arrow_array.to_numpy(zero_copy_only=False)
+
+
+def _as_column_array(values) -> np.ndarray:
+    """
+    Get a 1-D NumPy array from a column of input data, without copying NumPy
+    arrays or Series with NumPy dtypes.
+
+    Parameters
+    ----------
+    values
+        Column values: a NumPy array, pd.Series (NumPy or Arrow-backed), pyarrow
+        Array/ChunkedArray, or anything np.asarray accepts
+
+    Returns
+    -------
+    np.ndarray
+        1-D column values
+    """
+
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.ArrowDtype):
+        values = values.array.__arrow_array__()
+    if _is_arrow(values):
+        return _arrow_to_numpy(values)
+
+    values = np.asarray(values)
+    if values.ndim != 1:
+        raise ValueError("each column of data must be 1-dimensional")
+
+    return values
+
+
+def _column_names(data) -> list:
+    """
+    Get the column names of the input data.
+
+    Parameters
+    ----------
+    data : pd.DataFrame, Mapping, np.ndarray, pyarrow.Table or polars.DataFrame
+        Input data
+
+    Returns
+    -------
+    list[str]
+        Column names of data
+    """
+
+    backend = _input_backend(data)
+    if backend == "pandas":
+        return list(data.columns)
+    if backend == "mapping":
+        return list(data.keys())
+    if backend == "numpy":
+        return list(data.dtype.names)
+    if backend == "arrow":
+        return list(data.column_names)
+    return data.collect_schema().names()
+
+
+def _select_columns(data, columns: list) -> pd.DataFrame:
+    """
+    Build a pd.DataFrame of the given columns of the input data whose column
+    values are views of the caller's arrays wherever possible. A Polars
+    LazyFrame is collected with only these columns selected.
+
+    Parameters
+    ----------
+    data : pd.DataFrame, Mapping, np.ndarray, pyarrow.Table or polars.DataFrame
+        Input data: a pd.DataFrame, a mapping of column names to 1-D arrays, a
+        NumPy structured array, a pyarrow Table/RecordBatch, or a Polars
+        DataFrame/LazyFrame
+    columns : list[str]
+        Column names to select
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected columns, with the index of data when it is a pd.DataFrame
+    """
+
+    backend = _input_backend(data)
+    index = None
+    if backend == "pandas":
+        index = data.index
+        if not any(isinstance(dtype, pd.ArrowDtype) for dtype in data.dtypes):
+            # Columns of a NumPy-backed frame are views of its blocks
+            return pd.DataFrame(
+                {column: data[column] for column in columns}, index=index, copy=False
+            )
+
+    missing = [column for column in columns if column not in _column_names(data)]
+    if missing:
+        raise ValueError("columns not found in data: " + ", ".join(missing))
+
+    if backend == "polars":
+        # Project before collecting, so a LazyFrame reads only these columns
+        data = data.select(columns)
+        if hasattr(data, "collect"):
+            data = data.collect()
+        get_column = {
+            column: data.get_column(column).to_numpy() for column in columns
+        }.__getitem__
+    else:
+        get_column = data.column if backend == "arrow" else data.__getitem__
+
+    arrays = {column: _as_column_array(get_column(column)) for column in columns}
+    if len({len(values) for values in arrays.values()}) > 1:
+        raise ValueError("all columns of data must have the same length")
+
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def _to_input_frame(result, backend: str):
+    """
+    Convert a pd.DataFrame result to the frame type of the input data. Results
+    for Polars input become a polars.DataFrame; any other result is returned
+    unchanged.
+
+    Parameters
+    ----------
+    result
+        Result of an analysis, e.g. a pd.DataFrame or DCAResult
+    backend : str
+        Kind of input data, from _input_backend
+
+    Returns
+    -------
+    pd.DataFrame, polars.DataFrame or the result unchanged
+        Result in the caller's frame type
+    """
+
+    if backend != "polars" or not isinstance(result, pd.DataFrame):
+        return result
+
+    import polars as pl  # pylint: disable=import-outside-toplevel
+
+    return pl.DataFrame(
+        {column: result[column].to_numpy() for column in result.columns}
+    )
+
+
+def _returns_input_frame(function: Callable) -> Callable:
+    """
+    Wrap a function taking input data as its first argument (data) so that a
+    pd.DataFrame it returns comes back in the frame type of that data.
+
+    Parameters
+    ----------
+    function : Callable
+        Function such as dca()
+
+    Returns
+    -------
+    Callable
+        Wrapped function
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        data = kwargs["data"] if "data" in kwargs else args[0]
+        return _to_input_frame(function(*args, **kwargs), _input_backend(data))
+
+    return wrapper
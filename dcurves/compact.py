@@ -0,0 +1,302 @@
+"""
+This module houses the functions used to run binary DCA on a compact
+representation of the cohort: risk scores held as float32 or as uint16 indexes
+into the threshold grid, and outcomes held as bit-packed booleans.
+
+Tolerance versus the default float64 path:
+
+- 'quantized' stores each score as the index of its threshold bin, which is
+  all that is needed to compare it with the grid, so results are identical
+- 'float32' rounds each score to single precision (relative error at most
+  2 ** -24, about 6e-8) and compares it with the thresholds rounded the same
+  way. Rounding is monotone, so a score equal to a threshold value stays equal
+  to it, and scores of 0 and 1 are stored as the float32 values just outside
+  [0, 1]. Only a row whose score lies within rounding error of a different
+  threshold value can be counted on the other side of it, so each rate differs
+  from the float64 result by at most the share of such rows at that threshold
+"""
+
+import sys
+from typing import Iterable, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .engines import (
+    _calc_bin_counts_at_or_above,
+    _calc_rates_from_counts,
+    _calc_threshold_bins,
+)
+from .risks import _calc_binary_risks
+
+COMPACT_MODES = ["float32", "quantized"]
+
+# float32 stand-ins for risk scores of 0 and 1, which rectification moves to
+# 0 - e and 1 + e: 1 + e itself rounds to 1 in single precision
+FLOAT32_ZERO_SCORE = np.float32(0 - sys.float_info.epsilon)
+FLOAT32_ONE_SCORE = np.nextafter(np.float32(1), np.float32(2))
+
+# Rows processed per block; a multiple of 8 so blocks line up with packed bytes
+COMPACT_BLOCK_ROWS = 1 << 20
+
+
+def _pack_outcome(
+    outcome_values: pd.Series, weights: Optional[pd.Series] = None
+) -> Tuple[np.ndarray, np.ndarray, Union[int, float], Union[int, float]]:
+    """
+    Bit-pack the event and non-event indicators of an outcome column.
+
+    Parameters
+    ----------
+    outcome_values : pd.Series
+        Outcome of interest, one value per row
+    weights : pd.Series
+        Sample weights, one per row
+
+    Returns
+    -------
+    tuple
+        Packed (uint8) event and non-event masks, 8 rows per byte, followed by
+        the number (or total weight) of events and non-events
+    """
+
+    num_rows = len(outcome_values)
+    packed_events = np.empty((num_rows + 7) // 8, dtype=np.uint8)
+    packed_nonevents = np.empty((num_rows + 7) // 8, dtype=np.uint8)
+    num_events = 0
+    num_nonevents = 0
+
+    for start in range(0, num_rows, COMPACT_BLOCK_ROWS):
+        block = outcome_values.iloc[start : start + COMPACT_BLOCK_ROWS]
+        byte_slice = slice(start // 8, (start + len(block) + 7) // 8)
+        events = block.isin([True]).to_numpy()
+        nonevents = block.isin([False]).to_numpy()
+        packed_events[byte_slice] = np.packbits(events)
+        packed_nonevents[byte_slice] = np.packbits(nonevents)
+        if weights is None:
+            num_events += int(events.sum())
+            num_nonevents += int(nonevents.sum())
+        else:
+            block_weights = weights.iloc[start : start + len(block)].to_numpy(dtype=float)
+            num_events += float(block_weights[events].sum())
+            num_nonevents += float(block_weights[nonevents].sum())
+
+    return packed_events, packed_nonevents, num_events, num_nonevents
+
+
+def _unpack_outcome_block(packed: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """
+    Unpack the rows start:stop of a bit-packed outcome mask.
+
+    Parameters
+    ----------
+    packed : np.ndarray
+        Packed (uint8) outcome mask
+    start : int
+        First row, a multiple of 8
+    stop : int
+        Row after the last row
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask for the rows start:stop
+    """
+
+    return np.unpackbits(
+        packed[start // 8 : (stop + 7) // 8], count=stop - start
+    ).astype(bool)
+
+
+def _compact_scores(
+    scores: pd.Series, sorted_thresholds: np.ndarray, compact: str
+) -> np.ndarray:
+    """
+    Convert a model column to its compact representation. Risk scores of 0 and 1
+    are moved to 0 - e and 1 + e, as in _rectify_model_risk_boundaries (to
+    FLOAT32_ZERO_SCORE and FLOAT32_ONE_SCORE for 'float32').
+
+    Parameters
+    ----------
+    scores : pd.Series
+        Risk scores for a model column, one per row
+    sorted_thresholds : np.ndarray
+        Ascending threshold values
+    compact : str
+        Either 'float32' or 'quantized'
+
+    Returns
+    -------
+    np.ndarray
+        float32 risk scores, or uint16 threshold bins (0 for missing scores)
+    """
+
+    machine_epsilon = sys.float_info.epsilon
+    dtype = np.float32 if compact == "float32" else np.uint16
+    compacted = np.empty(len(scores), dtype=dtype)
+
+    for start in range(0, len(scores), COMPACT_BLOCK_ROWS):
+        block = scores.iloc[start : start + COMPACT_BLOCK_ROWS].to_numpy(dtype=float)
+        block_slice = slice(start, start + len(block))
+        if compact == "float32":
+            compacted[block_slice] = block
+            compacted[block_slice][block == 0] = FLOAT32_ZERO_SCORE
+            compacted[block_slice][block == 1] = FLOAT32_ONE_SCORE
+            continue
+        block = np.where(block == 0, 0 - machine_epsilon, block)
+        block = np.where(block == 1, 1 + machine_epsilon, block)
+        compacted[block_slice] = _calc_threshold_bins(block, sorted_thresholds)
+
+    return compacted
+
+
+def _calc_compact_counts(
+    compacted: np.ndarray,
+    packed_events: np.ndarray,
+    packed_nonevents: np.ndarray,
+    thresholds: np.ndarray,
+    weights: Optional[pd.Series] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate test positive, true positive and false positive counts per
+    threshold value from a compact model column, one block of rows at a time.
+
+    Parameters
+    ----------
+    compacted : np.ndarray
+        float32 risk scores or uint16 threshold bins, from _compact_scores
+    packed_events : np.ndarray
+        Packed (uint8) event mask
+    packed_nonevents : np.ndarray
+        Packed (uint8) non-event mask
+    thresholds : np.ndarray
+        Threshold values in the order supplied by the user
+    weights : pd.Series
+        Sample weights, one per row; counts become sums of weights
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Test positive, true positive and false positive counts (int64, or
+        float64 when weighted) for each threshold value
+    """
+
+    sorted_thresholds = np.sort(thresholds)
+    if compacted.dtype == np.float32:
+        # Round the grid like the scores, so ties between them stay exact
+        sorted_thresholds = sorted_thresholds.astype(np.float32)
+    bin_counts = np.zeros(
+        (3, len(thresholds) + 1), dtype=np.int64 if weights is None else float
+    )
+
+    for start in range(0, len(compacted), COMPACT_BLOCK_ROWS):
+        stop = min(start + COMPACT_BLOCK_ROWS, len(compacted))
+        bins = compacted[start:stop]
+        if bins.dtype == np.float32:
+            bins = _calc_threshold_bins(bins, sorted_thresholds)
+        block_weights = None
+        if weights is not None:
+            block_weights = weights.iloc[start:stop].to_numpy(dtype=float)
+        for i, mask in enumerate(
+            [
+                slice(None),
+                _unpack_outcome_block(packed_events, start, stop),
+                _unpack_outcome_block(packed_nonevents, start, stop),
+            ]
+        ):
+            bin_counts[i] += np.bincount(
+                bins[mask],
+                weights=None if block_weights is None else block_weights[mask],
+                minlength=len(thresholds) + 1,
+            )
+
+    test_pos, tp, fp = _calc_bin_counts_at_or_above(bin_counts, thresholds)
+    return test_pos, tp, fp
+
+
+def _calc_compact_rates(
+    data: pd.DataFrame,
+    outcome: str,
+    modelnames: list,
+    thresholds: Iterable,
+    compact: str,
+    models_to_prob: Optional[list] = None,
+    prevalence: Optional[Union[float, int]] = None,
+    weights: Optional[str] = None,
+) -> Tuple[np.ndarray, int, float]:
+    """
+    Calculate test positive, true positive and false positive rates per threshold
+    value for each model and the 'all'/'none' references in the binary DCA case,
+    holding the cohort in compact form.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Initial raw data ideally containing risk scores (scores ranging from 0
+        to 1), or else predictor/model values, and outcome of interest
+    outcome : str
+        Column name of outcome of interest in data
+    modelnames : list[str]
+        Column names from data that contain model risk scores or values
+    thresholds : Iterable
+        Threshold values (x values) at which rates will be calculated
+    compact : str
+        Either 'float32' or 'quantized'
+    models_to_prob : list[str]
+        Columns that need to be converted to risk scores from 0 to 1
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+    weights : str
+        Column name in data containing sample weights
+
+    Returns
+    -------
+    tuple
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and
+        'none', the number of rows and the prevalence value
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    sorted_thresholds = np.sort(thresholds)
+    if compact == "quantized" and len(thresholds) >= np.iinfo(np.uint16).max:
+        raise ValueError("compact='quantized' supports at most 65534 thresholds")
+
+    num_rows = len(data.index)
+    row_weights = None if weights is None else data[weights]
+    total_weight = num_rows if weights is None else float(row_weights.sum())
+    packed_events, packed_nonevents, num_events, num_nonevents = _pack_outcome(
+        data[outcome], weights=row_weights
+    )
+
+    prevalence_value = (
+        float(prevalence) if prevalence is not None else num_events / total_weight
+    )
+
+    counts = np.empty(
+        (3, len(modelnames), len(thresholds)),
+        dtype=np.int64 if weights is None else float,
+    )
+    for i, model in enumerate(modelnames):
+        scores = data[model]
+        if models_to_prob is not None and model in models_to_prob:
+            scores = pd.Series(
+                _calc_binary_risks(data=data, outcome=outcome, model=model),
+                copy=False,
+            )
+        counts[:, i] = _calc_compact_counts(
+            compacted=_compact_scores(scores, sorted_thresholds, compact),
+            packed_events=packed_events,
+            packed_nonevents=packed_nonevents,
+            thresholds=thresholds,
+            weights=row_weights,
+        )
+
+    rates = _calc_rates_from_counts(
+        model_counts=counts,
+        totals=(total_weight, num_events, num_nonevents),
+        thresholds=thresholds,
+        prevalence_value=prevalence_value,
+    )
+
+    return rates, num_rows, prevalence_value
@@ -0,0 +1,241 @@
+"""
+This module houses the functions used to run binary DCA on pre-aggregated
+frequency tables, where each row holds model risk scores together with the
+number of events and non-events sharing them, rather than on row-level data.
+"""
+
+import sys
+from typing import Iterable, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .engines import _calc_level_counts_matrix, _calc_rates_from_counts
+from .stats import _calc_distinct_thresholds, _calc_stats_from_rates
+
+
+def _check_count_table(
+    counts: pd.DataFrame, modelnames: list, events_col: str, nonevents_col: str
+) -> None:
+    """
+    Check that a frequency table has the columns needed for DCA and that its
+    event and non-event counts are valid.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame
+        Frequency table with model risk scores and event/non-event counts
+    modelnames : list[str]
+        Column names from counts that contain model risk scores
+    events_col : str
+        Column name in counts containing the number of events
+    nonevents_col : str
+        Column name in counts containing the number of non-events
+
+    Returns
+    -------
+    None
+    """
+
+    missing = [
+        col for col in modelnames + [events_col, nonevents_col]
+        if col not in counts.columns
+    ]
+    if missing:
+        raise ValueError("counts is missing columns: " + ", ".join(missing))
+
+    for col in [events_col, nonevents_col]:
+        col_counts = counts[col].to_numpy(dtype=float)
+        if np.isnan(col_counts).any() or (col_counts < 0).any():
+            raise ValueError(col + " must contain non-negative counts")
+
+
+def _calc_count_table_rates(
+    counts: pd.DataFrame,
+    modelnames: list,
+    thresholds: Iterable,
+    events_col: str = "n_events",
+    nonevents_col: str = "n_nonevents",
+    prevalence: Optional[Union[float, int]] = None,
+) -> Tuple[np.ndarray, Union[int, float], float]:
+    """
+    Calculate test positive, true positive and false positive rates per threshold
+    value for each model and the 'all'/'none' references from a frequency table.
+    Each model column is collapsed to its distinct risk scores, so the work done
+    scales with the number of distinct scores rather than the number of patients.
+    Risk scores of 0 and 1 are treated as in _rectify_model_risk_boundaries, and
+    missing scores are never test positive but still count towards the totals.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame
+        Frequency table with model risk scores and event/non-event counts
+    modelnames : list[str]
+        Column names from counts that contain model risk scores
+    thresholds : Iterable
+        Threshold values (x values) at which rates will be calculated
+    events_col : str
+        Column name in counts containing the number of events
+    nonevents_col : str
+        Column name in counts containing the number of non-events
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+
+    Returns
+    -------
+    tuple
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and
+        'none', the number of patients and the prevalence value
+    """
+
+    _check_count_table(
+        counts=counts,
+        modelnames=modelnames,
+        events_col=events_col,
+        nonevents_col=nonevents_col,
+    )
+
+    thresholds = list(thresholds)
+    event_counts = counts[events_col].to_numpy()
+    nonevent_counts = counts[nonevents_col].to_numpy()
+    num_events = event_counts.sum()
+    num_nonevents = nonevent_counts.sum()
+    num_patients = num_events + num_nonevents
+    if num_patients == 0:
+        raise ValueError("counts must contain at least one patient")
+
+    prevalence_value = (
+        float(prevalence) if prevalence is not None else float(num_events / num_patients)
+    )
+
+    machine_epsilon = sys.float_info.epsilon
+    level_tables = []
+    for model in modelnames:
+        scores = counts[model].to_numpy(dtype=float)
+        scores = np.where(scores == 0, 0 - machine_epsilon, scores)
+        scores = np.where(scores == 1, 1 + machine_epsilon, scores)
+        scored = ~np.isnan(scores)
+        levels, level_index = np.unique(scores[scored], return_inverse=True)
+        model_events = np.bincount(
+            level_index, weights=event_counts[scored], minlength=len(levels)
+        )
+        model_nonevents = np.bincount(
+            level_index, weights=nonevent_counts[scored], minlength=len(levels)
+        )
+        level_tables.append(
+            (levels, model_events + model_nonevents, model_events, model_nonevents)
+        )
+
+    model_counts = _calc_level_counts_matrix(level_tables, thresholds=thresholds)
+
+    rates = _calc_rates_from_counts(
+        model_counts=model_counts,
+        totals=(num_patients, num_events, num_nonevents),
+        thresholds=thresholds,
+        prevalence_value=prevalence_value,
+    )
+
+    return rates, num_patients, prevalence_value
+
+
+def dca_from_counts(
+    counts: pd.DataFrame,
+    modelnames: list,
+    thresholds: Union[Iterable, str] = [i / 100 for i in range(0, 100)],
+    events_col: str = "n_events",
+    nonevents_col: str = "n_nonevents",
+    harm: Optional[dict] = None,
+    prevalence: Optional[Union[float, int]] = None,
+    nper: Optional[int] = 1,
+) -> pd.DataFrame:
+    """
+    Perform binary decision curve analysis on a pre-aggregated frequency table
+    instead of row-level data. Each row of the table holds model risk scores
+    together with the number of events and non-events sharing those scores, so
+    memory scales with the number of distinct scores rather than patients.
+    Results are identical to running dca() on the equivalent row-level data.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame
+        Frequency table, e.g. with columns (score, n_events, n_nonevents), where
+        scores range from 0 to 1
+    modelnames : list[str]
+        Column names from counts that contain model risk scores
+    thresholds : Iterable or str
+        Threshold values (x values) at which net benefit and net interventions
+        avoided will be calculated, or 'all' to evaluate at every distinct
+        predicted risk in [0, 1) among the model columns
+    events_col : str
+        Column name in counts containing the number of events
+    nonevents_col : str
+        Column name in counts containing the number of non-events
+    harm : dict[float]
+        Models with their associated harm values
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+
+    Returns
+    -------
+    pd.DataFrame
+        Data containing net benefit and interventions avoided scores to be plotted
+        against threshold values, with n set to the total number of patients
+
+    Examples
+    --------
+    from dcurves import dca_from_counts
+
+    import pandas as pd
+
+    |
+
+    counts = pd.DataFrame(
+        {
+            'score': [0.05, 0.1, 0.2, 0.4],
+            'n_events': [10, 25, 40, 60],
+            'n_nonevents': [400, 300, 150, 50]
+        }
+    )
+
+    |
+
+    dca_results = \
+        dca_from_counts(
+            counts=counts,
+            modelnames=['score']
+        )
+
+    """
+
+    if isinstance(thresholds, str):
+        if thresholds != "all":
+            raise ValueError(
+                "thresholds must be an iterable of threshold values or 'all'"
+            )
+        thresholds = _calc_distinct_thresholds(risks_df=counts, modelnames=modelnames)
+
+    rates, num_patients, prevalence_value = _calc_count_table_rates(
+        counts=counts,
+        modelnames=modelnames,
+        thresholds=thresholds,
+        events_col=events_col,
+        nonevents_col=nonevents_col,
+        prevalence=prevalence,
+    )
+
+    final_dca_df = _calc_stats_from_rates(
+        rates=rates,
+        modelnames=modelnames,
+        thresholds=thresholds,
+        input_df_rownum=num_patients,
+        prevalence_value=prevalence_value,
+        harm=harm,
+        nper=nper,
+    )
+
+    return final_dca_df
@@ -1,468 +1,170 @@
 """
-This module houses most of the functions used in performing decision curve 
-analysis, along with the main user-facing dca() functions used for binary
-and survival outcomes.
+This module houses the main user-facing dca() function used for binary and
+survival outcomes (optionally returning an array-backed DCAResult), which
+dispatches to the engines and strategies kept in their own modules, and
+dca_iter() yielding one model's curve at a time. The rates it uses are
+calculated in rates.py and assembled into the output table in stats.py. The
+other entry points live with their helpers: dca_from_counts() in counts.py,
+dca_stream() and DCAAccumulator in streaming.py, DCASketch in sketch.py,
+dca_external() in external.py, dca_progressive() in subsample.py and DCAPlan in
+fused.py.
 """
 
-from typing import Optional, Union, Iterable
+from typing import Optional, Union, Iterable, Iterator, Mapping
+import numpy as np
 import pandas as pd
-import lifelines
 
-from .risks import _create_risks_df, _rectify_model_risk_boundaries
+from .columns import _input_backend, _returns_input_frame, _to_input_frame
+from .risks import _create_risks_df, _select_risk_columns
 from .prevalence import _calc_prevalence
-
-def _create_initial_df(
-    thresholds: Iterable,
-    modelnames: list,
-    input_df_rownum: int,
-    prevalence_value: Union[float, int],
-    harm: Optional[dict] = None,
-) -> pd.DataFrame:
-    """
-    Create initial dataframe that will form the outputted table containing
-    net benefit/interventions avoided values for plotting.
-
-    Parameters
-    ----------
-    thresholds : Iterable
-        Threshold values (x values) at which net benefit and net
-        interventions avoided will be calculated
-    modelnames : list[str]
-        Column names from risks_df that contain model risk scores
-    input_df_rownum : int
-        Number of rows in original input dataframe
-    prevalence_value : int or float
-        Calculated prevalence value
-    harm : dict[float]
-        Models with their associated harm values
-
-    Returns
-    -------
-    pd.DataFrame
-        DataFrame set with initial parameters
-    """
-
-    modelnames = modelnames + ["all", "none"]
-    rows = len(thresholds) * len(modelnames)
-    model_column = pd.Series(
-        [x for y in modelnames
-         for x in [y] * len(thresholds)])
-    threshold_column = pd.Series(list(thresholds) * len(modelnames))
-    n_column = pd.Series([input_df_rownum] * rows)
-    prevalence_column = pd.Series([prevalence_value] * rows)
-    harm_column = pd.Series([float(0)] * rows)
-
-    if harm is not None:
-        if isinstance(harm, dict):
-            for model in harm.keys():
-                harm_column.loc[model_column == model] = float(harm[model])
-        elif not isinstance(harm, dict):
-            raise ValueError("Harm should be either None or dict")
-    else :
-        pass
-
-    initial_df = pd.DataFrame(
-        {
-            "model": model_column,
-            "threshold": threshold_column,
-            "n": n_column,
-            "prevalence": prevalence_column,
-            "harm": harm_column,
-        }
-    )
-
-    return initial_df
-
-
-def _calc_test_pos_rate(
-    risks_df: pd.DataFrame, thresholds: Iterable, model: str
-) -> pd.Series:
-    """
-    Calculate each test positive rate per threshold value,
-    which will be used to calculate true and false positive rates 
-    per threshold values in the survival DCA case.
-
-    Parameters
-    ----------
-    risks_df : pd.DataFrame
-        Data containing (converted if necessary) risk scores 
-        (scores ranging from 0 to 1 for columns of interest)
-    thresholds : Iterable
-        Threshold values (x values) at which net test positive 
-        rate will be calculated
-    model : str
-        Model column name in risks_df
-
-    Returns
-    -------
-    pd.Series
-        Calculated test positive rates for each threshold value for a model
-    """
-
-    test_pos_rate = []
-
-    for threshold in thresholds:
-        risk_above_thresh_tf_dict = dict(
-            pd.Series(risks_df[model] >= threshold).value_counts()
-        )
-
-        if True not in risk_above_thresh_tf_dict:
-            test_pos_rate.append(0 / len(risks_df.index))
-        elif True in risk_above_thresh_tf_dict:
-            test_pos_rate.append(
-                risk_above_thresh_tf_dict[True] / len(risks_df.index))
-
-    return pd.Series(test_pos_rate)
-
-
-def _calc_risk_rate_among_test_pos(
-    risks_df: pd.DataFrame,
-    outcome: str,
-    model: str,
-    thresholds: Iterable,
-    time: Union[float, int],
-    time_to_outcome_col: str,
-) -> pd.Series:
-    """
-    Calculate the risk rate among test positive cases for each threshold value
-    , which will be used to calculate true and false positive rates per 
-    threshold values in the survival DCA case.
-
-    Parameters
-    ----------
-    risks_df : pd.DataFrame
-        Data containing (converted if necessary) risk scores (scores ranging
-        from 0 to 1 for columns of interest)
-    outcome : str
-        Column name of outcome of interest in risks_df
-    model : str
-        Model column name in risks_df
-    thresholds : Iterable
-        Threshold values (x values) at which risk rate among test positives
-        will be calculated
-    time : int or float
-        Time of interest in years, used in Survival DCA
-    time_to_outcome_col : str
-        Column name containing time to outcome values, used in Survival DCA
-
-    Returns
-    -------
-    pd.Series
-        Calculated risk rate among test positive for each threshold value
-    """
-
-    risk_rate_among_test_pos = []
-    kmf = lifelines.KaplanMeierFitter()
-
-    max_time = max(risks_df[time_to_outcome_col])
-    if max_time < time:
-        return [None] * len(thresholds)
-
-    for threshold in thresholds:
-        mask = risks_df[model] >= threshold
-        risk_above_thresh_time = risks_df.loc[mask, time_to_outcome_col].copy()
-        risk_above_thresh_outcome = risks_df.loc[mask, outcome].copy()
-
-        if len(risk_above_thresh_time) == 0 and len(risk_above_thresh_outcome) == 0:
-            risk_rate_among_test_pos.append(0.0)
-        else:
-            kmf.fit(risk_above_thresh_time, risk_above_thresh_outcome * 1)
-            timeline = max(kmf.timeline)
-            if timeline < time:
-                risk_rate_among_test_pos.append(None)
-            elif timeline >= time:
-                risk_rate_among_test_pos.append(
-                    1 - float(kmf.survival_function_at_times(time).iloc[0])
-                )
-
-    return pd.Series(risk_rate_among_test_pos)
-
-
-def _calc_tp_rate(
+from .compact import COMPACT_MODES, _calc_compact_rates
+from .streaming import dca_stream
+from .benefit import (
+    _calc_net_benefit,
+    _calc_net_intervention_avoided,
+    _calc_threshold_odds,
+)
+from .subsample import SAMPLING_WEIGHTS, _calc_subsample_se, _subsample_nonevents
+from .external import dca_external
+from .planner import (
+    CHUNKED_DEFAULT_ROWS,
+    _calc_chunk_rows,
+    _calc_external_memory,
+    _chosen_strategy,
+    _plan_dca,
+)
+from .engines import _calc_reference_rates
+from .rates import _calc_rate_matrix
+from .result import DCAResult
+from .stats import _calc_distinct_thresholds, _calc_harm_matrix, _calc_stats_from_rates
+
+
+ENGINES = ["loop", "sort", "binned"]
+
+
+def _calc_model_curve(
     risks_df: pd.DataFrame,
-    thresholds: Iterable,
     model: str,
-    outcome: str,
-    test_pos_rate: Optional[pd.Series] = None,
-    prevalence_value: Optional[Union[float, int]] = None,
-    time: Optional[Union[float, int]] = None,
-    time_to_outcome_col: Optional[str] = None,
-) -> pd.Series:
-    """
-    Calculate true positive rates per threshold value in binary and survival DCA cases.
-
-    Parameters
-    ----------
-    risks_df : pd.DataFrame
-        Data containing (converted if necessary) risk scores (scores ranging from 0
-        to 1 for columns of interest)
-    thresholds : Iterable
-        Threshold values (x values) at which true positive rate will be calculated
-    model : str
-        Model column name in risks_df
-    outcome : str
-        Column name of outcome of interest in risks_df
-    test_pos_rate : pd.Series
-        Calculated test positive rates for use in survival calculation of tp_rate
-    prevalence_value : int or float
-        Calculated prevalence value
-    time : int or float
-        Time of interest in years, used in Survival DCA
-    time_to_outcome_col : str
-        Column name in risks_df containing time to outcome values, used in Survival DCA
-
-    Returns
-    -------
-    pd.Series
-        Calculated true positive rate for each threshold value
-    """
-
-    if time_to_outcome_col is not None:
-        risk_rate_among_test_pos = _calc_risk_rate_among_test_pos(
-            risks_df=risks_df,
-            outcome=outcome,
-            model=model,
-            thresholds=thresholds,
-            time_to_outcome_col=time_to_outcome_col,
-            time=time,
-        )
-        tp_rate = risk_rate_among_test_pos * test_pos_rate
-    else:
-        selected_rows = risks_df[risks_df[outcome].isin([True])].copy()
-
-        true_outcome = selected_rows[[model]].copy()
-        num_true_outcomes = len(true_outcome[model])
-
-        tp_rate = []
-        for threshold in thresholds:
-            true_tf_above_thresh_count = (
-                (true_outcome[model] >= threshold).value_counts().get(True, 0)
-            )
-            tp_rate.append(
-                (true_tf_above_thresh_count /
-                 num_true_outcomes) * prevalence_value
-            )
-
-    return pd.Series(tp_rate)
-
-
-def _calc_fp_rate(
-    risks_df: pd.DataFrame,
-    thresholds: Iterable,
-    model: str,
-    outcome: str,
-    test_pos_rate: Optional[pd.Series] = None,
-    prevalence_value: Optional[Union[float, int]] = None,
-    time: Optional[Union[float, int]] = None,
-    time_to_outcome_col: Optional[str] = None,
-) -> pd.Series:
-    """
-    Calculate false positive rates per threshold value in binary and survival DCA cases.
-
-    Parameters
-    ----------
-    risks_df : pd.DataFrame
-        Data containing (converted if necessary) risk scores (scores ranging from 0 to
-        1 for columns of interest)
-    thresholds : Iterable
-        Threshold values (x values) at which false positive rate will be calculated
-    model : str
-        Model column name in risks_df
-    outcome : str
-        Column name of outcome of interest in risks_df
-    test_pos_rate : pd.Series
-        Calculated test positive rates for each threshold value for a model
-    prevalence_value : int or float
-        Calculated prevalence value
-    time : int or float
-        Time of interest in years, used in Survival DCA
-    time_to_outcome_col: str
-        Column name of time of interest in risks_df
-    Returns
-    -------
-    pd.Series
-        Calculated false positive rate for each threshold value
-    """
-    # Survival
-    if time_to_outcome_col is not None:
-        risk_rate_among_test_pos = _calc_risk_rate_among_test_pos(
-            risks_df=risks_df,
-            outcome=outcome,
-            model=model,
-            thresholds=thresholds,
-            time_to_outcome_col=time_to_outcome_col,
-            time=time,
-        )
-        fp_rate = (1 - risk_rate_among_test_pos) * test_pos_rate
-    # Binary
-    elif time_to_outcome_col is None:
-        false_outcome = risks_df[risks_df[outcome].isin([False])][[model]]
-
-        fp_rate = []
-        for threshold in thresholds:
-            try:
-                fp_counts = pd.Series(false_outcome[model] >= threshold).value_counts()
-                fp_rate.append(
-                    fp_counts[True] / len(false_outcome[model]) * (1 - prevalence_value)
-                )
-            except KeyError:
-                fp_rate.append(0 / len(false_outcome[model]) * (1 - prevalence_value))
-
-    return pd.Series(fp_rate)
-
-
-def _calc_initial_stats(
-    initial_df: pd.DataFrame,
-    risks_df: pd.DataFrame,
-    thresholds: Iterable,
+    thresholds: list,
     outcome: str,
     prevalence_value: Union[float, int],
+    harm_value: Union[float, np.ndarray] = 0.0,
+    net_benefit_all: Optional[np.ndarray] = None,
+    nper: int = 1,
     time: Optional[Union[float, int]] = None,
     time_to_outcome_col: Optional[str] = None,
+    engine: str = "sort",
+    weights: Optional[str] = None,
 ) -> pd.DataFrame:
     """
-    Calculate the test positive, true positive, and false positive rate per each threshold value.
+    Calculate the full set of stats for a single model, with the same columns
+    and values as that model's rows in the output of dca().
 
     Parameters
     ----------
-    initial_df : pd.DataFrame
-        DataFrame set with initial parameters
     risks_df : pd.DataFrame
-        Data containing (converted if necessary) risk scores (scores ranging from 0 to 1
-        for columns of interest)
-    thresholds : Iterable
-        Threshold values (x values) at which net benefit and net interventions avoided
-        will be calculated
+        Data containing (converted if necessary) risk scores
+    model : str
+        Model column name in risks_df
+    thresholds : list[float]
+        Threshold values (x values) at which stats will be calculated
     outcome : str
         Column name of outcome of interest in risks_df
     prevalence_value : int or float
         Calculated prevalence value
+    harm_value : float or np.ndarray
+        Harm associated with the model, a single value or one per threshold
+    net_benefit_all : np.ndarray
+        Net benefit of the 'all' reference per threshold, used for net
+        interventions avoided; None when model is 'all'
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
     time : int or float
         Time of interest in years, used in Survival DCA
     time_to_outcome_col : str
-        Column name in risks_df containing time to outcome values, used in Survival DCA
+        Column name in risks_df containing time to outcome values, used in
+        Survival DCA
+    engine : str
+        Either 'sort', 'binned' or 'loop', as in _calc_initial_stats
+    weights : str
+        Column name in risks_df containing sample weights
 
     Returns
     -------
     pd.DataFrame
-        Initially set data with calculated test pos rate, true positive rate, false
-        positive rate per threshold
+        Data of full set of stats per threshold value for the model
     """
 
-    for model in initial_df["model"].value_counts().index:
-        test_pos_rate = _calc_test_pos_rate(
-            risks_df=risks_df, thresholds=thresholds, model=model
-        )
-        tp_rate = _calc_tp_rate(
+    if model in ["all", "none"]:
+        rates = _calc_reference_rates(thresholds, prevalence_value)
+        test_pos_rate, tp_rate, fp_rate = rates[:, ["all", "none"].index(model)]
+    else:
+        test_pos_rate, tp_rate, fp_rate = _calc_rate_matrix(
             risks_df=risks_df,
             thresholds=thresholds,
-            model=model,
+            modelnames=[model],
             outcome=outcome,
-            time=time,
-            time_to_outcome_col=time_to_outcome_col,
-            test_pos_rate=test_pos_rate,
             prevalence_value=prevalence_value,
-        )
-
-        fp_rate = _calc_fp_rate(
-            risks_df=risks_df,
-            thresholds=thresholds,
-            model=model,
-            outcome=outcome,
             time=time,
             time_to_outcome_col=time_to_outcome_col,
-            test_pos_rate=test_pos_rate,
-            prevalence_value=prevalence_value,
-        )
-
-        # .copy() below added to prevent chained indexing
-        initial_df.loc[
-            initial_df["model"] == model, "test_pos_rate"
-        ] = test_pos_rate.tolist().copy()
-        initial_df.loc[
-            initial_df["model"] == model, "tp_rate"
-        ] = tp_rate.tolist().copy()
-        initial_df.loc[
-            initial_df["model"] == model, "fp_rate"
-        ] = fp_rate.tolist().copy()
+            engine=engine,
+            weights=weights,
+        )[:, 0]
 
-    return initial_df
-
-def _calc_more_stats(initial_stats_df: pd.DataFrame, nper: int = 1) -> pd.DataFrame:
-    """
-    Calculate additional statistics (net benefit, net interventions avoided) and
-    add them to initial_stats_df.
-
-    Parameters
-    ----------
-    initial_stats_df : pd.DataFrame
-        Initially set data with calculated test pos rate, true positive rate, false
-        positive rate per threshold
-    nper : int
-        Total number of interventions, multiplies proportion of interventions
-        avoided to get scaled plots
-    Returns
-    -------
-    pd.DataFrame
-        Data of full set of stats offered by the package per each threshold
-        value (test_pos_rate, tp, fp, nb, nia)
-
-    """
-    initial_stats_df["net_benefit"] = (
-        initial_stats_df["tp_rate"]
-        - (initial_stats_df["threshold"] / (1 - initial_stats_df["threshold"]))
-        * initial_stats_df["fp_rate"]
-        - initial_stats_df["harm"]
+    num_thresholds = len(thresholds)
+    model_df = pd.DataFrame(
+        {
+            "model": pd.Series([model] * num_thresholds),
+            "threshold": pd.Series(thresholds),
+            "n": pd.Series([len(risks_df.index)] * num_thresholds),
+            "prevalence": pd.Series([prevalence_value] * num_thresholds),
+            "harm": np.broadcast_to(
+                np.asarray(harm_value, dtype=float), (num_thresholds,)
+            ),
+            "test_pos_rate": test_pos_rate,
+            "tp_rate": tp_rate,
+            "fp_rate": fp_rate,
+        }
     )
-
-    mask = initial_stats_df["model"] == "all"
-    temp = initial_stats_df[mask]["net_benefit"]
-    initial_stats_df["net_benefit_all"] = temp.tolist() * len(
-        initial_stats_df["model"].value_counts()
+    odds = _calc_threshold_odds(thresholds)
+    net_benefit = _calc_net_benefit(
+        tp_rate=tp_rate, fp_rate=fp_rate, harm=harm_value, odds=odds
     )
-    initial_stats_df["net_intervention_avoided"] = (
-        (initial_stats_df.net_benefit - initial_stats_df.net_benefit_all)
-        / (initial_stats_df.threshold / (1 - initial_stats_df.threshold))
-        * nper
+    model_df["net_benefit"] = net_benefit
+    model_df["net_intervention_avoided"] = _calc_net_intervention_avoided(
+        net_benefit=net_benefit,
+        net_benefit_all=net_benefit if net_benefit_all is None else net_benefit_all,
+        odds=odds,
+        nper=nper,
     )
 
-    initial_stats_df = initial_stats_df.drop(columns="net_benefit_all").copy()
-
-    # initial_stats_df['neg_rate'] = 1 - initial_stats_df['prevalence']
-    # initial_stats_df['fn_rate'] = initial_stats_df['prevalence'] - initial_stats_df['tp_rate']
-    # initial_stats_df['tn_rate'] = initial_stats_df['neg_rate'] - initial_stats_df['fp_rate']
-    #
-    #
-    # initial_stats_df['test_neg_rate'] = initial_stats_df['fn_rate'] + initial_stats_df['tn_rate']
-    # initial_stats_df['ppv'] = initial_stats_df['tp_rate'] /\
-    #                               (initial_stats_df['tp_rate'] + initial_stats_df['fp_rate'])
-    # initial_stats_df['npv'] = initial_stats_df['tn_rate'] /\
-    #                               (initial_stats_df['tn_rate'] + initial_stats_df['fn_rate'])
-    # initial_stats_df['sens'] = initial_stats_df['tp_rate'] /\
-    #                                (initial_stats_df['tp_rate'] + initial_stats_df['fn_rate'])
-    # initial_stats_df['spec'] = initial_stats_df['tn_rate'] /\
-    #                                (initial_stats_df['tn_rate'] + initial_stats_df['fp_rate'])
-    # initial_stats_df['lr_pos'] = initial_stats_df['sens'] /\
-    #                                  (1 - initial_stats_df['spec'])
-    # initial_stats_df['lr_neg'] = (1 - initial_stats_df['sens']) /\
-    #                                  initial_stats_df['spec']
-
-    final_dca_df = initial_stats_df
-
-    return final_dca_df
+    return model_df
+
 
+@_returns_input_frame
 def dca(
-    data: pd.DataFrame,
+    data: Union[
+        pd.DataFrame, Mapping, np.ndarray, "pyarrow.Table", "polars.DataFrame"
+    ],
     outcome: str,
     modelnames: list,
-    thresholds: Iterable = [i / 100 for i in range(0, 100)],
+    thresholds: Union[Iterable, str] = [i / 100 for i in range(0, 100)],
     harm: Optional[dict] = None,
     models_to_prob: Optional[list] = None,
     prevalence: Optional[Union[float, int]] = None,
     time: Optional[Union[float, int]] = None,
     time_to_outcome_col: Optional[str] = None,
-    nper: Optional[int] = 1
-) -> pd.DataFrame:
+    nper: Optional[int] = 1,
+    engine: str = "sort",
+    compact: Optional[str] = None,
+    weights: Optional[str] = None,
+    nonevent_fraction: Optional[float] = None,
+    random_state: Optional[Union[int, np.random.Generator]] = None,
+    memory_limit: Optional[int] = None,
+    explain: bool = False,
+    as_result: bool = False,
+) -> Union[pd.DataFrame, "DCAResult"]:
     """
     Decision curve analysis is a method for evaluating and comparing prediction
     models that incorporates clinical consequences, requiring only the data set
@@ -472,18 +174,25 @@ def dca(
 
     Parameters
     ----------
-    data: pd.DataFrame
+    data: pd.DataFrame, Mapping, np.ndarray, pyarrow.Table or polars.DataFrame
         Initial raw data ideally containing risk scores (scores ranging from 0
-        to 1), or else predictor/model values, and outcome of interest
+        to 1), or else predictor/model values, and outcome of interest: a
+        pd.DataFrame (NumPy or Arrow-backed), a mapping of column names to 1-D
+        arrays, a NumPy structured array, a pyarrow Table or a Polars
+        DataFrame/LazyFrame. Needed columns are read as views of the caller's
+        arrays where their layout allows; a LazyFrame only collects them. For
+        Polars input, data frames are returned as a polars.DataFrame
     outcome: str
         Column name of outcome of interest in risks_df
     modelnames : list[str]
         Column names from data that contain model risk scores or values
-    thresholds : Iterable
+    thresholds : Iterable or str
         Threshold values (x values) at which net benefit and net interventions
-        avoided will be calculated
+        avoided will be calculated, or 'all' to evaluate at every distinct
+        predicted risk in [0, 1) among the model columns
     harm : dict[float]
-        Models with their associated harm values
+        Models with their associated harm values, each a single value or one
+        value per threshold value
     models_to_prob : list[str]
         Columns that need to be converted to risk scores from 0 to 1
     prevalence : int or float
@@ -496,12 +205,58 @@ def dca(
     nper : int
         Total number of interventions, multiplies proportion of interventions
         avoided to get scaled plots
+    engine : str
+        Strategy used to calculate binary test positive, true positive and false
+        positive rates: 'sort' (default) sorts each model's risk scores once and
+        reads every threshold from cumulative counts, 'binned' counts risk scores
+        into the bins between threshold values without sorting (fastest for very
+        large data with a coarse threshold grid), 'loop' compares every row
+        against each threshold value. All give identical results. 'auto'
+        estimates the time and memory of every strategy, including the
+        compact, chunked (as dca_stream) and out-of-core (as dca_external)
+        ones, from the number of rows, models and thresholds and the outcome
+        type, and runs the fastest one within memory_limit
+    compact : str
+        Opt-in low-memory mode for binary outcomes that never copies the input
+        data: outcomes are bit-packed and risk scores are held either as
+        'float32' or 'quantized' (uint16 index of the threshold bin). Counts are
+        accumulated in int64. 'quantized' gives identical results; with 'float32'
+        only rows whose risk score is within float32 rounding (about 6e-8
+        relative) of a threshold value can change sides, so each rate differs
+        from the default by at most the share of such rows
+    weights : str
+        Column name in data containing sample weights (e.g. survey or inverse
+        probability weights). Test positive, true positive and false positive
+        rates and prevalence become weighted, as if each row were replicated
+        weight times; survival outcomes use weighted Kaplan-Meier estimates. The
+        n column still reports the number of rows
+    nonevent_fraction : float
+        Opt-in subsampling for rare binary outcomes: every event is kept and
+        each non-event is kept with this probability and weighted by its
+        inverse, so tp, fp and prevalence stay unbiased while most of the work
+        on non-events is skipped. Adds a net_benefit_se column with the
+        estimated Monte Carlo standard error this introduces
+    random_state : int or np.random.Generator
+        Seed or generator used to draw the non-event subsample
+    memory_limit : int
+        Memory budget in bytes, on top of the input data, used by engine='auto'
+        to rule out strategies and to size chunks
+    explain : bool
+        If True, return the plan instead of running the analysis: estimated
+        seconds and bytes per stage (prepare, count, output) for every
+        strategy, whether each is supported and fits memory_limit, and which
+        is chosen
+    as_result : bool
+        If True, return a DCAResult holding one (models x thresholds) array per
+        metric, which builds the long table only when to_frame() is called;
+        to_frame(compact=True, dtype='float32') gives a smaller table with a
+        Categorical model column and n/prevalence in DataFrame.attrs
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame, polars.DataFrame or DCAResult
         Data containing net benefit and interventions avoided scores to be plotted
-        against threshold values
+        against threshold values, as a polars.DataFrame for Polars input
 
     Examples
     --------
@@ -530,44 +285,345 @@ def dca(
 
     """
 
-    risks_df = _create_risks_df(
+    if engine not in ENGINES + ["auto"]:
+        raise ValueError("engine must be one of: " + ", ".join(ENGINES + ["auto"]))
+    if isinstance(thresholds, str) and thresholds != "all":
+        raise ValueError("thresholds must be an iterable of threshold values or 'all'")
+
+    data = _select_risk_columns(
         data=data,
         outcome=outcome,
+        modelnames=modelnames,
         models_to_prob=models_to_prob,
-        time=time,
         time_to_outcome_col=time_to_outcome_col,
+        weights=weights,
     )
 
-    rectified_risks_df = _rectify_model_risk_boundaries(
-        risks_df=risks_df, modelnames=modelnames
+    if explain or (engine == "auto" and compact is None and nonevent_fraction is None):
+        if not isinstance(thresholds, str):
+            thresholds = list(thresholds)
+        plan = _plan_dca(
+            num_rows=len(data.index),
+            num_models=len(modelnames),
+            num_thresholds=None if isinstance(thresholds, str) else len(thresholds),
+            survival=time_to_outcome_col is not None,
+            memory_limit=memory_limit,
+            models_to_prob=models_to_prob is not None,
+            weights=weights is not None,
+        )
+        if explain:
+            if engine != "auto":
+                plan["chosen"] = plan["strategy"] == (
+                    "compact" if compact is not None else engine
+                )
+            return plan
+
+        strategy = _chosen_strategy(plan)
+        if strategy == "compact":
+            compact = "quantized"
+        elif strategy in ["chunked", "external"]:
+            if strategy == "chunked":
+                chunk_rows = _calc_chunk_rows(len(modelnames), memory_limit)
+            else:
+                chunk_rows = CHUNKED_DEFAULT_ROWS
+            chunks = (
+                data.iloc[start : start + chunk_rows]
+                for start in range(0, len(data.index), chunk_rows)
+            )
+            if strategy == "chunked":
+                final_dca_df = dca_stream(
+                    chunks=chunks,
+                    outcome=outcome,
+                    modelnames=modelnames,
+                    thresholds=thresholds,
+                    harm=harm,
+                    prevalence=prevalence,
+                    nper=nper,
+                    weights=weights,
+                )
+            else:
+                final_dca_df = dca_external(
+                    chunks=chunks,
+                    outcome=outcome,
+                    modelnames=modelnames,
+                    harm=harm,
+                    prevalence=prevalence,
+                    nper=nper,
+                    memory_limit=_calc_external_memory(memory_limit),
+                )
+            return DCAResult.from_frame(final_dca_df) if as_result else final_dca_df
+        else:
+            engine = strategy
+
+    if nonevent_fraction is not None:
+        if time_to_outcome_col is not None:
+            raise ValueError("nonevent_fraction is only available for binary outcomes")
+        if weights is not None:
+            raise ValueError("nonevent_fraction cannot be combined with weights")
+
+        if models_to_prob is not None:
+            # Fit the conversions on every row, not on the event-enriched sample
+            data = _create_risks_df(
+                data=data, outcome=outcome, models_to_prob=models_to_prob
+            )
+
+        sampled_data = _subsample_nonevents(
+            data=data,
+            outcome=outcome,
+            nonevent_fraction=nonevent_fraction,
+            random_state=random_state,
+        )
+        final_dca_df = dca(
+            data=sampled_data,
+            outcome=outcome,
+            modelnames=modelnames,
+            thresholds=thresholds,
+            harm=harm,
+            models_to_prob=None,
+            prevalence=prevalence,
+            nper=nper,
+            engine=engine,
+            compact=compact,
+            weights=SAMPLING_WEIGHTS,
+            memory_limit=memory_limit,
+        )
+        final_dca_df["n"] = len(data.index)
+        final_dca_df["net_benefit_se"] = _calc_subsample_se(
+            dca_df=final_dca_df,
+            nonevent_fraction=nonevent_fraction,
+            num_nonevents=sampled_data.loc[
+                sampled_data[outcome].isin([False]), SAMPLING_WEIGHTS
+            ].sum(),
+            prevalence=prevalence,
+        )
+        return DCAResult.from_frame(final_dca_df) if as_result else final_dca_df
+
+    if compact is not None:
+        if compact not in COMPACT_MODES:
+            raise ValueError("compact must be one of: " + ", ".join(COMPACT_MODES))
+        if time_to_outcome_col is not None:
+            raise ValueError("compact is only available for binary outcomes")
+        if isinstance(thresholds, str):
+            raise ValueError("compact needs threshold values, not 'all'")
+
+        rates, num_rows, prevalence_value = _calc_compact_rates(
+            data=data,
+            outcome=outcome,
+            modelnames=modelnames,
+            thresholds=thresholds,
+            compact=compact,
+            models_to_prob=models_to_prob,
+            prevalence=prevalence,
+            weights=weights,
+        )
+        return _calc_stats_from_rates(
+            rates=rates,
+            modelnames=modelnames,
+            thresholds=thresholds,
+            input_df_rownum=num_rows,
+            prevalence_value=prevalence_value,
+            harm=harm,
+            nper=nper,
+            as_result=as_result,
+        )
+
+    risks_df = _create_risks_df(
+        data=data,
+        outcome=outcome,
+        models_to_prob=models_to_prob,
+        time=time,
+        time_to_outcome_col=time_to_outcome_col,
     )
 
     prevalence_value = _calc_prevalence(
-        risks_df=rectified_risks_df,
+        risks_df=risks_df,
         outcome=outcome,
         prevalence=prevalence,
         time=time,
         time_to_outcome_col=time_to_outcome_col,
+        weights=weights,
     )
 
-    initial_df = _create_initial_df(
+    if isinstance(thresholds, str):
+        thresholds = _calc_distinct_thresholds(
+            risks_df=risks_df, modelnames=modelnames
+        )
+
+    thresholds = list(thresholds)
+    rates = _calc_rate_matrix(
+        risks_df=risks_df,
         thresholds=thresholds,
         modelnames=modelnames,
-        input_df_rownum=len(rectified_risks_df.index),
+        outcome=outcome,
         prevalence_value=prevalence_value,
-        harm=harm,
+        time=time,
+        time_to_outcome_col=time_to_outcome_col,
+        engine=engine,
+        weights=weights,
     )
 
-    initial_stats_df = _calc_initial_stats(
-        initial_df=initial_df,
-        risks_df=rectified_risks_df,
+    return _calc_stats_from_rates(
+        rates=rates,
+        modelnames=modelnames,
         thresholds=thresholds,
-        outcome=outcome,
+        input_df_rownum=len(risks_df.index),
         prevalence_value=prevalence_value,
+        harm=harm,
+        nper=nper,
+        as_result=as_result,
+    )
+
+
+def dca_iter(
+    data: Union[
+        pd.DataFrame, Mapping, np.ndarray, "pyarrow.Table", "polars.DataFrame"
+    ],
+    outcome: str,
+    modelnames: list,
+    thresholds: Union[Iterable, str] = [i / 100 for i in range(0, 100)],
+    harm: Optional[dict] = None,
+    models_to_prob: Optional[list] = None,
+    prevalence: Optional[Union[float, int]] = None,
+    time: Optional[Union[float, int]] = None,
+    time_to_outcome_col: Optional[str] = None,
+    nper: Optional[int] = 1,
+    engine: str = "sort",
+    weights: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield each model's decision curve as soon as it is calculated, instead of
+    building the whole table first, so that writers and plotters can work
+    while later models are still being calculated and only one model's
+    curve is held at a time. Risk scores, prevalence and the 'all' reference
+    are prepared once up front. Concatenating the yielded frames gives the
+    same table as dca().
+
+    Parameters
+    ----------
+    data : pd.DataFrame, Mapping, np.ndarray, pyarrow.Table or polars.DataFrame
+        Initial raw data ideally containing risk scores (scores ranging from 0
+        to 1), or else predictor/model values, and outcome of interest, of any
+        kind accepted by dca()
+    outcome : str
+        Column name of outcome of interest in data
+    modelnames : list[str]
+        Column names from data that contain model risk scores or values
+    thresholds : Iterable or str
+        Threshold values (x values) at which net benefit and net interventions
+        avoided will be calculated, or 'all' to evaluate at every distinct
+        predicted risk in [0, 1) among the model columns
+    harm : dict[float]
+        Models with their associated harm values, each a single value or one
+        value per threshold value
+    models_to_prob : list[str]
+        Columns that need to be converted to risk scores from 0 to 1
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+    time : int or float
+        Time of interest in years, used in Survival DCA
+    time_to_outcome_col : str
+        Column name in data containing time to outcome values, used in Survival DCA
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    engine : str
+        Either 'sort', 'binned' or 'loop', as in dca()
+    weights : str
+        Column name in data containing sample weights
+
+    Yields
+    ------
+    pd.DataFrame
+        Data containing net benefit and interventions avoided scores for one
+        model, in the order of modelnames followed by 'all' and 'none' (a
+        polars.DataFrame for Polars input)
+
+    Examples
+    --------
+    from dcurves import dca_iter
+
+    |
+
+    for model_results in dca_iter(data=df, outcome='cancer',
+                                  modelnames=model_columns):
+        model_results.to_csv('curves.csv', mode='a', header=False)
+
+    """
+
+    if engine not in ENGINES:
+        raise ValueError("engine must be one of: " + ", ".join(ENGINES))
+    if isinstance(thresholds, str) and thresholds != "all":
+        raise ValueError("thresholds must be an iterable of threshold values or 'all'")
+
+    backend = _input_backend(data)
+    risks_df = _create_risks_df(
+        data=_select_risk_columns(
+            data=data,
+            outcome=outcome,
+            modelnames=modelnames,
+            models_to_prob=models_to_prob,
+            time_to_outcome_col=time_to_outcome_col,
+            weights=weights,
+        ),
+        outcome=outcome,
+        models_to_prob=models_to_prob,
         time=time,
         time_to_outcome_col=time_to_outcome_col,
     )
 
-    final_dca_df = _calc_more_stats(initial_stats_df=initial_stats_df, nper=nper)
+    prevalence_value = _calc_prevalence(
+        risks_df=risks_df,
+        outcome=outcome,
+        prevalence=prevalence,
+        time=time,
+        time_to_outcome_col=time_to_outcome_col,
+        weights=weights,
+    )
+
+    if isinstance(thresholds, str):
+        thresholds = _calc_distinct_thresholds(
+            risks_df=risks_df, modelnames=modelnames
+        )
+    thresholds = list(thresholds)
+
+    curve_args = {
+        "risks_df": risks_df,
+        "thresholds": thresholds,
+        "outcome": outcome,
+        "prevalence_value": prevalence_value,
+        "nper": nper,
+        "time": time,
+        "time_to_outcome_col": time_to_outcome_col,
+        "engine": engine,
+        "weights": weights,
+    }
+    harm_matrix = _calc_harm_matrix(
+        harm=harm,
+        modelnames=modelnames + ["all", "none"],
+        num_thresholds=len(thresholds),
+    )
 
-    return final_dca_df
+    all_df = _calc_model_curve(model="all", harm_value=harm_matrix[-2], **curve_args)
+    net_benefit_all = all_df["net_benefit"].to_numpy()
+
+    for model_index, model in enumerate(modelnames):
+        yield _to_input_frame(
+            _calc_model_curve(
+                model=model,
+                harm_value=harm_matrix[model_index],
+                net_benefit_all=net_benefit_all,
+                **curve_args,
+            ),
+            backend,
+        )
+    yield _to_input_frame(all_df, backend)
+    yield _to_input_frame(
+        _calc_model_curve(
+            model="none",
+            harm_value=harm_matrix[-1],
+            net_benefit_all=net_benefit_all,
+            **curve_args,
+        ),
+        backend,
+    )
@@ -0,0 +1,518 @@
+"""
+This module houses the count engines used to calculate test positive, true
+positive and false positive counts per threshold value in binary DCA.
+"""
+
+import sys
+from typing import Iterable, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+# Score columns with at most this many distinct values are collapsed into a
+# (level, events, non-events) table before thresholds are evaluated
+LOW_CARDINALITY_MAX_LEVELS = 256
+
+
+def _calc_row_weights(num_rows: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Get the weight of each row, which is 1 (int64, so that counts stay exact)
+    when no weights are supplied.
+
+    Parameters
+    ----------
+    num_rows : int
+        Number of rows
+    weights : np.ndarray
+        Sample weights, one per row
+
+    Returns
+    -------
+    np.ndarray
+        Weight of each row
+    """
+
+    if weights is None:
+        return np.ones(num_rows, dtype=np.int64)
+    return np.asarray(weights, dtype=float)
+
+
+def _calc_sorted_position(thresholds: np.ndarray) -> np.ndarray:
+    """
+    Find the position of each threshold value within the ascending thresholds.
+
+    Parameters
+    ----------
+    thresholds : np.ndarray
+        Threshold values in the order supplied by the user
+
+    Returns
+    -------
+    np.ndarray
+        Index into the ascending thresholds for each supplied threshold value
+    """
+
+    sorted_position = np.empty(len(thresholds), dtype=np.intp)
+    sorted_position[np.argsort(thresholds, kind="stable")] = np.arange(len(thresholds))
+    return sorted_position
+
+
+def _calc_binary_counts_matrix(
+    score_matrix: np.ndarray,
+    events: np.ndarray,
+    nonevents: np.ndarray,
+    thresholds: Iterable,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate test positive, true positive and false positive counts per
+    threshold value for several models at once. Each model's risk scores are
+    sorted together with the threshold values in a single column-wise NumPy
+    sort, and counts are read from the cumulative event/non-event counts at the
+    position of each threshold.
+
+    Parameters
+    ----------
+    score_matrix : np.ndarray
+        2-D array of risk scores, one row per observation and one column per model
+    events : np.ndarray
+        Boolean mask of rows where the outcome occurred
+    nonevents : np.ndarray
+        Boolean mask of rows where the outcome did not occur
+    thresholds : Iterable
+        Threshold values (x values) at which counts will be calculated
+    weights : np.ndarray
+        Sample weights, one per row; counts become sums of weights
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Test positive, true positive and false positive counts (int64, or
+        float64 when weighted), each of shape (models, thresholds)
+    """
+
+    scores = np.asarray(score_matrix, dtype=float).T
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    num_models, num_rows = scores.shape
+    num_thresholds = len(thresholds)
+    row_weights = _calc_row_weights(num_rows, weights)
+    event_weights = row_weights * np.asarray(events, dtype=bool)
+    nonevent_weights = row_weights * np.asarray(nonevents, dtype=bool)
+
+    # Thresholds are placed ahead of the scores, so the stable sort puts each
+    # threshold before any score equal to it; missing scores sort last and are
+    # therefore never counted below a threshold
+    stacked = np.concatenate(
+        [np.broadcast_to(thresholds, (num_models, num_thresholds)), scores], axis=1
+    )
+    order = np.argsort(stacked, axis=1, kind="stable")
+    is_threshold = order < num_thresholds
+
+    def below(values):
+        # Cumulative sum of row values in sorted order, read at each threshold
+        padded = np.concatenate([np.zeros(num_thresholds, dtype=values.dtype), values])
+        return np.cumsum(padded[order], axis=1)[is_threshold].reshape(
+            num_models, num_thresholds
+        )
+
+    if weights is None:
+        # Unweighted, the number of scores below a threshold is its position
+        # less the number of thresholds before it
+        below_scores = (
+            np.nonzero(is_threshold)[1].reshape(num_models, num_thresholds)
+            - np.arange(num_thresholds)
+        )
+    else:
+        below_scores = below(row_weights)
+
+    valid = ~np.isnan(scores)
+    test_pos = (valid * row_weights).sum(axis=1)[:, None] - below_scores
+    tp = (valid * event_weights).sum(axis=1)[:, None] - below(event_weights)
+    fp = (valid * nonevent_weights).sum(axis=1)[:, None] - below(nonevent_weights)
+
+    # Columns above follow ascending threshold order; restore the given order
+    sorted_position = _calc_sorted_position(thresholds)
+
+    return (
+        test_pos[:, sorted_position],
+        tp[:, sorted_position],
+        fp[:, sorted_position],
+    )
+
+
+def _calc_level_table(
+    scores: np.ndarray,
+    events: np.ndarray,
+    nonevents: np.ndarray,
+    max_levels: int = LOW_CARDINALITY_MAX_LEVELS,
+    weights: Optional[np.ndarray] = None,
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Collapse a low-cardinality score column (e.g. a dichotomous marker or an
+    ordinal risk group) into a table of its distinct levels with the number of
+    rows, events and non-events at each level.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        Risk scores for a model column, one per row
+    events : np.ndarray
+        Boolean mask of rows where the outcome occurred
+    nonevents : np.ndarray
+        Boolean mask of rows where the outcome did not occur
+    max_levels : int
+        Largest number of distinct score values for which a table is built
+    weights : np.ndarray
+        Sample weights, one per row; counts become sums of weights
+
+    Returns
+    -------
+    tuple[np.ndarray] or None
+        Ascending levels and the row, event and non-event counts (int64, or
+        float64 when weighted) at each level, or None if the column has more
+        than max_levels distinct values
+    """
+
+    scores = np.asarray(scores, dtype=float)
+
+    # Cheap check on the leading rows before hashing the whole column
+    if len(pd.unique(scores[: max_levels * 16])) > max_levels:
+        return None
+
+    codes, levels = pd.factorize(scores)
+    if len(levels) > max_levels:
+        return None
+
+    # Missing scores get code -1 and never count at any threshold
+    keep = codes >= 0
+    order = np.argsort(levels)
+
+    def level_counts(mask):
+        return np.bincount(
+            codes[mask],
+            weights=None if weights is None else np.asarray(weights)[mask],
+            minlength=len(levels),
+        )[order]
+
+    return (
+        np.asarray(levels, dtype=float)[order],
+        level_counts(keep),
+        level_counts(keep & np.asarray(events, dtype=bool)),
+        level_counts(keep & np.asarray(nonevents, dtype=bool)),
+    )
+
+
+def _calc_level_counts(
+    levels: np.ndarray,
+    totals: np.ndarray,
+    event_counts: np.ndarray,
+    nonevent_counts: np.ndarray,
+    thresholds: Iterable,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate test positive, true positive and false positive counts per
+    threshold value from a table of ascending score levels.
+
+    Parameters
+    ----------
+    levels : np.ndarray
+        Ascending distinct score values
+    totals : np.ndarray
+        Number of rows at each level
+    event_counts : np.ndarray
+        Number of events at each level
+    nonevent_counts : np.ndarray
+        Number of non-events at each level
+    thresholds : Iterable
+        Threshold values (x values) at which counts will be calculated
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Test positive, true positive and false positive counts for each threshold
+        value
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    first_level_at_or_above = np.searchsorted(levels, thresholds, side="left")
+
+    def at_or_above(counts):
+        # Suffix sums, with a trailing 0 for thresholds above every level
+        return np.concatenate([np.cumsum(counts[::-1])[::-1], [0]])[
+            first_level_at_or_above
+        ]
+
+    return (
+        at_or_above(totals),
+        at_or_above(event_counts),
+        at_or_above(nonevent_counts),
+    )
+
+
+def _calc_level_counts_matrix(level_tables: list, thresholds: Iterable) -> np.ndarray:
+    """
+    Calculate test positive, true positive and false positive counts per
+    threshold value for several models from their tables of score levels.
+
+    Parameters
+    ----------
+    level_tables : list[tuple]
+        Tables of ascending score levels as taken by _calc_level_counts, one per
+        model
+    thresholds : Iterable
+        Threshold values (x values) at which counts will be calculated
+
+    Returns
+    -------
+    np.ndarray
+        Counts of shape (3, models, thresholds) ordered as test positive, true
+        positive and false positive
+    """
+
+    return np.stack(
+        [
+            np.stack(_calc_level_counts(*level_table, thresholds=thresholds))
+            for level_table in level_tables
+        ],
+        axis=1,
+    )
+
+
+def _calc_binned_counts_matrix(
+    score_matrix: np.ndarray,
+    events: np.ndarray,
+    nonevents: np.ndarray,
+    thresholds: Iterable,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate test positive, true positive and false positive counts per
+    threshold value for several models without sorting the risk scores. Each
+    score is assigned to the bin between consecutive threshold values with
+    np.digitize, bins are counted with np.bincount and a reverse cumulative sum
+    gives the counts at or above every threshold. Counts are exact for the
+    supplied thresholds.
+
+    Parameters
+    ----------
+    score_matrix : np.ndarray
+        2-D array of risk scores, one row per observation and one column per model
+    events : np.ndarray
+        Boolean mask of rows where the outcome occurred
+    nonevents : np.ndarray
+        Boolean mask of rows where the outcome did not occur
+    thresholds : Iterable
+        Threshold values (x values) at which counts will be calculated
+    weights : np.ndarray
+        Sample weights, one per row; counts become sums of weights
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Test positive, true positive and false positive counts (int64, or
+        float64 when weighted), each of shape (models, thresholds)
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    bin_counts = _calc_bin_counts_matrix(
+        score_matrix=score_matrix,
+        events=events,
+        nonevents=nonevents,
+        sorted_thresholds=np.sort(thresholds),
+        weights=weights,
+    )
+
+    test_pos, tp, fp = _calc_bin_counts_at_or_above(bin_counts, thresholds)
+    return test_pos, tp, fp
+
+
+def _calc_bin_counts_matrix(
+    score_matrix: np.ndarray,
+    events: np.ndarray,
+    nonevents: np.ndarray,
+    sorted_thresholds: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Count all rows, events and non-events in each bin between consecutive
+    threshold values for several models. Bin counts from separate sets of rows
+    can be added together before they are turned into counts at or above each
+    threshold with _calc_bin_counts_at_or_above.
+
+    Parameters
+    ----------
+    score_matrix : np.ndarray
+        2-D array of risk scores, one row per observation and one column per model
+    events : np.ndarray
+        Boolean mask of rows where the outcome occurred
+    nonevents : np.ndarray
+        Boolean mask of rows where the outcome did not occur
+    sorted_thresholds : np.ndarray
+        Ascending threshold values
+    weights : np.ndarray
+        Sample weights, one per row; counts become sums of weights
+
+    Returns
+    -------
+    np.ndarray
+        Bin counts (int64, or float64 when weighted) of shape
+        (3, models, thresholds + 1) for all rows, events and non-events
+    """
+
+    scores = np.asarray(score_matrix, dtype=float).T
+    num_models = scores.shape[0]
+    num_bins = len(sorted_thresholds) + 1
+
+    bins = _calc_threshold_bins(scores, sorted_thresholds)
+    bins += (np.arange(num_models) * num_bins)[:, None]
+
+    def count_bins(mask):
+        masked_bins = bins[:, mask]
+        bin_weights = None
+        if weights is not None:
+            bin_weights = np.broadcast_to(
+                np.asarray(weights, dtype=float)[mask], masked_bins.shape
+            ).ravel()
+        return np.bincount(
+            masked_bins.ravel(), weights=bin_weights, minlength=num_models * num_bins
+        ).reshape(num_models, num_bins)
+
+    return np.stack(
+        [
+            count_bins(slice(None)),
+            count_bins(np.asarray(events, dtype=bool)),
+            count_bins(np.asarray(nonevents, dtype=bool)),
+        ]
+    )
+
+
+def _calc_threshold_bins(scores: np.ndarray, sorted_thresholds: np.ndarray) -> np.ndarray:
+    """
+    Assign each risk score to the bin between consecutive threshold values.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        Risk scores of any shape
+    sorted_thresholds : np.ndarray
+        Ascending threshold values
+
+    Returns
+    -------
+    np.ndarray
+        Bin b for each score, where b is the number of thresholds at or below the
+        score; missing scores go to bin 0 so they are never counted
+    """
+
+    bins = np.digitize(scores, sorted_thresholds)
+    bins[np.isnan(scores)] = 0
+    return bins
+
+
+def _calc_bin_counts_at_or_above(
+    bin_counts: np.ndarray, thresholds: np.ndarray
+) -> np.ndarray:
+    """
+    Turn counts per threshold bin into counts at or above each threshold value.
+
+    Parameters
+    ----------
+    bin_counts : np.ndarray
+        Counts per bin (as assigned by _calc_threshold_bins) along the last axis,
+        which has one more entry than there are thresholds
+    thresholds : np.ndarray
+        Threshold values in the order supplied by the user
+
+    Returns
+    -------
+    np.ndarray
+        Counts at or above each threshold value, in the supplied order
+    """
+
+    # Scores in bins k + 1 and above are >= the k-th ascending threshold
+    at_or_above = np.cumsum(bin_counts[..., ::-1], axis=-1)[..., ::-1][..., 1:]
+    return at_or_above[..., _calc_sorted_position(thresholds)]
+
+
+def _calc_reference_rates(
+    thresholds: Iterable, prevalence_value: Union[float, int]
+) -> np.ndarray:
+    """
+    Calculate the rates of the 'all' and 'none' reference strategies in closed
+    form. Treating all is a risk score of 1 + e and treating none a risk score of
+    0 - e for every row (as in _rectify_model_risk_boundaries), so at each
+    threshold value either every row is test positive, giving rates of 1,
+    prevalence and 1 - prevalence, or none is, giving 0. For survival outcomes
+    the risk among test positives is then the cohort Kaplan-Meier estimate,
+    which is the prevalence, so the same rates hold.
+
+    Parameters
+    ----------
+    thresholds : Iterable
+        Threshold values (x values) at which rates will be calculated
+    prevalence_value : int or float
+        Calculated prevalence value
+
+    Returns
+    -------
+    np.ndarray
+        Rates of shape (3, 2, thresholds) ordered as test positive, true
+        positive and false positive rate for 'all' followed by 'none'
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    machine_epsilon = sys.float_info.epsilon
+    test_pos_rate = np.stack(
+        [1 + machine_epsilon >= thresholds, 0 - machine_epsilon >= thresholds]
+    ).astype(float)
+
+    return np.stack(
+        [
+            test_pos_rate,
+            test_pos_rate * prevalence_value,
+            test_pos_rate * (1 - prevalence_value),
+        ]
+    )
+
+
+def _calc_rates_from_counts(
+    model_counts: np.ndarray,
+    totals: Iterable,
+    thresholds: Iterable,
+    prevalence_value: float,
+) -> np.ndarray:
+    """
+    Turn test positive, true positive and false positive counts per model into
+    rates, adding the 'all' and 'none' references from _calc_reference_rates.
+
+    Parameters
+    ----------
+    model_counts : np.ndarray
+        Counts of shape (3, models, thresholds) ordered as test positive, true
+        positive and false positive
+    totals : Iterable
+        Totals (number or total weight) of all rows, events and non-events
+    thresholds : Iterable
+        Threshold values (x values) at which counts were calculated
+    prevalence_value : float
+        Calculated prevalence value
+
+    Returns
+    -------
+    np.ndarray
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and 'none'
+    """
+
+    total_weight, num_events, num_nonevents = totals
+    test_pos, tp, fp = model_counts
+    model_rates = np.stack(
+        [
+            test_pos / total_weight,
+            (tp / num_events) * prevalence_value,
+            fp / num_nonevents * (1 - prevalence_value),
+        ]
+    )
+
+    return np.concatenate(
+        [model_rates, _calc_reference_rates(thresholds, prevalence_value)], axis=1
+    )
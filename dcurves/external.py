@@ -0,0 +1,409 @@
+"""
+This module houses the functions used to run exact binary DCA at every distinct
+risk score for cohorts that do not fit in memory, by external sort: chunks are
+spilled as sorted runs of (score, outcome) to temporary memory-mapped files,
+and the runs are merged block by block into a table of distinct score levels
+with their event and non-event counts.
+"""
+
+import os
+import sys
+import tempfile
+from typing import Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .stats import _calc_stats_from_rates
+from .engines import _calc_level_counts_matrix, _calc_rates_from_counts
+
+# Default ceiling, in bytes, for the rows held in memory while sorting/merging
+EXTERNAL_MEMORY_LIMIT = 1 << 28
+
+# Working bytes per buffered (score, outcome) row: the values themselves plus
+# the sort order and the copies made while sorting or merging
+EXTERNAL_ROW_BYTES = 48
+
+RUN_DTYPE = np.dtype([("score", np.float64), ("outcome", np.int8)])
+
+# Outcome codes stored with each score; rows with a missing outcome are kept
+# so they count as test positive, as in dca()
+OUTCOME_NONEVENT, OUTCOME_EVENT, OUTCOME_MISSING = 0, 1, 2
+
+
+def _write_sorted_run(
+    scores: np.ndarray, outcome_codes: np.ndarray, path: str
+) -> int:
+    """
+    Sort one buffer of scores with their outcome codes and write it to a
+    memory-mapped file. Missing scores are dropped, as they are never counted
+    as test positive.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        Rectified risk scores
+    outcome_codes : np.ndarray
+        Outcome code of each score
+    path : str
+        File to write the run to
+
+    Returns
+    -------
+    int
+        Number of rows written; no file is written when there are none
+    """
+
+    scored = ~np.isnan(scores)
+    order = np.argsort(scores[scored], kind="stable")
+    if order.size == 0:
+        return 0
+
+    run = np.lib.format.open_memmap(
+        path, mode="w+", dtype=RUN_DTYPE, shape=(len(order),)
+    )
+    run["score"] = scores[scored][order]
+    run["outcome"] = outcome_codes[scored][order]
+    run.flush()
+    del run
+
+    return len(order)
+
+
+def _spill_sorted_runs(
+    chunks: Iterable[pd.DataFrame],
+    outcome: str,
+    modelnames: list,
+    run_rows: int,
+    run_dir: str,
+) -> Tuple[List[List[str]], np.ndarray]:
+    """
+    Read chunks of the cohort and spill sorted runs of at most run_rows rows
+    per model to memory-mapped files. Risk scores of 0 and 1 are first moved to
+    0 - e and 1 + e, as in _rectify_model_risk_boundaries.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        Chunks of the cohort containing risk scores and outcome of interest
+    outcome : str
+        Column name of outcome of interest in each chunk
+    modelnames : list[str]
+        Column names that contain model risk scores
+    run_rows : int
+        Rows per sorted run
+    run_dir : str
+        Directory to write the runs to
+
+    Returns
+    -------
+    tuple
+        Paths of the runs of each model, and the number of rows, events and
+        non-events read
+    """
+
+    machine_epsilon = sys.float_info.epsilon
+    run_paths = [[] for _ in modelnames]
+    totals = np.zeros(3, dtype=np.int64)
+    buffered_scores = []
+    buffered_codes = []
+    num_buffered = 0
+
+    def spill():
+        scores = np.concatenate(buffered_scores)
+        outcome_codes = np.concatenate(buffered_codes)
+        for i in range(len(modelnames)):
+            path = os.path.join(run_dir, f"run_{i}_{len(run_paths[i])}.npy")
+            if _write_sorted_run(scores[:, i], outcome_codes, path):
+                run_paths[i].append(path)
+        buffered_scores.clear()
+        buffered_codes.clear()
+
+    for chunk in chunks:
+        for start in range(0, len(chunk.index), run_rows):
+            piece = chunk.iloc[start : start + run_rows]
+            events = piece[outcome].isin([True]).to_numpy()
+            nonevents = piece[outcome].isin([False]).to_numpy()
+            totals += [len(piece.index), events.sum(), nonevents.sum()]
+
+            scores = piece[modelnames].to_numpy(dtype=float)
+            scores = np.where(scores == 0, 0 - machine_epsilon, scores)
+            scores = np.where(scores == 1, 1 + machine_epsilon, scores)
+            outcome_codes = np.full(len(piece.index), OUTCOME_MISSING, dtype=np.int8)
+            outcome_codes[events] = OUTCOME_EVENT
+            outcome_codes[nonevents] = OUTCOME_NONEVENT
+
+            if num_buffered + len(piece.index) > run_rows:
+                spill()
+                num_buffered = 0
+            buffered_scores.append(scores)
+            buffered_codes.append(outcome_codes)
+            num_buffered += len(piece.index)
+
+    if num_buffered:
+        spill()
+
+    return run_paths, totals
+
+
+def _calc_block_level_table(
+    scores: np.ndarray, outcome_codes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collapse an ascending block of merged scores into distinct score levels.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        Ascending risk scores
+    outcome_codes : np.ndarray
+        Outcome code of each score
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Distinct score levels and the number of rows, events and non-events at
+        each level
+    """
+
+    starts = np.flatnonzero(np.r_[True, scores[1:] != scores[:-1]])
+
+    def level_counts(mask):
+        return np.add.reduceat(mask.astype(np.int64), starts)
+
+    return (
+        scores[starts],
+        np.diff(np.r_[starts, len(scores)]),
+        level_counts(outcome_codes == OUTCOME_EVENT),
+        level_counts(outcome_codes == OUTCOME_NONEVENT),
+    )
+
+
+def _merge_runs_to_level_table(
+    run_paths: List[str], block_rows: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    k-way merge sorted runs block by block into a table of distinct score
+    levels. Each step reads up to block_rows rows from every unfinished run and
+    emits all rows at or below the smallest block maximum, which no later block
+    can undercut, so the level table grows in ascending order.
+
+    Parameters
+    ----------
+    run_paths : list[str]
+        Memory-mapped sorted runs written by _write_sorted_run
+    block_rows : int
+        Rows read from each run per step
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Ascending distinct score levels and the number of rows, events and
+        non-events at each level
+    """
+
+    runs = [np.load(path, mmap_mode="r") for path in run_paths]
+    positions = [0] * len(runs)
+    level_tables = []
+
+    while True:
+        blocks = [
+            (i, run[positions[i] : positions[i] + block_rows])
+            for i, run in enumerate(runs)
+            if positions[i] < len(run)
+        ]
+        if not blocks:
+            break
+
+        cut = min(block["score"][-1] for _, block in blocks)
+        emitted = []
+        for i, block in blocks:
+            num_emitted = np.searchsorted(block["score"], cut, side="right")
+            emitted.append(np.asarray(block[:num_emitted]))
+            positions[i] += num_emitted
+
+        merged = np.concatenate(emitted)
+        merged = merged[np.argsort(merged["score"], kind="stable")]
+        levels, totals, events, nonevents = _calc_block_level_table(
+            merged["score"], merged["outcome"]
+        )
+
+        if level_tables and level_tables[-1][0][-1] == levels[0]:
+            # The previous step ended on the same score; fold it into one level
+            previous = level_tables[-1]
+            for counts, previous_counts in zip(
+                (totals, events, nonevents), previous[1:]
+            ):
+                counts[0] += previous_counts[-1]
+            level_tables[-1] = tuple(table[:-1] for table in previous)
+        level_tables.append((levels, totals, events, nonevents))
+
+    del runs
+
+    if not level_tables:
+        return tuple(np.empty(0, dtype=dtype) for dtype in [float] + [np.int64] * 3)
+
+    return tuple(np.concatenate(table) for table in zip(*level_tables))
+
+
+def _calc_external_level_tables(
+    chunks: Iterable[pd.DataFrame],
+    outcome: str,
+    modelnames: list,
+    memory_limit: int = EXTERNAL_MEMORY_LIMIT,
+    temp_dir: Optional[str] = None,
+) -> Tuple[list, np.ndarray]:
+    """
+    Build the exact distinct score level table of each model by external sort,
+    holding at most about memory_limit bytes of rows in memory at a time.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        Chunks of the cohort containing risk scores and outcome of interest
+    outcome : str
+        Column name of outcome of interest in each chunk
+    modelnames : list[str]
+        Column names that contain model risk scores
+    memory_limit : int
+        Approximate ceiling, in bytes, for rows held in memory while sorting
+        and merging
+    temp_dir : str
+        Directory for the temporary run files, defaults to the system's
+
+    Returns
+    -------
+    tuple
+        Level tables (levels, rows, events, non-events) for each model and the
+        number of rows, events and non-events read
+    """
+
+    run_rows = memory_limit // (EXTERNAL_ROW_BYTES * (len(modelnames) + 1))
+    if run_rows < 1:
+        raise ValueError("memory_limit is too small to hold a single row")
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+        run_paths, totals = _spill_sorted_runs(
+            chunks=chunks,
+            outcome=outcome,
+            modelnames=modelnames,
+            run_rows=run_rows,
+            run_dir=run_dir,
+        )
+
+        level_tables = []
+        for model_run_paths in run_paths:
+            block_rows = max(
+                1,
+                memory_limit // (EXTERNAL_ROW_BYTES * max(1, len(model_run_paths))),
+            )
+            level_tables.append(
+                _merge_runs_to_level_table(model_run_paths, block_rows=block_rows)
+            )
+
+    return level_tables, totals
+
+
+def dca_external(
+    chunks: Iterable[pd.DataFrame],
+    outcome: str,
+    modelnames: list,
+    harm: Optional[dict] = None,
+    prevalence: Optional[Union[float, int]] = None,
+    nper: Optional[int] = 1,
+    memory_limit: int = EXTERNAL_MEMORY_LIMIT,
+    temp_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Perform exact binary decision curve analysis at every distinct risk score,
+    as dca(..., thresholds='all') does, for cohorts that do not fit in memory.
+    Chunks are spilled as sorted runs of (score, outcome) to temporary
+    memory-mapped files, and the runs of each model are k-way merged block by
+    block into cumulative counts per distinct score. Results are identical to
+    dca(..., thresholds='all') on the concatenated chunks; only the returned
+    table itself (one row per distinct score and model) must fit in memory.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        Chunks of the cohort, each containing risk scores (scores ranging from 0
+        to 1) and the outcome of interest
+    outcome : str
+        Column name of outcome of interest in each chunk
+    modelnames : list[str]
+        Column names that contain model risk scores
+    harm : dict[float]
+        Models with their associated harm values
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    memory_limit : int
+        Approximate ceiling, in bytes, for rows held in memory while sorting
+        and merging (default 256 MiB)
+    temp_dir : str
+        Directory for the temporary run files, defaults to the system's
+
+    Returns
+    -------
+    pd.DataFrame
+        Data containing net benefit and interventions avoided scores to be plotted
+        against threshold values
+
+    Examples
+    --------
+    from dcurves import dca_external
+
+    import pandas as pd
+
+    |
+
+    dca_results = \
+        dca_external(
+            chunks=pd.read_csv('cohort.csv', chunksize=1_000_000),
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            memory_limit=2**30
+        )
+
+    """
+
+    level_tables, (num_rows, num_events, num_nonevents) = _calc_external_level_tables(
+        chunks=chunks,
+        outcome=outcome,
+        modelnames=modelnames,
+        memory_limit=memory_limit,
+        temp_dir=temp_dir,
+    )
+    if num_rows == 0:
+        raise ValueError("chunks must contain at least one row")
+
+    levels = np.concatenate([level_table[0] for level_table in level_tables])
+    thresholds = np.union1d([0.0], levels[(levels >= 0) & (levels < 1)]).tolist()
+
+    prevalence_value = (
+        float(prevalence) if prevalence is not None else float(num_events / num_rows)
+    )
+
+    model_counts = _calc_level_counts_matrix(level_tables, thresholds=thresholds)
+    rates = _calc_rates_from_counts(
+        model_counts=model_counts,
+        totals=(num_rows, num_events, num_nonevents),
+        thresholds=thresholds,
+        prevalence_value=prevalence_value,
+    )
+
+    # Same keyword arguments as the other callers of _calc_stats_from_rates
+    # pylint: disable=duplicate-code
+    final_dca_df = _calc_stats_from_rates(
+        rates=rates,
+        modelnames=modelnames,
+        thresholds=thresholds,
+        input_df_rownum=num_rows,
+        prevalence_value=prevalence_value,
+        harm=harm,
+        nper=nper,
+    )
+
+    return final_dca_df
@@ -0,0 +1,524 @@
+"""
+This module houses the functions used to run several binary DCA analyses on the
+same cohort in shared passes, as DCAPlan does: risk scores are assigned to
+threshold bins once, every subgroup is counted in a single np.bincount by
+offsetting its bins, and each bootstrap replicate is one more weighted count
+over the same bins.
+"""
+
+from typing import Optional, Tuple, Union, Iterable, Mapping
+import numpy as np
+import pandas as pd
+
+from .columns import _column_names, _select_columns
+from .risks import _create_risks_df, _rectify_thresholds
+from .benefit import _calc_net_benefit, _calc_threshold_odds
+from .stats import _calc_distinct_thresholds, _calc_harm_matrix, _calc_stats_from_rates
+from .streaming import _calc_bin_count_rates
+from .engines import _calc_threshold_bins
+
+
+def _calc_group_bin_counts(
+    bins: np.ndarray,
+    group_codes: np.ndarray,
+    num_groups: int,
+    num_bins: int,
+    events: np.ndarray,
+    nonevents: np.ndarray,
+    row_weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count all rows, events and non-events per threshold bin for every model
+    and subgroup at once.
+
+    Parameters
+    ----------
+    bins : np.ndarray
+        Threshold bin of each risk score, of shape (models, rows), as assigned
+        by _calc_threshold_bins
+    group_codes : np.ndarray
+        Subgroup of each row, from 0 to num_groups - 1, or -1 to leave a row out
+    num_groups : int
+        Number of subgroups
+    num_bins : int
+        Number of threshold bins (thresholds + 1)
+    events : np.ndarray
+        Boolean mask of rows where the outcome occurred
+    nonevents : np.ndarray
+        Boolean mask of rows where the outcome did not occur
+    row_weights : np.ndarray
+        Weight of each row, e.g. bootstrap resampling counts; counts become sums
+        of weights
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Bin counts of shape (groups, 3, models, thresholds + 1) for all rows,
+        events and non-events, and totals of shape (groups, 3)
+    """
+
+    num_models = bins.shape[0]
+    in_group = group_codes >= 0
+    offset_bins = (
+        bins
+        + (np.arange(num_models) * num_bins)[:, None]
+        + (group_codes * num_models * num_bins)[None, :]
+    )
+
+    def count(mask):
+        mask = mask & in_group
+        masked_bins = offset_bins[:, mask]
+        bin_weights = None
+        if row_weights is not None:
+            bin_weights = np.broadcast_to(row_weights[mask], masked_bins.shape).ravel()
+        bin_counts = np.bincount(  # pylint: disable=too-many-function-args
+            masked_bins.ravel(),
+            weights=bin_weights,
+            minlength=num_groups * num_models * num_bins,
+        ).reshape(num_groups, num_models, num_bins)
+        totals = np.bincount(
+            group_codes[mask],
+            weights=None if row_weights is None else row_weights[mask],
+            minlength=num_groups,
+        )
+        return bin_counts, totals
+
+    all_rows, events, nonevents = (
+        count(np.ones(len(group_codes), dtype=bool)),
+        count(np.asarray(events, dtype=bool)),
+        count(np.asarray(nonevents, dtype=bool)),
+    )
+
+    return (
+        np.stack([all_rows[0], events[0], nonevents[0]], axis=1),
+        np.stack([all_rows[1], events[1], nonevents[1]], axis=1),
+    )
+
+
+def _calc_bootstrap_counts(
+    group_codes: np.ndarray, num_groups: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draw one bootstrap replicate as resampling counts per row, resampling rows
+    with replacement within each subgroup.
+
+    Parameters
+    ----------
+    group_codes : np.ndarray
+        Subgroup of each row, or -1 for rows left out
+    num_groups : int
+        Number of subgroups
+    rng : np.random.Generator
+        Random generator
+
+    Returns
+    -------
+    np.ndarray
+        Number of times each row is drawn (int64)
+    """
+
+    resample_counts = np.zeros(len(group_codes), dtype=np.int64)
+    for group in range(num_groups):
+        rows = np.flatnonzero(group_codes == group)
+        resample_counts[rows] = rng.multinomial(
+            len(rows), np.full(len(rows), 1 / len(rows))
+        )
+
+    return resample_counts
+
+
+class DCAPlan:
+    """
+    Lazy builder for several binary decision curve analyses on the same
+    cohort. Models, subgroups, bootstrap confidence intervals and smoothed
+    curves are only recorded until collect(), which prepares risk scores once
+    (_create_risks_df on the needed columns only), assigns every risk score to
+    its threshold bin once, and then counts every model and subgroup together
+    in a single weighted pass over the bins, plus one pass per bootstrap
+    replicate. Prevalence is read from the same counts. Without by(),
+    bootstrap() or smooth() the result equals dca().
+
+    Parameters
+    ----------
+    data : pd.DataFrame, Mapping, np.ndarray, pyarrow.Table or polars.DataFrame
+        Initial raw data ideally containing risk scores (scores ranging from 0
+        to 1), or else predictor/model values, and outcome of interest, of any
+        kind accepted by dca()
+    outcome : str
+        Column name of outcome of interest in data
+    thresholds : Iterable or str
+        Threshold values (x values) at which net benefit and net interventions
+        avoided will be calculated, or 'all' to evaluate at every distinct
+        predicted risk in [0, 1) among the model columns
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations; used for every subgroup
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    weights : str
+        Column name in data containing sample weights
+
+    Examples
+    --------
+    from dcurves import DCAPlan
+
+    |
+
+    dca_results = \
+        DCAPlan(data=df, outcome='cancer') \
+        .models(['cancerpredmarker', 'marker'], models_to_prob=['marker']) \
+        .by('famhistory') \
+        .bootstrap(n_boot=200, random_state=1) \
+        .smooth(window=5) \
+        .collect()
+
+    """
+
+    data: Union[
+        pd.DataFrame, Mapping, np.ndarray, "pyarrow.Table", "polars.DataFrame"
+    ]
+    outcome: str
+    thresholds: Union[list, str]
+    prevalence: Optional[Union[float, int]]
+    nper: Optional[int]
+    weights: Optional[str]
+    modelnames: list
+    models_to_prob: list
+    harm: dict
+    group_columns: list
+    n_boot: int
+    alpha: float
+    random_state: Optional[Union[int, np.random.Generator]]
+    smooth_window: Optional[int]
+
+    def __init__(
+        self,
+        data: Union[
+            pd.DataFrame, Mapping, np.ndarray, "pyarrow.Table", "polars.DataFrame"
+        ],
+        outcome: str,
+        thresholds: Union[Iterable, str] = [i / 100 for i in range(0, 100)],
+        prevalence: Optional[Union[float, int]] = None,
+        nper: Optional[int] = 1,
+        weights: Optional[str] = None,
+    ):
+        """
+        Start a plan without models; see the class docstring for the
+        parameters.
+        """
+
+        if isinstance(thresholds, str) and thresholds != "all":
+            raise ValueError(
+                "thresholds must be an iterable of threshold values or 'all'"
+            )
+
+        self.data = data
+        self.outcome = outcome
+        self.thresholds = thresholds if isinstance(thresholds, str) else list(thresholds)
+        self.prevalence = prevalence
+        self.nper = nper
+        self.weights = weights
+        self.modelnames = []
+        self.models_to_prob = []
+        self.harm = {}
+        self.group_columns = []
+        self.n_boot = 0
+        self.alpha = 0.05
+        self.random_state = None
+        self.smooth_window = None
+
+    def models(
+        self,
+        modelnames: list,
+        models_to_prob: Optional[list] = None,
+        harm: Optional[dict] = None,
+    ) -> "DCAPlan":
+        """
+        Add models to the plan; models already added are not repeated.
+
+        Parameters
+        ----------
+        modelnames : list[str]
+            Column names from data that contain model risk scores or values
+        models_to_prob : list[str]
+            Columns that need to be converted to risk scores from 0 to 1, fitted
+            once on the full data
+        harm : dict[float]
+            Models with their associated harm values
+
+        Returns
+        -------
+        DCAPlan
+            This plan, updated in place
+        """
+
+        if isinstance(modelnames, str):
+            modelnames = [modelnames]
+        column_names = _column_names(self.data)
+        for modelname in list(modelnames) + list(models_to_prob or []):
+            if modelname not in column_names:
+                raise ValueError("model column not found in data: " + str(modelname))
+        self.modelnames += [
+            modelname for modelname in modelnames if modelname not in self.modelnames
+        ]
+        self.models_to_prob += [
+            modelname
+            for modelname in models_to_prob or []
+            if modelname not in self.models_to_prob
+        ]
+        self.harm.update(harm or {})
+
+        return self
+
+    def by(self, *columns: str) -> "DCAPlan":
+        """
+        Calculate curves separately within each subgroup of one or more columns.
+        Rows with a missing subgroup value are left out.
+
+        Parameters
+        ----------
+        columns : str
+            Column names in data defining the subgroups
+
+        Returns
+        -------
+        DCAPlan
+            This plan, updated in place
+        """
+
+        column_names = _column_names(self.data)
+        for column in columns:
+            if column not in column_names:
+                raise ValueError("subgroup column not found in data: " + str(column))
+            if column not in self.group_columns:
+                self.group_columns.append(column)
+
+        return self
+
+    def bootstrap(
+        self,
+        n_boot: int = 200,
+        alpha: float = 0.05,
+        random_state: Optional[Union[int, np.random.Generator]] = None,
+    ) -> "DCAPlan":
+        """
+        Add percentile bootstrap confidence intervals for net benefit. Rows are
+        resampled with replacement within each subgroup, and each replicate is
+        counted from the shared threshold bins weighted by how often each row
+        was drawn, so no resampled copy of the data is made.
+
+        Parameters
+        ----------
+        n_boot : int
+            Number of bootstrap replicates
+        alpha : float
+            Confidence intervals cover 1 - alpha
+        random_state : int or np.random.Generator
+            Seed or generator used to draw the replicates
+
+        Returns
+        -------
+        DCAPlan
+            This plan, updated in place
+        """
+
+        if n_boot < 1 or not 0 < alpha < 1:
+            raise ValueError("n_boot must be at least 1 and alpha in (0, 1)")
+
+        self.n_boot = int(n_boot)
+        self.alpha = alpha
+        self.random_state = random_state
+
+        return self
+
+    def smooth(self, window: int = 5) -> "DCAPlan":
+        """
+        Add a net_benefit_smooth column holding the centered moving average of
+        net benefit over window consecutive threshold values.
+
+        Parameters
+        ----------
+        window : int
+            Number of threshold values averaged
+
+        Returns
+        -------
+        DCAPlan
+            This plan, updated in place
+        """
+
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        self.smooth_window = int(window)
+
+        return self
+
+    def collect(self) -> pd.DataFrame:
+        """
+        Run the plan.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data containing net benefit and interventions avoided scores to be
+            plotted against threshold values, led by the subgroup columns when
+            by() was used, with net_benefit_lower/net_benefit_upper when
+            bootstrap() was used and net_benefit_smooth when smooth() was used
+        """
+
+        if not self.modelnames:
+            raise ValueError("add at least one model with models()")
+
+        outcome = self.outcome
+        modelnames = list(self.modelnames)
+        columns = list(
+            dict.fromkeys(
+                [outcome]
+                + modelnames
+                + self.models_to_prob
+                + self.group_columns
+                + ([self.weights] if self.weights is not None else [])
+            )
+        )
+        risks_df = _create_risks_df(
+            data=_select_columns(data=self.data, columns=columns),
+            outcome=outcome,
+            models_to_prob=self.models_to_prob or None,
+        )
+
+        thresholds = self.thresholds
+        if isinstance(thresholds, str):
+            thresholds = _calc_distinct_thresholds(
+                risks_df=risks_df, modelnames=modelnames
+            )
+        sorted_thresholds = np.sort(np.asarray(thresholds, dtype=float))
+
+        if self.group_columns:
+            grouped = risks_df.groupby(self.group_columns, sort=True)
+            group_codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+            group_keys = list(grouped.size().index)
+        else:
+            group_codes = np.zeros(len(risks_df.index), dtype=np.int64)
+            group_keys = [None]
+        num_groups = len(group_keys)
+        num_bins = len(sorted_thresholds) + 1
+
+        bins = _calc_threshold_bins(
+            risks_df[modelnames].to_numpy(dtype=float).T,
+            _rectify_thresholds(sorted_thresholds),
+        )
+        events = risks_df[outcome].isin([True]).to_numpy()
+        nonevents = risks_df[outcome].isin([False]).to_numpy()
+        row_weights = (
+            None
+            if self.weights is None
+            else risks_df[self.weights].to_numpy(dtype=float)
+        )
+        group_rows = np.bincount(group_codes[group_codes >= 0], minlength=num_groups)
+
+        bin_counts, totals = _calc_group_bin_counts(
+            bins=bins,
+            group_codes=group_codes,
+            num_groups=num_groups,
+            num_bins=num_bins,
+            events=events,
+            nonevents=nonevents,
+            row_weights=row_weights,
+        )
+
+        group_dfs = []
+        for group, group_key in enumerate(group_keys):
+            rates, prevalence_value = _calc_bin_count_rates(
+                bin_counts=bin_counts[group],
+                totals=totals[group],
+                thresholds=thresholds,
+                prevalence=self.prevalence,
+            )
+            group_df = _calc_stats_from_rates(
+                rates=rates,
+                modelnames=modelnames,
+                thresholds=thresholds,
+                input_df_rownum=int(group_rows[group]),
+                prevalence_value=prevalence_value,
+                harm=self.harm or None,
+                nper=self.nper,
+            )
+            if self.group_columns:
+                keys = group_key if isinstance(group_key, tuple) else (group_key,)
+                for position, (column, key) in enumerate(
+                    zip(self.group_columns, keys)
+                ):
+                    group_df.insert(position, column, key)
+            group_dfs.append(group_df)
+
+        if self.n_boot:
+            rng = np.random.default_rng(self.random_state)
+            harm_matrix = _calc_harm_matrix(
+                harm=self.harm,
+                modelnames=modelnames + ["all", "none"],
+                num_thresholds=len(thresholds),
+            )
+            odds = _calc_threshold_odds(thresholds)
+            boot_net_benefit = np.empty(
+                (self.n_boot, num_groups, len(modelnames) + 2, len(thresholds))
+            )
+            for replicate in range(self.n_boot):
+                resample_counts = _calc_bootstrap_counts(
+                    group_codes=group_codes, num_groups=num_groups, rng=rng
+                )
+                boot_bin_counts, boot_totals = _calc_group_bin_counts(
+                    bins=bins,
+                    group_codes=group_codes,
+                    num_groups=num_groups,
+                    num_bins=num_bins,
+                    events=events,
+                    nonevents=nonevents,
+                    row_weights=(
+                        resample_counts
+                        if row_weights is None
+                        else resample_counts * row_weights
+                    ),
+                )
+                for group in range(num_groups):
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        rates = _calc_bin_count_rates(
+                            bin_counts=boot_bin_counts[group],
+                            totals=boot_totals[group],
+                            thresholds=thresholds,
+                            prevalence=self.prevalence,
+                        )[0]
+                    _calc_net_benefit(
+                        tp_rate=rates[1],
+                        fp_rate=rates[2],
+                        harm=harm_matrix,
+                        odds=odds,
+                        out=boot_net_benefit[replicate, group],
+                    )
+
+            with np.errstate(invalid="ignore"):
+                lower, upper = np.nanpercentile(
+                    boot_net_benefit,
+                    [100 * self.alpha / 2, 100 * (1 - self.alpha / 2)],
+                    axis=0,
+                )
+            for group, group_df in enumerate(group_dfs):
+                group_df["net_benefit_lower"] = lower[group].ravel()
+                group_df["net_benefit_upper"] = upper[group].ravel()
+
+        final_dca_df = pd.concat(group_dfs, ignore_index=True)
+
+        if self.smooth_window is not None:
+            curve_columns = self.group_columns + ["model"]
+            final_dca_df["net_benefit_smooth"] = (
+                final_dca_df.sort_values(curve_columns + ["threshold"])
+                .groupby(curve_columns, sort=False)["net_benefit"]
+                .transform(
+                    lambda net_benefit: net_benefit.rolling(
+                        self.smooth_window, center=True, min_periods=1
+                    ).mean()
+                )
+            )
+
+        return final_dca_df
@@ -0,0 +1,242 @@
+"""
+This module houses the functions used to pick an execution strategy for dca()
+when engine='auto': a rough cost model estimates the time and memory of each
+stage (preparing risk scores, counting, building the output table) for every
+strategy from the number of rows, models and thresholds and the outcome type,
+and the fastest strategy that fits the memory budget is chosen.
+"""
+
+from typing import Optional
+import pandas as pd
+
+from .compact import COMPACT_BLOCK_ROWS
+from .external import EXTERNAL_MEMORY_LIMIT
+
+# Strategies in order of preference when estimates tie
+STRATEGIES = ["sort", "binned", "compact", "chunked", "loop", "external"]
+
+# Rough per-unit costs. They were checked by timing dca() with each strategy
+# on 10**6 rows, 3 models and 100 thresholds on one core of an x86-64 Xeon
+# (numpy 2.4, pandas 2.3), where the estimates were within about 30% of the
+# measured times. Only their ratios decide the strategy; they are read on
+# every call, so another machine can be calibrated by assigning to them
+# (e.g. dcurves.planner.SECONDS_PER_SORTED_SCORE)
+SECONDS_PER_PREPARED_CELL = 1.5e-8
+SECONDS_PER_SORTED_SCORE = 2.4e-7
+SECONDS_PER_BINNED_SCORE = 1.0e-7
+SECONDS_PER_COMPACT_SCORE = 1.5e-7
+SECONDS_PER_CHUNKED_SCORE = 1.4e-7
+SECONDS_PER_EXTERNAL_SCORE = 5.0e-7
+SECONDS_PER_LOOP_COMPARISON = 2.0e-8
+SECONDS_PER_OUTPUT_ROW = 1.5e-6
+
+# Bytes per element held while each stage runs, including temporaries
+BYTES_PER_PREPARED_CELL = 24
+BYTES_PER_SORTED_SCORE = 24
+BYTES_PER_BINNED_SCORE = 24
+BYTES_PER_CHUNKED_CELL = 32
+BYTES_PER_OUTPUT_ROW = 96
+
+# Rows per chunk for the chunked strategy when there is no memory budget
+CHUNKED_DEFAULT_ROWS = 1 << 20
+
+
+def _calc_chunk_rows(num_models: int, memory_limit: Optional[int] = None) -> int:
+    """
+    Get the number of rows per chunk for the chunked strategy, leaving half of
+    the memory budget for the output table.
+
+    Parameters
+    ----------
+    num_models : int
+        Number of model columns
+    memory_limit : int
+        Memory budget in bytes
+
+    Returns
+    -------
+    int
+        Rows per chunk, fitting the memory budget when one is given
+    """
+
+    if memory_limit is None:
+        return CHUNKED_DEFAULT_ROWS
+    return max(1000, memory_limit // (2 * BYTES_PER_CHUNKED_CELL * (num_models + 2)))
+
+
+def _calc_external_memory(memory_limit: Optional[int] = None) -> int:
+    """
+    Get the memory ceiling for the external strategy's sorted runs and merge
+    blocks, leaving half of the memory budget for the output table.
+
+    Parameters
+    ----------
+    memory_limit : int
+        Memory budget in bytes
+
+    Returns
+    -------
+    int
+        Memory ceiling in bytes passed to dca_external
+    """
+
+    if memory_limit is None:
+        return EXTERNAL_MEMORY_LIMIT
+    return memory_limit // 2
+
+
+def _plan_dca(
+    num_rows: int,
+    num_models: int,
+    num_thresholds: Optional[int],
+    survival: bool = False,
+    memory_limit: Optional[int] = None,
+    models_to_prob: bool = False,
+    weights: bool = False,
+) -> pd.DataFrame:
+    """
+    Estimate the time and memory of each stage of every strategy and choose
+    the fastest supported strategy within the memory budget.
+
+    Parameters
+    ----------
+    num_rows : int
+        Number of rows in the data
+    num_models : int
+        Number of model columns
+    num_thresholds : int
+        Number of threshold values, or None for thresholds='all' (estimated as
+        one per row)
+    survival : bool
+        Whether the outcome is a survival outcome
+    memory_limit : int
+        Memory budget in bytes, on top of the input data
+    models_to_prob : bool
+        Whether some model columns are converted to risk scores
+    weights : bool
+        Whether sample weights are used
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per strategy and stage with estimated seconds and bytes, whether
+        the strategy is supported and fits the budget, and which was chosen
+    """
+
+    all_thresholds = num_thresholds is None
+    n, m = num_rows, num_models
+    t = n if all_thresholds else num_thresholds
+    chunk_rows = min(n, _calc_chunk_rows(m, memory_limit))
+    external_memory = _calc_external_memory(memory_limit)
+
+    prepare = (
+        n * (m + 2) * SECONDS_PER_PREPARED_CELL,
+        n * (m + 2) * BYTES_PER_PREPARED_CELL,
+    )
+    no_prepare = (0.0, 0)
+    output = ((m + 2) * t * SECONDS_PER_OUTPUT_ROW, (m + 2) * t * BYTES_PER_OUTPUT_ROW)
+
+    stages = {
+        "sort": [
+            prepare,
+            (m * n * SECONDS_PER_SORTED_SCORE, m * (n + t) * BYTES_PER_SORTED_SCORE),
+        ],
+        "binned": [
+            prepare,
+            (m * n * SECONDS_PER_BINNED_SCORE, m * n * BYTES_PER_BINNED_SCORE),
+        ],
+        "compact": [
+            no_prepare,
+            (
+                m * n * SECONDS_PER_COMPACT_SCORE,
+                2 * m * n + n // 4 + COMPACT_BLOCK_ROWS * BYTES_PER_BINNED_SCORE,
+            ),
+        ],
+        "chunked": [
+            no_prepare,
+            (
+                m * n * SECONDS_PER_CHUNKED_SCORE,
+                chunk_rows * (m + 2) * BYTES_PER_CHUNKED_CELL,
+            ),
+        ],
+        "loop": [
+            prepare,
+            (m * t * n * SECONDS_PER_LOOP_COMPARISON, n * BYTES_PER_PREPARED_CELL),
+        ],
+        "external": [
+            no_prepare,
+            (m * n * SECONDS_PER_EXTERNAL_SCORE, external_memory),
+        ],
+    }
+
+    supported = {
+        "sort": not survival,
+        "binned": not survival,
+        "compact": not survival and not all_thresholds,
+        "chunked": not survival and not all_thresholds and not models_to_prob,
+        "loop": True,
+        "external": (
+            not survival and all_thresholds and not models_to_prob and not weights
+        ),
+    }
+
+    plan = pd.DataFrame(
+        [
+            {
+                "strategy": strategy,
+                "stage": stage,
+                "est_seconds": seconds,
+                "est_memory_bytes": int(memory),
+            }
+            for strategy in STRATEGIES
+            for stage, (seconds, memory) in zip(
+                ["prepare", "count", "output"], stages[strategy] + [output]
+            )
+        ]
+    )
+    plan["supported"] = plan["strategy"].map(supported)
+
+    totals = plan.groupby("strategy", sort=False)[
+        ["est_seconds", "est_memory_bytes"]
+    ].sum()
+    fits = (
+        pd.Series(True, index=totals.index)
+        if memory_limit is None
+        else totals["est_memory_bytes"] <= memory_limit
+    )
+    plan["fits_memory"] = plan["strategy"].map(fits)
+
+    candidates = totals[[supported[strategy] for strategy in totals.index]]
+    fitting = candidates[fits[candidates.index]]
+    if len(fitting.index):
+        chosen = fitting["est_seconds"].idxmin()
+    elif "external" in candidates.index:
+        # Nothing fits; external sort is built for cohorts beyond the budget
+        chosen = "external"
+    else:
+        fallback = candidates
+        if all_thresholds and len(candidates.index) > 1:
+            # 'loop' makes one pass per threshold, i.e. per row here
+            fallback = candidates.drop(index="loop")
+        chosen = fallback["est_memory_bytes"].idxmin()
+    plan["chosen"] = plan["strategy"] == chosen
+
+    return plan
+
+
+def _chosen_strategy(plan: pd.DataFrame) -> str:
+    """
+    Get the strategy chosen in a plan from _plan_dca.
+
+    Parameters
+    ----------
+    plan : pd.DataFrame
+        Output of _plan_dca
+
+    Returns
+    -------
+    str
+        Name of the chosen strategy
+    """
+
+    return str(plan.loc[plan["chosen"], "strategy"].iloc[0])
@@ -15,6 +15,7 @@ def _calc_prevalence(
     prevalence: Optional[Union[int, float]] = None,
     time: Optional[Union[int, float]] = None,
     time_to_outcome_col: Optional[str] = None,
+    weights: Optional[str] = None,
 ) -> float:
     """
     Calculate prevalence value when not supplied for binary and survival DCA cases,
@@ -35,6 +36,9 @@ def _calc_prevalence(
         Time of interest in years, used in Survival DCA
     time_to_outcome_col : str
         Column name of time of interest in risks_df
+    weights : str
+        Column name in risks_df containing sample weights, used to calculate a
+        weighted prevalence (binary) or weighted Kaplan-Meier estimate (survival)
 
     Returns
     -------
@@ -44,13 +48,20 @@ def _calc_prevalence(
     """
 
     if time_to_outcome_col is None:
-        if prevalence is None:
+        if prevalence is None and weights is None:
             prevalence = sum(risks_df[outcome]) / len(risks_df[outcome])
+        elif prevalence is None:
+            row_weights = risks_df[weights]
+            prevalence = (risks_df[outcome] * row_weights).sum() / row_weights.sum()
     else:
         if prevalence is not None:
             raise ValueError("In survival outcomes, prevalence should not be supplied")
 
         kmf = lifelines.KaplanMeierFitter()
-        kmf.fit(risks_df[time_to_outcome_col], risks_df[outcome] * 1)
+        kmf.fit(
+            risks_df[time_to_outcome_col],
+            risks_df[outcome] * 1,
+            weights=None if weights is None else risks_df[weights],
+        )
         prevalence = 1 - kmf.survival_function_at_times(time).iloc[0]
     return float(prevalence)
@@ -0,0 +1,507 @@
+"""
+This module houses the functions used to calculate test positive, true positive
+and false positive rates per threshold value for each model, in the binary and
+survival cases, either with the count engines or one threshold value at a time.
+"""
+
+from typing import Optional, Union, Iterable
+import numpy as np
+import pandas as pd
+import lifelines
+
+from .risks import _add_reference_scores, _rectify_thresholds
+from .engines import (
+    _calc_binary_counts_matrix,
+    _calc_binned_counts_matrix,
+    _calc_level_counts,
+    _calc_level_table,
+    _calc_reference_rates,
+)
+
+
+def _calc_test_pos_rate(
+    risks_df: pd.DataFrame,
+    thresholds: Iterable,
+    model: str,
+    weights: Optional[str] = None,
+) -> pd.Series:
+    """
+    Calculate each test positive rate per threshold value,
+    which will be used to calculate true and false positive rates 
+    per threshold values in the survival DCA case.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores 
+        (scores ranging from 0 to 1 for columns of interest)
+    thresholds : Iterable
+        Threshold values (x values) at which net test positive 
+        rate will be calculated
+    model : str
+        Model column name in risks_df
+    weights : str
+        Column name in risks_df containing sample weights
+
+    Returns
+    -------
+    pd.Series
+        Calculated test positive rates for each threshold value for a model
+    """
+
+    risks_df = _add_reference_scores(risks_df=risks_df, model=model)
+
+    if weights is not None:
+        row_weights = risks_df[weights]
+        return pd.Series(
+            [
+                row_weights[risks_df[model] >= threshold].sum() / row_weights.sum()
+                for threshold in thresholds
+            ]
+        )
+
+    test_pos_rate = []
+
+    for threshold in thresholds:
+        risk_above_thresh_tf_dict = dict(
+            pd.Series(risks_df[model] >= threshold).value_counts()
+        )
+
+        if True not in risk_above_thresh_tf_dict:
+            test_pos_rate.append(0 / len(risks_df.index))
+        elif True in risk_above_thresh_tf_dict:
+            test_pos_rate.append(
+                risk_above_thresh_tf_dict[True] / len(risks_df.index))
+
+    return pd.Series(test_pos_rate)
+
+
+def _calc_risk_rate_among_test_pos(
+    risks_df: pd.DataFrame,
+    outcome: str,
+    model: str,
+    thresholds: Iterable,
+    time: Union[float, int],
+    time_to_outcome_col: str,
+    weights: Optional[str] = None,
+) -> pd.Series:
+    """
+    Calculate the risk rate among test positive cases for each threshold value
+    , which will be used to calculate true and false positive rates per 
+    threshold values in the survival DCA case.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores (scores ranging
+        from 0 to 1 for columns of interest)
+    outcome : str
+        Column name of outcome of interest in risks_df
+    model : str
+        Model column name in risks_df
+    thresholds : Iterable
+        Threshold values (x values) at which risk rate among test positives
+        will be calculated
+    time : int or float
+        Time of interest in years, used in Survival DCA
+    time_to_outcome_col : str
+        Column name containing time to outcome values, used in Survival DCA
+    weights : str
+        Column name in risks_df containing sample weights, used to fit weighted
+        Kaplan-Meier estimates
+
+    Returns
+    -------
+    pd.Series
+        Calculated risk rate among test positive for each threshold value
+    """
+
+    risks_df = _add_reference_scores(risks_df=risks_df, model=model)
+
+    risk_rate_among_test_pos = []
+    kmf = lifelines.KaplanMeierFitter()
+
+    max_time = max(risks_df[time_to_outcome_col])
+    if max_time < time:
+        return [None] * len(thresholds)
+
+    for threshold in thresholds:
+        mask = risks_df[model] >= threshold
+        risk_above_thresh_time = risks_df.loc[mask, time_to_outcome_col].copy()
+        risk_above_thresh_outcome = risks_df.loc[mask, outcome].copy()
+
+        if len(risk_above_thresh_time) == 0 and len(risk_above_thresh_outcome) == 0:
+            risk_rate_among_test_pos.append(0.0)
+        else:
+            kmf.fit(
+                risk_above_thresh_time,
+                risk_above_thresh_outcome * 1,
+                weights=None if weights is None else risks_df.loc[mask, weights],
+            )
+            timeline = max(kmf.timeline)
+            if timeline < time:
+                risk_rate_among_test_pos.append(None)
+            elif timeline >= time:
+                risk_rate_among_test_pos.append(
+                    1 - float(kmf.survival_function_at_times(time).iloc[0])
+                )
+
+    return pd.Series(risk_rate_among_test_pos)
+
+
+def _calc_tp_rate(
+    risks_df: pd.DataFrame,
+    thresholds: Iterable,
+    model: str,
+    outcome: str,
+    test_pos_rate: Optional[pd.Series] = None,
+    prevalence_value: Optional[Union[float, int]] = None,
+    time: Optional[Union[float, int]] = None,
+    time_to_outcome_col: Optional[str] = None,
+    weights: Optional[str] = None,
+) -> pd.Series:
+    """
+    Calculate true positive rates per threshold value in binary and survival DCA cases.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores (scores ranging from 0
+        to 1 for columns of interest)
+    thresholds : Iterable
+        Threshold values (x values) at which true positive rate will be calculated
+    model : str
+        Model column name in risks_df
+    outcome : str
+        Column name of outcome of interest in risks_df
+    test_pos_rate : pd.Series
+        Calculated test positive rates for use in survival calculation of tp_rate
+    prevalence_value : int or float
+        Calculated prevalence value
+    time : int or float
+        Time of interest in years, used in Survival DCA
+    time_to_outcome_col : str
+        Column name in risks_df containing time to outcome values, used in Survival DCA
+    weights : str
+        Column name in risks_df containing sample weights
+
+    Returns
+    -------
+    pd.Series
+        Calculated true positive rate for each threshold value
+    """
+
+    risks_df = _add_reference_scores(risks_df=risks_df, model=model)
+
+    if time_to_outcome_col is not None:
+        risk_rate_among_test_pos = _calc_risk_rate_among_test_pos(
+            risks_df=risks_df,
+            outcome=outcome,
+            model=model,
+            thresholds=thresholds,
+            time_to_outcome_col=time_to_outcome_col,
+            time=time,
+            weights=weights,
+        )
+        tp_rate = risk_rate_among_test_pos * test_pos_rate
+    elif weights is not None:
+        selected_rows = risks_df[risks_df[outcome].isin([True])]
+        row_weights = selected_rows[weights]
+
+        tp_rate = [
+            (row_weights[selected_rows[model] >= threshold].sum() / row_weights.sum())
+            * prevalence_value
+            for threshold in thresholds
+        ]
+    else:
+        selected_rows = risks_df[risks_df[outcome].isin([True])].copy()
+
+        true_outcome = selected_rows[[model]].copy()
+        num_true_outcomes = len(true_outcome[model])
+
+        tp_rate = []
+        for threshold in thresholds:
+            true_tf_above_thresh_count = (
+                (true_outcome[model] >= threshold).value_counts().get(True, 0)
+            )
+            tp_rate.append(
+                (true_tf_above_thresh_count /
+                 num_true_outcomes) * prevalence_value
+            )
+
+    return pd.Series(tp_rate)
+
+
+def _calc_fp_rate(
+    risks_df: pd.DataFrame,
+    thresholds: Iterable,
+    model: str,
+    outcome: str,
+    test_pos_rate: Optional[pd.Series] = None,
+    prevalence_value: Optional[Union[float, int]] = None,
+    time: Optional[Union[float, int]] = None,
+    time_to_outcome_col: Optional[str] = None,
+    weights: Optional[str] = None,
+) -> pd.Series:
+    """
+    Calculate false positive rates per threshold value in binary and survival DCA cases.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores (scores ranging from 0 to
+        1 for columns of interest)
+    thresholds : Iterable
+        Threshold values (x values) at which false positive rate will be calculated
+    model : str
+        Model column name in risks_df
+    outcome : str
+        Column name of outcome of interest in risks_df
+    test_pos_rate : pd.Series
+        Calculated test positive rates for each threshold value for a model
+    prevalence_value : int or float
+        Calculated prevalence value
+    time : int or float
+        Time of interest in years, used in Survival DCA
+    time_to_outcome_col: str
+        Column name of time of interest in risks_df
+    weights : str
+        Column name in risks_df containing sample weights
+    Returns
+    -------
+    pd.Series
+        Calculated false positive rate for each threshold value
+    """
+
+    risks_df = _add_reference_scores(risks_df=risks_df, model=model)
+
+    # Survival
+    if time_to_outcome_col is not None:
+        risk_rate_among_test_pos = _calc_risk_rate_among_test_pos(
+            risks_df=risks_df,
+            outcome=outcome,
+            model=model,
+            thresholds=thresholds,
+            time_to_outcome_col=time_to_outcome_col,
+            time=time,
+            weights=weights,
+        )
+        fp_rate = (1 - risk_rate_among_test_pos) * test_pos_rate
+    # Weighted binary
+    elif weights is not None:
+        selected_rows = risks_df[risks_df[outcome].isin([False])]
+        row_weights = selected_rows[weights]
+
+        fp_rate = [
+            row_weights[selected_rows[model] >= threshold].sum()
+            / row_weights.sum()
+            * (1 - prevalence_value)
+            for threshold in thresholds
+        ]
+    # Binary
+    elif time_to_outcome_col is None:
+        false_outcome = risks_df[risks_df[outcome].isin([False])][[model]]
+
+        fp_rate = []
+        for threshold in thresholds:
+            try:
+                fp_counts = pd.Series(false_outcome[model] >= threshold).value_counts()
+                fp_rate.append(
+                    fp_counts[True] / len(false_outcome[model]) * (1 - prevalence_value)
+                )
+            except KeyError:
+                fp_rate.append(0 / len(false_outcome[model]) * (1 - prevalence_value))
+
+    return pd.Series(fp_rate)
+
+
+def _calc_binary_rates(
+    risks_df: pd.DataFrame,
+    thresholds: Iterable,
+    modelnames: list,
+    outcome: str,
+    prevalence_value: Union[float, int],
+    engine: str = "sort",
+    weights: Optional[str] = None,
+) -> tuple:
+    """
+    Calculate test positive, true positive and false positive rates per threshold
+    value for all models at once in the binary DCA case. With the 'sort' engine,
+    low-cardinality model columns (e.g. dichotomous markers) are collapsed into a
+    table of their distinct levels, and the remaining columns are evaluated in a
+    single column-wise sort. With the 'binned' engine, every column is counted
+    into threshold bins without sorting. Results are identical to those of
+    _calc_test_pos_rate, _calc_tp_rate and _calc_fp_rate.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores (scores ranging from 0
+        to 1 for columns of interest)
+    thresholds : Iterable
+        Threshold values (x values) at which rates will be calculated
+    modelnames : list[str]
+        Model column names in risks_df
+    outcome : str
+        Column name of outcome of interest in risks_df
+    prevalence_value : int or float
+        Calculated prevalence value
+    engine : str
+        Either 'sort' or 'binned'
+    weights : str
+        Column name in risks_df containing sample weights; rates are then
+        calculated from weighted cumulative sums
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Calculated test positive, true positive and false positive rates, each of
+        shape (models, thresholds)
+    """
+
+    events = risks_df[outcome].isin([True]).to_numpy()
+    nonevents = risks_df[outcome].isin([False]).to_numpy()
+    row_weights = None if weights is None else risks_df[weights].to_numpy(dtype=float)
+
+    thresholds = list(thresholds)
+    counts = np.empty(
+        (3, len(modelnames), len(thresholds)),
+        dtype=np.int64 if weights is None else float,
+    )
+
+    if engine == "binned":
+        counts[:] = _calc_binned_counts_matrix(
+            score_matrix=risks_df[modelnames].to_numpy(dtype=float),
+            events=events,
+            nonevents=nonevents,
+            thresholds=thresholds,
+            weights=row_weights,
+        )
+    else:
+        dense_models = []
+        for i, model in enumerate(modelnames):
+            level_table = _calc_level_table(
+                scores=risks_df[model].to_numpy(dtype=float),
+                events=events,
+                nonevents=nonevents,
+                weights=row_weights,
+            )
+            if level_table is None:
+                dense_models.append(i)
+            else:
+                counts[:, i] = _calc_level_counts(*level_table, thresholds=thresholds)
+
+        if dense_models:
+            counts[:, dense_models] = _calc_binary_counts_matrix(
+                score_matrix=risks_df[
+                    [modelnames[i] for i in dense_models]
+                ].to_numpy(dtype=float),
+                events=events,
+                nonevents=nonevents,
+                thresholds=thresholds,
+                weights=row_weights,
+            )
+
+    test_pos, tp, fp = counts
+
+    if weights is None:
+        test_pos_rate = test_pos / len(risks_df.index)
+        tp_rate = (tp / events.sum()) * prevalence_value
+        fp_rate = fp / nonevents.sum() * (1 - prevalence_value)
+    else:
+        test_pos_rate = test_pos / row_weights.sum()
+        tp_rate = (tp / row_weights[events].sum()) * prevalence_value
+        fp_rate = fp / row_weights[nonevents].sum() * (1 - prevalence_value)
+
+    return test_pos_rate, tp_rate, fp_rate
+
+
+def _calc_rate_matrix(
+    risks_df: pd.DataFrame,
+    thresholds: list,
+    modelnames: list,
+    outcome: str,
+    prevalence_value: Union[float, int],
+    time: Optional[Union[float, int]] = None,
+    time_to_outcome_col: Optional[str] = None,
+    engine: str = "sort",
+    weights: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Calculate test positive, true positive and false positive rates per
+    threshold value for several models, without building the output table, and
+    add the 'all' and 'none' references in closed form.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores, compared against
+        _rectify_thresholds so that scores of 0 and 1 need not be rectified
+    thresholds : list[float]
+        Threshold values (x values) at which rates will be calculated
+    modelnames : list[str]
+        Model column names in risks_df
+    outcome : str
+        Column name of outcome of interest in risks_df
+    prevalence_value : int or float
+        Calculated prevalence value
+    time : int or float
+        Time of interest in years, used in Survival DCA
+    time_to_outcome_col : str
+        Column name in risks_df containing time to outcome values, used in
+        Survival DCA
+    engine : str
+        Either 'sort', 'binned' or 'loop', as in _calc_initial_stats
+    weights : str
+        Column name in risks_df containing sample weights
+
+    Returns
+    -------
+    np.ndarray
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and 'none'
+    """
+
+    reference_rates = _calc_reference_rates(thresholds, prevalence_value)
+    comparison_thresholds = _rectify_thresholds(thresholds)
+
+    if time_to_outcome_col is None and engine in ["sort", "binned"]:
+        model_rates = np.stack(
+            _calc_binary_rates(
+                risks_df=risks_df,
+                thresholds=comparison_thresholds,
+                modelnames=modelnames,
+                outcome=outcome,
+                prevalence_value=prevalence_value,
+                engine=engine,
+                weights=weights,
+            )
+        )
+        return np.concatenate([model_rates, reference_rates], axis=1)
+
+    model_rates = np.empty((3, len(modelnames), len(thresholds)))
+    for i, model in enumerate(modelnames):
+        test_pos_rate = _calc_test_pos_rate(
+            risks_df=risks_df,
+            thresholds=comparison_thresholds,
+            model=model,
+            weights=weights,
+        )
+        rate_args = {
+            "risks_df": risks_df,
+            "thresholds": comparison_thresholds,
+            "model": model,
+            "outcome": outcome,
+            "time": time,
+            "time_to_outcome_col": time_to_outcome_col,
+            "test_pos_rate": test_pos_rate,
+            "prevalence_value": prevalence_value,
+            "weights": weights,
+        }
+        model_rates[:, i] = [
+            np.asarray(test_pos_rate, dtype=float),
+            np.asarray(_calc_tp_rate(**rate_args), dtype=float),
+            np.asarray(_calc_fp_rate(**rate_args), dtype=float),
+        ]
+
+    return np.concatenate([model_rates, reference_rates], axis=1)
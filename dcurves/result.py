@@ -0,0 +1,220 @@
+"""
+This module houses DCAResult, the array-backed result of a decision curve
+analysis returned by dca(as_result=True): one (models x thresholds) array per
+metric, with conversion to and from the long table.
+"""
+
+from typing import Union
+import numpy as np
+import pandas as pd
+
+
+# Float types DCAResult.to_frame() can store metric columns in
+OUTPUT_DTYPES = ["float64", "float32"]
+
+
+class DCAResult:
+    """
+    Wide, array-backed decision curve analysis result, as returned by
+    dca(as_result=True). Each metric is held once as a float64 array of shape
+    (models, thresholds) instead of a long table repeating model, n,
+    prevalence and harm on every row; the long table dca() returns is only
+    built when to_frame() is called.
+
+    Parameters
+    ----------
+    modelnames : list[str]
+        Model names, including the 'all' and 'none' references
+    thresholds : np.ndarray
+        Threshold values (x values)
+    n : int
+        Number of rows (or patients) the results were calculated from
+    prevalence : float
+        Calculated prevalence value
+    harm : np.ndarray
+        Harm values of shape (models, thresholds), or one value per model
+    metrics : dict[np.ndarray]
+        Arrays of shape (models, thresholds) keyed by metric name, in the
+        column order of the long table
+
+    Attributes
+    ----------
+    model_index : pd.Index
+        Model names, in the order of the first axis of every metric
+    thresholds : np.ndarray
+        Threshold values, in the order of the second axis of every metric
+    metrics : dict[np.ndarray]
+        Arrays of shape (models, thresholds) keyed by metric name
+
+    Examples
+    --------
+    from dcurves import dca
+
+    |
+
+    dca_result = dca(data=df, outcome='cancer', modelnames=['cancerpredmarker'],
+                     as_result=True)
+    net_benefit = dca_result['net_benefit']
+    dca_results = dca_result.to_frame()
+
+    """
+
+    model_index: pd.Index
+    thresholds: np.ndarray
+    n: Union[int, float]
+    prevalence: Union[float, int]
+    harm: np.ndarray
+    metrics: dict
+
+    def __init__(
+        self,
+        modelnames: list,
+        thresholds: np.ndarray,
+        n: Union[int, float],
+        prevalence: Union[float, int],
+        harm: np.ndarray,
+        metrics: dict,
+    ):
+        """
+        Hold the given arrays as float64; see the class docstring for the
+        parameters.
+        """
+
+        self.model_index = pd.Index(list(modelnames))
+        self.thresholds = np.asarray(thresholds)
+        self.n = n
+        self.prevalence = prevalence
+        self.harm = np.asarray(harm, dtype=float)
+        if self.harm.ndim == 1:
+            self.harm = np.repeat(self.harm[:, None], len(self.thresholds), axis=1)
+        self.metrics = {
+            name: np.asarray(values, dtype=float) for name, values in metrics.items()
+        }
+
+    def __getitem__(self, metric: str) -> np.ndarray:
+        """
+        Get the array of one metric.
+
+        Parameters
+        ----------
+        metric : str
+            Metric name, such as 'net_benefit'
+
+        Returns
+        -------
+        np.ndarray
+            Metric values of shape (models, thresholds)
+        """
+
+        return self.metrics[metric]
+
+    def __repr__(self) -> str:
+        """
+        Summarize the result by its numbers of models and thresholds and its
+        metric names.
+        """
+
+        return (
+            f"DCAResult(models={len(self.model_index)}, "
+            f"thresholds={len(self.thresholds)}, metrics=[{', '.join(self.metrics)}])"
+        )
+
+    @classmethod
+    def from_frame(cls, dca_df: pd.DataFrame) -> "DCAResult":
+        """
+        Build a result from the long table returned by dca() or its variants.
+
+        Parameters
+        ----------
+        dca_df : pd.DataFrame
+            Long table with one row per model and threshold value, the models
+            in consecutive blocks over the same threshold values, as built by
+            to_frame() with or without compact
+
+        Returns
+        -------
+        DCAResult
+            Result holding every column after harm as a metric
+        """
+
+        constants = {
+            name: dca_df[name].iloc[0] if name in dca_df.columns else dca_df.attrs[name]
+            for name in ["n", "prevalence"]
+        }
+        modelnames = list(dca_df["model"].unique())
+        num_thresholds = len(dca_df.index) // len(modelnames)
+        shape = (len(modelnames), num_thresholds)
+        columns = list(dca_df.columns)
+        metric_columns = columns[columns.index("harm") + 1 :]
+
+        return cls(
+            modelnames=modelnames,
+            thresholds=dca_df["threshold"].to_numpy()[:num_thresholds],
+            n=constants["n"],
+            prevalence=constants["prevalence"],
+            harm=dca_df["harm"].to_numpy(dtype=float).reshape(shape),
+            metrics={
+                column: dca_df[column].to_numpy(dtype=float).reshape(shape)
+                for column in metric_columns
+            },
+        )
+
+    def to_frame(self, compact: bool = False, dtype: str = "float64") -> pd.DataFrame:
+        """
+        Build the long table dca() returns.
+
+        Parameters
+        ----------
+        compact : bool
+            If True, store model as a pandas Categorical and keep the run-level
+            constants n and prevalence once in DataFrame.attrs instead of
+            repeating them on every row
+        dtype : str
+            Either 'float64' (default) or 'float32' for the harm and metric
+            columns; threshold values are always kept as given
+
+        Returns
+        -------
+        pd.DataFrame
+            Data containing net benefit and interventions avoided scores to be
+            plotted against threshold values, one row per model and threshold
+        """
+
+        if dtype not in OUTPUT_DTYPES:
+            raise ValueError("dtype must be one of: " + ", ".join(OUTPUT_DTYPES))
+
+        num_models = len(self.model_index)
+        num_thresholds = len(self.thresholds)
+        num_rows = num_models * num_thresholds
+
+        if compact:
+            model_column = pd.Categorical.from_codes(
+                np.repeat(np.arange(num_models), num_thresholds),
+                categories=self.model_index,
+            )
+            constant_columns = {}
+        else:
+            model_column = np.repeat(
+                self.model_index.to_numpy(dtype=object), num_thresholds
+            )
+            constant_columns = {
+                "n": np.full(num_rows, self.n),
+                "prevalence": np.full(num_rows, self.prevalence, dtype=float),
+            }
+
+        dca_df = pd.DataFrame(
+            {
+                "model": model_column,
+                "threshold": np.tile(self.thresholds, num_models),
+                **constant_columns,
+                "harm": self.harm.ravel().astype(dtype),
+                **{
+                    name: values.ravel().astype(dtype)
+                    for name, values in self.metrics.items()
+                },
+            }
+        )
+        if compact:
+            dca_df.attrs.update({"n": self.n, "prevalence": self.prevalence})
+
+        return dca_df
@@ -5,13 +5,23 @@ from dca.py to disperse the code and make clear its individual
 dependencies.
 """
 import sys
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
+import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 import lifelines
 
+from .columns import _select_columns
 
-def _calc_binary_risks(data: pd.DataFrame, outcome: str, model: str) -> list:
+# Constant risk scores of the 'all' and 'none' reference strategies, after
+# rectification (see _rectify_model_risk_boundaries)
+REFERENCE_SCORES = {
+    "all": 1 + sys.float_info.epsilon,
+    "none": 0 - sys.float_info.epsilon,
+}
+
+
+def _calc_binary_risks(data: pd.DataFrame, outcome: str, model: str) -> np.ndarray:
     """
     Calculate Risks For a Model Column for binary DCA.
 
@@ -27,15 +37,15 @@ def _calc_binary_risks(data: pd.DataFrame, outcome: str, model: str) -> list:
 
     Returns
     -------
-    list[float]
-        list of predicted risk scores for a model column
+    np.ndarray
+        Predicted risk scores for a model column
     """
     predicted_vals = (
         sm.formula.glm(outcome + "~" + model, family=sm.families.Binomial(), data=data)
         .fit()
         .predict()
     )
-    return list(predicted_vals)
+    return np.asarray(predicted_vals, dtype=float)
 
 
 def _calc_surv_risks(
@@ -76,6 +86,54 @@ def _calc_surv_risks(
     return list(predicted_vals)
 
 
+def _select_risk_columns(
+    data: pd.DataFrame,
+    outcome: str,
+    modelnames: list,
+    models_to_prob: Optional[list] = None,
+    time_to_outcome_col: Optional[str] = None,
+    weights: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Project data onto the columns a decision curve analysis reads, so that
+    later steps never touch the unrelated columns of a wide cohort. Selected
+    columns are views of the caller's arrays where possible (see
+    _select_columns).
+
+    Parameters
+    ----------
+    data : pd.DataFrame, Mapping, np.ndarray or pyarrow.Table
+        Initial raw data containing risk scores (or predictor/model values) and
+        outcome of interest
+    outcome : str
+        Column name of outcome of interest in data
+    modelnames : list[str]
+        Column names from data that contain model risk scores or values
+    models_to_prob : list[str]
+        Columns that need to be converted to risk scores from 0 to 1
+    time_to_outcome_col : str
+        Column name in data containing time to outcome values, used in Survival DCA
+    weights : str
+        Column name in data containing sample weights
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected columns, in order of first mention
+    """
+
+    columns = list(
+        dict.fromkeys(
+            [outcome]
+            + ([time_to_outcome_col] if time_to_outcome_col is not None else [])
+            + list(modelnames)
+            + list(models_to_prob or [])
+            + ([weights] if weights is not None else [])
+        )
+    )
+    return _select_columns(data=data, columns=columns)
+
+
 def _create_risks_df(
     data: pd.DataFrame,
     outcome: str,
@@ -101,31 +159,55 @@ def _create_risks_df(
     Returns
     -------
     pd.DataFrame
-        Data with non-risk score model columns converted to risk scores between 0 and 1
+        Data with non-risk score model columns converted to risk scores between 0 and 1.
+        Only the converted columns are new; the others are shared with data, which
+        is left unchanged
     """
+    risks_df = data.copy(deep=False)
+
     if models_to_prob is None:
         pass
     elif time_to_outcome_col is None:
         for model in models_to_prob:
-            binary_risks = _calc_binary_risks(data=data, outcome=outcome, model=model)
-
-            data = data.assign(**{model: binary_risks}).copy()
+            risks_df[model] = _calc_binary_risks(data=data, outcome=outcome, model=model)
 
     elif time_to_outcome_col is not None:
         for model in models_to_prob:
-            surv_risks = _calc_surv_risks(
+            risks_df[model] = _calc_surv_risks(
                 data=data,
                 outcome=outcome,
                 model=model,
                 time=time,
                 time_to_outcome_col=time_to_outcome_col,
             )
-            data = data.assign(**{model: surv_risks}).copy()
 
-    data = data.assign(**{"all": 1}).copy()
-    data = data.assign(**{"none": 0}).copy()
+    return risks_df
 
-    return data
+
+def _add_reference_scores(risks_df: pd.DataFrame, model: str) -> pd.DataFrame:
+    """
+    Add a constant score column for the 'all' (1 + e) or 'none' (0 - e)
+    reference when it is asked for by name. dca() calculates both references in
+    closed form, so this is only needed when the per-model rate functions are
+    called directly for a reference.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores
+    model : str
+        Model column name, or 'all'/'none'
+
+    Returns
+    -------
+    pd.DataFrame
+        risks_df, with the reference score column added when model names a
+        reference that is not a column
+    """
+
+    if model in REFERENCE_SCORES and model not in risks_df.columns:
+        return risks_df.assign(**{model: REFERENCE_SCORES[model]})
+    return risks_df
 
 
 def _rectify_model_risk_boundaries(
@@ -143,19 +225,57 @@ def _rectify_model_risk_boundaries(
     Returns
     -------
     pd.DataFrame
-        Data with model column risk scores 0 and 1 changed to 0 - e and 1 + e, respectively,
-        to evaluate as less/greater than 0 and 1 thresholds for correct tp/fp evaluations
+        Copy of the data with model column risk scores 0 and 1 changed to 0 - e and
+        1 + e, respectively, to evaluate as less/greater than 0 and 1 thresholds for
+        correct tp/fp evaluations; risks_df is left unchanged. dca() does not
+        rewrite risk scores and instead compares them against _rectify_thresholds
     """
 
     machine_epsilon = sys.float_info.epsilon
 
-    modelnames = modelnames + ["all", "none"]
+    rectified = {}
     for modelname in modelnames:
-        risks_df[modelname].replace(
-            to_replace=0, value=0 - machine_epsilon, inplace=True
-        )
-        risks_df[modelname].replace(
-            to_replace=1, value=1 + machine_epsilon, inplace=True
+        risks = risks_df[modelname].to_numpy(dtype=float)
+        rectified[modelname] = np.where(
+            risks == 0,
+            0 - machine_epsilon,
+            np.where(risks == 1, 1 + machine_epsilon, risks),
         )
 
-    return risks_df
+    return risks_df.assign(**rectified)
+
+
+def _rectify_thresholds(thresholds: Iterable) -> np.ndarray:
+    """
+    Move threshold values so that comparing unrectified risk scores against them
+    (risk >= threshold) gives the same result as comparing risk scores rectified
+    by _rectify_model_risk_boundaries against the original values. A score of 0
+    stands for 0 - e, so it falls below every threshold in (-e, 0]: these move
+    to the smallest positive float, which every positive score still reaches.
+    A score of 1 stands for 1 + e, so it reaches every threshold in (1, 1 + e]:
+    these move to 1. Other thresholds are unchanged, and rectified scores compare
+    the same against the moved values.
+
+    Parameters
+    ----------
+    thresholds : Iterable
+        Threshold values (x values)
+
+    Returns
+    -------
+    np.ndarray
+        Threshold values to compare unrectified risk scores against
+    """
+
+    machine_epsilon = sys.float_info.epsilon
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    comparison_thresholds = thresholds.copy()
+    comparison_thresholds[
+        (thresholds > 0 - machine_epsilon) & (thresholds <= 0)
+    ] = np.nextafter(0, 1)
+    comparison_thresholds[
+        (thresholds > 1) & (thresholds <= 1 + machine_epsilon)
+    ] = 1
+
+    return comparison_thresholds
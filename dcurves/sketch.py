@@ -0,0 +1,575 @@
+"""
+This module houses the functions used to summarize a stream of risk scores in a
+mergeable quantile sketch, so that binary DCA can be run later at arbitrary
+threshold values without keeping every score.
+
+A sketch is a stack of levels: level h holds scores that each stand for 2 ** h
+original scores. When a level holds more than capacity scores it is compacted:
+the scores are sorted, paired up, and one score of each pair (alternately the
+lower and the upper) moves to level h + 1. For any threshold, only the pair
+straddling it can change the count of scores at or above the threshold, and
+by exactly 2 ** h, so each compaction at level h adds at most 2 ** h to the
+count error. Summing over the compactions made gives a deterministic bound on
+the error of every count read from the sketch, roughly
+(number of levels / capacity) relative to the stream length. Memory is
+capacity scores per level, and the number of levels grows only with the
+logarithm of the stream length.
+"""
+
+from typing import Iterable, Tuple, Optional, Union
+import io
+import json
+import sys
+import numpy as np
+import pandas as pd
+
+from .stats import _calc_stats_from_rates
+from .engines import _calc_rates_from_counts
+
+# Scores held per level before the level is compacted
+SKETCH_CAPACITY = 4096
+
+
+def _create_sketch() -> dict:
+    """
+    Create an empty sketch.
+
+    Returns
+    -------
+    dict
+        Sketch with no levels
+    """
+
+    return {"levels": [], "compactions": []}
+
+
+def _compact_sketch(sketch: dict, capacity: int) -> None:
+    """
+    Compact every level of a sketch holding more than capacity scores, in place.
+
+    Parameters
+    ----------
+    sketch : dict
+        Sketch as created by _create_sketch
+    capacity : int
+        Scores held per level before the level is compacted
+
+    Returns
+    -------
+    None
+    """
+
+    levels = sketch["levels"]
+    compactions = sketch["compactions"]
+    h = 0
+    while h < len(levels):
+        if len(levels[h]) > capacity:
+            if h + 1 == len(levels):
+                levels.append(np.empty(0))
+                compactions.append(0)
+            scores = np.sort(levels[h])
+            num_paired = len(scores) - len(scores) % 2
+            # Alternate which score of each pair is kept so errors tend to cancel
+            kept = scores[compactions[h] % 2 : num_paired : 2]
+            levels[h] = scores[num_paired:]
+            levels[h + 1] = np.concatenate([levels[h + 1], kept])
+            compactions[h] += 1
+        h += 1
+
+
+def _update_sketch(sketch: dict, scores: np.ndarray, capacity: int) -> None:
+    """
+    Add scores to a sketch, in place.
+
+    Parameters
+    ----------
+    sketch : dict
+        Sketch as created by _create_sketch
+    scores : np.ndarray
+        Risk scores to add, without missing values
+    capacity : int
+        Scores held per level before the level is compacted
+
+    Returns
+    -------
+    None
+    """
+
+    if not sketch["levels"]:
+        sketch["levels"].append(np.empty(0))
+        sketch["compactions"].append(0)
+    sketch["levels"][0] = np.concatenate(
+        [sketch["levels"][0], np.asarray(scores, dtype=float)]
+    )
+    _compact_sketch(sketch, capacity)
+
+
+def _merge_sketches(sketch: dict, other: dict, capacity: int) -> None:
+    """
+    Add the scores summarized by another sketch to a sketch, in place. The count
+    error bound of the result is the sum of both bounds plus that of any
+    compactions the merge triggers.
+
+    Parameters
+    ----------
+    sketch : dict
+        Sketch as created by _create_sketch, updated in place
+    other : dict
+        Sketch to add
+    capacity : int
+        Scores held per level before the level is compacted
+
+    Returns
+    -------
+    None
+    """
+
+    for h, (level, num_compactions) in enumerate(
+        zip(other["levels"], other["compactions"])
+    ):
+        if h == len(sketch["levels"]):
+            sketch["levels"].append(np.empty(0))
+            sketch["compactions"].append(0)
+        sketch["levels"][h] = np.concatenate([sketch["levels"][h], level])
+        sketch["compactions"][h] += num_compactions
+    _compact_sketch(sketch, capacity)
+
+
+def _calc_sketch_counts(sketch: dict, thresholds: Iterable) -> np.ndarray:
+    """
+    Estimate the number of scores at or above each threshold value.
+
+    Parameters
+    ----------
+    sketch : dict
+        Sketch as created by _create_sketch
+    thresholds : Iterable
+        Threshold values (x values) at which counts will be estimated
+
+    Returns
+    -------
+    np.ndarray
+        Estimated counts (int64), each within _calc_sketch_count_error of the
+        true count
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    counts = np.zeros(len(thresholds), dtype=np.int64)
+    for h, level in enumerate(sketch["levels"]):
+        at_or_above = len(level) - np.searchsorted(
+            np.sort(level), thresholds, side="left"
+        )
+        counts += at_or_above.astype(np.int64) << h
+
+    return counts
+
+
+def _calc_sketch_count_error(sketch: dict) -> int:
+    """
+    Get the bound on the error of any count read from a sketch.
+
+    Parameters
+    ----------
+    sketch : dict
+        Sketch as created by _create_sketch
+
+    Returns
+    -------
+    int
+        Largest possible difference between an estimated and a true count
+    """
+
+    return sum(
+        num_compactions << h for h, num_compactions in enumerate(sketch["compactions"])
+    )
+
+
+def _sketch_to_arrays(sketch: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten a sketch into arrays for serialization.
+
+    Parameters
+    ----------
+    sketch : dict
+        Sketch as created by _create_sketch
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Concatenated scores of all levels, number of scores per level and number
+        of compactions per level
+    """
+
+    return (
+        np.concatenate([np.empty(0)] + sketch["levels"]),
+        np.array([len(level) for level in sketch["levels"]], dtype=np.int64),
+        np.array(sketch["compactions"], dtype=np.int64),
+    )
+
+
+def _sketch_from_arrays(
+    scores: np.ndarray, level_lengths: np.ndarray, compactions: np.ndarray
+) -> dict:
+    """
+    Rebuild a sketch flattened by _sketch_to_arrays.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        Concatenated scores of all levels
+    level_lengths : np.ndarray
+        Number of scores per level
+    compactions : np.ndarray
+        Number of compactions per level
+
+    Returns
+    -------
+    dict
+        Sketch as created by _create_sketch
+    """
+
+    if len(level_lengths) != len(compactions) or level_lengths.sum() != len(scores):
+        raise ValueError("Serialized sketch levels are inconsistent")
+
+    levels = []
+    if len(level_lengths):
+        levels = np.split(scores, np.cumsum(level_lengths)[:-1])
+
+    return {
+        "levels": levels,
+        "compactions": [int(num_compactions) for num_compactions in compactions],
+    }
+
+
+class DCASketch:
+    """
+    Bounded-memory summary of a stream of risk scores for binary decision curve
+    analysis when the threshold grid is not known up front. Scores of events
+    and non-events are kept in separate mergeable quantile sketches (see
+    dcurves.sketch), so a decision curve can be produced later at any threshold
+    values. Counts read from a sketch carry a deterministic error bound, which
+    finalize() reports as a net_benefit_error column. Rows with a missing
+    outcome are skipped.
+
+    Parameters
+    ----------
+    outcome : str
+        Column name of outcome of interest in each chunk
+    modelnames : list[str]
+        Column names that contain model risk scores (scores ranging from 0 to 1)
+    capacity : int
+        Scores held per sketch level; larger values use more memory and give
+        tighter error bounds (roughly number of levels / capacity, relative)
+
+    Attributes
+    ----------
+    num_events : int
+        Number of events seen
+    num_nonevents : int
+        Number of non-events seen
+    sketches : dict
+        Quantile sketches of the scores of events and non-events, keyed by
+        (model, 'events') and (model, 'nonevents')
+    settings : dict
+        Outcome, modelnames and capacity, which sketches must share to be
+        merged
+
+    Examples
+    --------
+    from dcurves import DCASketch
+
+    |
+
+    sketch = DCASketch(outcome='cancer', modelnames=['cancerpredmarker'])
+    for chunk in scored_stream:
+        sketch.update(chunk)
+
+    |
+
+    dca_results = sketch.finalize(thresholds=np.arange(0, 0.5, 0.005))
+
+    """
+
+    outcome: str
+    modelnames: list
+    capacity: int
+    num_events: int
+    num_nonevents: int
+    sketches: dict
+
+    def __init__(
+        self, outcome: str, modelnames: list, capacity: int = SKETCH_CAPACITY
+    ):
+        """
+        Start a sketch without scores; see the class docstring for the
+        parameters.
+        """
+
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+
+        self.outcome = outcome
+        self.modelnames = list(modelnames)
+        self.capacity = int(capacity)
+        self.num_events = 0
+        self.num_nonevents = 0
+        self.sketches = {
+            (model, side): _create_sketch()
+            for model in self.modelnames
+            for side in ["events", "nonevents"]
+        }
+
+    @property
+    def settings(self) -> dict:
+        """
+        Outcome, modelnames and capacity: the settings another sketch must
+        share to be merged with this one.
+        """
+
+        return {
+            "outcome": self.outcome,
+            "modelnames": self.modelnames,
+            "capacity": self.capacity,
+        }
+
+    def update(self, chunk: pd.DataFrame) -> "DCASketch":
+        """
+        Add the risk scores of a chunk of data.
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            Chunk of the stream containing risk scores (scores ranging from 0
+            to 1) and the outcome of interest
+
+        Returns
+        -------
+        DCASketch
+            This sketch, updated in place
+        """
+
+        machine_epsilon = sys.float_info.epsilon
+        events = chunk[self.outcome].isin([True]).to_numpy()
+        nonevents = chunk[self.outcome].isin([False]).to_numpy()
+        self.num_events += int(events.sum())
+        self.num_nonevents += int(nonevents.sum())
+
+        for model in self.modelnames:
+            scores = chunk[model].to_numpy(dtype=float)
+            scores = np.where(scores == 0, 0 - machine_epsilon, scores)
+            scores = np.where(scores == 1, 1 + machine_epsilon, scores)
+            for side, mask in [("events", events), ("nonevents", nonevents)]:
+                side_scores = scores[mask]
+                _update_sketch(
+                    self.sketches[(model, side)],
+                    side_scores[~np.isnan(side_scores)],
+                    self.capacity,
+                )
+
+        return self
+
+    def merge(self, other: "DCASketch") -> "DCASketch":
+        """
+        Add the risk scores summarized by another sketch with the same settings.
+
+        Parameters
+        ----------
+        other : DCASketch
+            Sketch built on another part of the stream
+
+        Returns
+        -------
+        DCASketch
+            This sketch, updated in place
+        """
+
+        if self.settings != other.settings:
+            raise ValueError(
+                "Only sketches with the same outcome, modelnames and capacity can be "
+                "merged"
+            )
+
+        for key, sketch in self.sketches.items():
+            _merge_sketches(sketch, other.sketches[key], self.capacity)
+        self.num_events += other.num_events
+        self.num_nonevents += other.num_nonevents
+
+        return self
+
+    def count_errors(self) -> pd.DataFrame:
+        """
+        Get the bound on the error of event and non-event counts per model.
+
+        Returns
+        -------
+        pd.DataFrame
+            Largest possible difference between the estimated and true number of
+            events and non-events at or above any threshold, per model
+        """
+
+        return pd.DataFrame(
+            {
+                "model": self.modelnames,
+                "events": [
+                    _calc_sketch_count_error(self.sketches[(model, "events")])
+                    for model in self.modelnames
+                ],
+                "nonevents": [
+                    _calc_sketch_count_error(self.sketches[(model, "nonevents")])
+                    for model in self.modelnames
+                ],
+            }
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the sketch, e.g. to send it to another process.
+
+        Returns
+        -------
+        bytes
+            Settings and sketch levels in the .npz format, readable with
+            from_bytes
+        """
+
+        arrays = {
+            "settings": np.array(json.dumps(self.settings)),
+            "totals": np.array([self.num_events, self.num_nonevents]),
+        }
+        for i, model in enumerate(self.modelnames):
+            for side in ["events", "nonevents"]:
+                scores, level_lengths, compactions = _sketch_to_arrays(
+                    self.sketches[(model, side)]
+                )
+                arrays[f"scores_{i}_{side}"] = scores
+                arrays[f"level_lengths_{i}_{side}"] = level_lengths
+                arrays[f"compactions_{i}_{side}"] = compactions
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DCASketch":
+        """
+        Rebuild a sketch serialized with to_bytes.
+
+        Parameters
+        ----------
+        data : bytes
+            Output of to_bytes
+
+        Returns
+        -------
+        DCASketch
+            Sketch with the serialized settings and levels
+        """
+
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            # pylint mistakes the arrays of the NpzFile for np.array
+            # pylint: disable=not-an-iterable
+            sketch = cls(**json.loads(str(arrays["settings"])))
+            sketch.num_events, sketch.num_nonevents = (
+                int(total) for total in arrays["totals"]
+            )
+            for i, model in enumerate(sketch.modelnames):
+                for side in ["events", "nonevents"]:
+                    sketch.sketches[(model, side)] = _sketch_from_arrays(
+                        arrays[f"scores_{i}_{side}"],
+                        arrays[f"level_lengths_{i}_{side}"],
+                        arrays[f"compactions_{i}_{side}"],
+                    )
+
+        return sketch
+
+    def finalize(
+        self,
+        thresholds: Iterable = [i / 100 for i in range(0, 100)],
+        harm: Optional[dict] = None,
+        prevalence: Optional[Union[float, int]] = None,
+        nper: Optional[int] = 1,
+    ) -> pd.DataFrame:
+        """
+        Calculate net benefit and interventions avoided at any threshold values
+        from the sketched risk scores.
+
+        Parameters
+        ----------
+        thresholds : Iterable
+            Threshold values (x values) at which net benefit and net
+            interventions avoided will be calculated
+        harm : dict[float]
+            Models with their associated harm values
+        prevalence : int or float
+            Value that indicates the prevalence among the population, only to be
+            specified in case-control situations
+        nper : int
+            Total number of interventions, multiplies proportion of interventions
+            avoided to get scaled plots
+
+        Returns
+        -------
+        pd.DataFrame
+            Data containing net benefit and interventions avoided scores to be
+            plotted against threshold values, with a net_benefit_error column
+            bounding the difference from the net benefit dca() would give on the
+            full data (0 for 'all' and 'none')
+        """
+
+        if isinstance(thresholds, str):
+            raise ValueError("DCASketch needs threshold values, not 'all'")
+
+        thresholds = list(thresholds)
+        num_rows = self.num_events + self.num_nonevents
+        if num_rows == 0:
+            raise ValueError("no rows have been added to the sketch")
+        prevalence_value = (
+            float(prevalence) if prevalence is not None else self.num_events / num_rows
+        )
+
+        tp = np.stack(
+            [
+                _calc_sketch_counts(self.sketches[(model, "events")], thresholds)
+                for model in self.modelnames
+            ]
+        )
+        fp = np.stack(
+            [
+                _calc_sketch_counts(self.sketches[(model, "nonevents")], thresholds)
+                for model in self.modelnames
+            ]
+        )
+        rates = _calc_rates_from_counts(
+            model_counts=np.stack([tp + fp, tp, fp]),
+            totals=(num_rows, self.num_events, self.num_nonevents),
+            thresholds=thresholds,
+            prevalence_value=prevalence_value,
+        )
+
+        # Same keyword arguments as the other callers of _calc_stats_from_rates
+        # pylint: disable=duplicate-code
+        final_dca_df = _calc_stats_from_rates(
+            rates=rates,
+            modelnames=self.modelnames,
+            thresholds=thresholds,
+            input_df_rownum=num_rows,
+            prevalence_value=prevalence_value,
+            harm=harm,
+            nper=nper,
+        )
+
+        count_errors = self.count_errors().set_index("model")
+        tp_rate_error = count_errors["events"] / self.num_events * prevalence_value
+        fp_rate_error = (
+            count_errors["nonevents"] / self.num_nonevents * (1 - prevalence_value)
+        )
+        odds = final_dca_df["threshold"] / (1 - final_dca_df["threshold"])
+        tp_error = final_dca_df["model"].map(tp_rate_error).fillna(0)
+        fp_error = final_dca_df["model"].map(fp_rate_error).fillna(0)
+        # The odds are infinite at threshold 1, where exact counts add no error
+        final_dca_df["net_benefit_error"] = tp_error + (odds * fp_error).where(
+            fp_error != 0, 0
+        )
+
+        return final_dca_df
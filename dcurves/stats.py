@@ -0,0 +1,454 @@
+"""
+This module houses the functions used to assemble the output of a decision
+curve analysis from rates: the threshold grid and harms, the initial long
+table, and net benefit and net interventions avoided, as a table or as a
+DCAResult.
+"""
+
+from typing import Optional, Union, Iterable
+import numpy as np
+import pandas as pd
+
+from .benefit import (
+    _calc_net_benefit,
+    _calc_net_intervention_avoided,
+    _calc_threshold_odds,
+)
+from .rates import _calc_rate_matrix
+from .result import DCAResult
+
+
+def _calc_distinct_thresholds(risks_df: pd.DataFrame, modelnames: list) -> list:
+    """
+    Collect every distinct predicted risk among the model columns to use as
+    threshold values, so that net benefit is evaluated at each cutpoint where a
+    model's classification of some row changes.
+
+    Parameters
+    ----------
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores (scores ranging from 0
+        to 1 for columns of interest)
+    modelnames : list[str]
+        Column names from risks_df that contain model risk scores
+
+    Returns
+    -------
+    list[float]
+        Ascending distinct risk scores in [0, 1), always including 0
+    """
+
+    risks = np.unique(risks_df[modelnames].to_numpy(dtype=float))
+    risks = risks[(risks >= 0) & (risks < 1)]
+    return np.union1d([0.0], risks).tolist()
+
+
+def _calc_harm_matrix(
+    harm: Optional[dict], modelnames: list, num_thresholds: int
+) -> np.ndarray:
+    """
+    Expand harm values into one value per model and threshold value.
+
+    Parameters
+    ----------
+    harm : dict
+        Models with their associated harm, either a single value or one value
+        per threshold value; models not listed have no harm
+    modelnames : list[str]
+        Model names, in the order of the rows of the result
+    num_thresholds : int
+        Number of threshold values
+
+    Returns
+    -------
+    np.ndarray
+        Harm values of shape (models, thresholds)
+    """
+
+    if harm is not None and not isinstance(harm, dict):
+        raise ValueError("Harm should be either None or dict")
+
+    harm_matrix = np.zeros((len(modelnames), num_thresholds))
+    for i, model in enumerate(modelnames):
+        if harm is None or model not in harm:
+            continue
+        model_harm = np.asarray(harm[model], dtype=float)
+        if model_harm.ndim > 1 or (
+            model_harm.ndim == 1 and len(model_harm) != num_thresholds
+        ):
+            raise ValueError(
+                "Harm for model " + str(model) + " should be a single value or "
+                "one value per threshold"
+            )
+        harm_matrix[i] = model_harm
+
+    return harm_matrix
+
+
+def _create_initial_df(
+    thresholds: Iterable,
+    modelnames: list,
+    input_df_rownum: int,
+    prevalence_value: Union[float, int],
+    harm: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Create initial dataframe that will form the outputted table containing
+    net benefit/interventions avoided values for plotting.
+
+    Parameters
+    ----------
+    thresholds : Iterable
+        Threshold values (x values) at which net benefit and net
+        interventions avoided will be calculated
+    modelnames : list[str]
+        Column names from risks_df that contain model risk scores
+    input_df_rownum : int
+        Number of rows in original input dataframe
+    prevalence_value : int or float
+        Calculated prevalence value
+    harm : dict
+        Models with their associated harm, either a single value or one value
+        per threshold value
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame set with initial parameters
+    """
+
+    modelnames = modelnames + ["all", "none"]
+    thresholds = np.asarray(list(thresholds))
+    rows = len(thresholds) * len(modelnames)
+
+    initial_df = pd.DataFrame(
+        {
+            "model": np.repeat(np.array(modelnames, dtype=object), len(thresholds)),
+            "threshold": np.tile(thresholds, len(modelnames)),
+            "n": np.full(rows, input_df_rownum),
+            "prevalence": np.full(rows, prevalence_value),
+            "harm": _calc_harm_matrix(
+                harm=harm, modelnames=modelnames, num_thresholds=len(thresholds)
+            ).ravel(),
+        }
+    )
+
+    return initial_df
+
+
+def _place_rates(
+    initial_df: pd.DataFrame, modelnames: list, rates: tuple
+) -> pd.DataFrame:
+    """
+    Place test positive, true positive and false positive rates calculated for
+    all models at once on the matching rows of initial_df.
+
+    Parameters
+    ----------
+    initial_df : pd.DataFrame
+        DataFrame set with initial parameters
+    modelnames : list[str]
+        Model names in the order of the first axis of each rate array
+    rates : tuple[np.ndarray]
+        Test positive, true positive and false positive rates, each of shape
+        (models, thresholds)
+
+    Returns
+    -------
+    pd.DataFrame
+        Initially set data with calculated test pos rate, true positive rate, false
+        positive rate per threshold
+    """
+
+    model_index = pd.Index(modelnames).get_indexer(initial_df["model"])
+    threshold_index = initial_df.groupby("model", sort=False).cumcount().to_numpy()
+    initial_df[["test_pos_rate", "tp_rate", "fp_rate"]] = np.asarray(
+        rates, dtype=float
+    )[:, model_index, threshold_index].T
+
+    return initial_df
+
+
+def _calc_initial_stats(
+    initial_df: pd.DataFrame,
+    risks_df: pd.DataFrame,
+    thresholds: Iterable,
+    outcome: str,
+    prevalence_value: Union[float, int],
+    time: Optional[Union[float, int]] = None,
+    time_to_outcome_col: Optional[str] = None,
+    engine: str = "sort",
+    weights: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Calculate the test positive, true positive, and false positive rate per each threshold value.
+
+    Parameters
+    ----------
+    initial_df : pd.DataFrame
+        DataFrame set with initial parameters
+    risks_df : pd.DataFrame
+        Data containing (converted if necessary) risk scores (scores ranging from 0 to 1
+        for columns of interest)
+    thresholds : Iterable
+        Threshold values (x values) at which net benefit and net interventions avoided
+        will be calculated
+    outcome : str
+        Column name of outcome of interest in risks_df
+    prevalence_value : int or float
+        Calculated prevalence value
+    time : int or float
+        Time of interest in years, used in Survival DCA
+    time_to_outcome_col : str
+        Column name in risks_df containing time to outcome values, used in Survival DCA
+    engine : str
+        Either 'sort' (sort all models' risk scores in one pass and read binary
+        rates from cumulative counts), 'binned' (count risk scores into threshold
+        bins without sorting) or 'loop' (compare every row per threshold value,
+        one model at a time)
+    weights : str
+        Column name in risks_df containing sample weights
+
+    Returns
+    -------
+    pd.DataFrame
+        Initially set data with calculated test pos rate, true positive rate, false
+        positive rate per threshold
+    """
+
+    modelnames = [
+        model for model in initial_df["model"].unique() if model not in ["all", "none"]
+    ]
+    # Same keyword arguments as the other callers of _calc_rate_matrix
+    # pylint: disable=duplicate-code
+    rates = _calc_rate_matrix(
+        risks_df=risks_df,
+        thresholds=list(thresholds),
+        modelnames=modelnames,
+        outcome=outcome,
+        prevalence_value=prevalence_value,
+        time=time,
+        time_to_outcome_col=time_to_outcome_col,
+        engine=engine,
+        weights=weights,
+    )
+
+    return _place_rates(
+        initial_df=initial_df, modelnames=modelnames + ["all", "none"], rates=rates
+    )
+
+
+def _calc_more_stats(initial_stats_df: pd.DataFrame, nper: int = 1) -> pd.DataFrame:
+    """
+    Calculate additional statistics (net benefit, net interventions avoided) and
+    add them to initial_stats_df, over its (models x thresholds) block at once.
+
+    Parameters
+    ----------
+    initial_stats_df : pd.DataFrame
+        Initially set data with calculated test pos rate, true positive rate, false
+        positive rate per threshold, with models in consecutive blocks over the
+        same threshold values as laid out by _create_initial_df
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    Returns
+    -------
+    pd.DataFrame
+        Data of full set of stats offered by the package per each threshold
+        value (test_pos_rate, tp, fp, nb, nia)
+
+    """
+    modelnames = pd.unique(initial_stats_df["model"])
+    shape = (len(modelnames), len(initial_stats_df.index) // len(modelnames))
+
+    def block(column):
+        return initial_stats_df[column].to_numpy(dtype=float).reshape(shape)
+
+    odds = _calc_threshold_odds(block("threshold")[0])
+    stats = np.empty((2,) + shape)
+    _calc_net_benefit(
+        tp_rate=block("tp_rate"),
+        fp_rate=block("fp_rate"),
+        harm=block("harm"),
+        odds=odds,
+        out=stats[0],
+    )
+    _calc_net_intervention_avoided(
+        net_benefit=stats[0],
+        net_benefit_all=stats[0][list(modelnames).index("all")],
+        odds=odds,
+        nper=nper,
+        out=stats[1],
+    )
+    initial_stats_df["net_benefit"] = stats[0].ravel()
+    initial_stats_df["net_intervention_avoided"] = stats[1].ravel()
+
+    # initial_stats_df['neg_rate'] = 1 - initial_stats_df['prevalence']
+    # initial_stats_df['fn_rate'] = initial_stats_df['prevalence'] - initial_stats_df['tp_rate']
+    # initial_stats_df['tn_rate'] = initial_stats_df['neg_rate'] - initial_stats_df['fp_rate']
+    #
+    #
+    # initial_stats_df['test_neg_rate'] = initial_stats_df['fn_rate'] + initial_stats_df['tn_rate']
+    # initial_stats_df['ppv'] = initial_stats_df['tp_rate'] /\
+    #                               (initial_stats_df['tp_rate'] + initial_stats_df['fp_rate'])
+    # initial_stats_df['npv'] = initial_stats_df['tn_rate'] /\
+    #                               (initial_stats_df['tn_rate'] + initial_stats_df['fn_rate'])
+    # initial_stats_df['sens'] = initial_stats_df['tp_rate'] /\
+    #                                (initial_stats_df['tp_rate'] + initial_stats_df['fn_rate'])
+    # initial_stats_df['spec'] = initial_stats_df['tn_rate'] /\
+    #                                (initial_stats_df['tn_rate'] + initial_stats_df['fp_rate'])
+    # initial_stats_df['lr_pos'] = initial_stats_df['sens'] /\
+    #                                  (1 - initial_stats_df['spec'])
+    # initial_stats_df['lr_neg'] = (1 - initial_stats_df['sens']) /\
+    #                                  initial_stats_df['spec']
+
+    final_dca_df = initial_stats_df
+
+    return final_dca_df
+
+
+def _calc_result_from_rates(
+    rates: np.ndarray,
+    modelnames: list,
+    thresholds: Iterable,
+    input_df_rownum: Union[int, float],
+    prevalence_value: Union[float, int],
+    harm: Optional[dict] = None,
+    nper: int = 1,
+) -> "DCAResult":
+    """
+    Calculate net benefit and net interventions avoided from rates for the
+    models and the 'all'/'none' references as arrays, with the same
+    arithmetic as _calc_more_stats.
+
+    Parameters
+    ----------
+    rates : np.ndarray
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and 'none'
+    modelnames : list[str]
+        Model names in the order of the second axis of rates
+    thresholds : Iterable
+        Threshold values (x values) at which rates were calculated
+    input_df_rownum : int
+        Number of rows (or patients) the rates were calculated from
+    prevalence_value : int or float
+        Calculated prevalence value
+    harm : dict[float]
+        Models with their associated harm values
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+
+    Returns
+    -------
+    DCAResult
+        Wide, array-backed result
+    """
+
+    modelnames = modelnames + ["all", "none"]
+    thresholds = np.asarray(list(thresholds))
+    harm_matrix = _calc_harm_matrix(
+        harm=harm, modelnames=modelnames, num_thresholds=len(thresholds)
+    )
+    test_pos_rate, tp_rate, fp_rate = np.asarray(rates, dtype=float)
+
+    odds = _calc_threshold_odds(thresholds)
+    net_benefit = _calc_net_benefit(
+        tp_rate=tp_rate, fp_rate=fp_rate, harm=harm_matrix, odds=odds
+    )
+    net_intervention_avoided = _calc_net_intervention_avoided(
+        net_benefit=net_benefit,
+        net_benefit_all=net_benefit[modelnames.index("all")],
+        odds=odds,
+        nper=nper,
+    )
+
+    return DCAResult(
+        modelnames=modelnames,
+        thresholds=thresholds,
+        n=input_df_rownum,
+        prevalence=prevalence_value,
+        harm=harm_matrix,
+        metrics={
+            "test_pos_rate": test_pos_rate,
+            "tp_rate": tp_rate,
+            "fp_rate": fp_rate,
+            "net_benefit": net_benefit,
+            "net_intervention_avoided": net_intervention_avoided,
+        },
+    )
+
+
+def _calc_stats_from_rates(
+    rates: np.ndarray,
+    modelnames: list,
+    thresholds: Iterable,
+    input_df_rownum: Union[int, float],
+    prevalence_value: Union[float, int],
+    harm: Optional[dict] = None,
+    nper: int = 1,
+    as_result: bool = False,
+) -> Union[pd.DataFrame, "DCAResult"]:
+    """
+    Build the full output table from rates calculated for the models and the
+    'all'/'none' references together, as returned by the compact, frequency
+    table and chunked binary paths.
+
+    Parameters
+    ----------
+    rates : np.ndarray
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and 'none'
+    modelnames : list[str]
+        Model names in the order of the second axis of rates
+    thresholds : Iterable
+        Threshold values (x values) at which rates were calculated
+    input_df_rownum : int
+        Number of rows (or patients) the rates were calculated from
+    prevalence_value : int or float
+        Calculated prevalence value
+    harm : dict[float]
+        Models with their associated harm values
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    as_result : bool
+        If True, return a DCAResult instead of building the table
+
+    Returns
+    -------
+    pd.DataFrame or DCAResult
+        Data of full set of stats offered by the package per each threshold
+        value (test_pos_rate, tp, fp, nb, nia)
+    """
+
+    if as_result:
+        return _calc_result_from_rates(
+            rates=rates,
+            modelnames=modelnames,
+            thresholds=thresholds,
+            input_df_rownum=input_df_rownum,
+            prevalence_value=prevalence_value,
+            harm=harm,
+            nper=nper,
+        )
+
+    initial_df = _create_initial_df(
+        thresholds=thresholds,
+        modelnames=modelnames,
+        input_df_rownum=input_df_rownum,
+        prevalence_value=prevalence_value,
+        harm=harm,
+    )
+
+    initial_stats_df = _place_rates(
+        initial_df=initial_df,
+        modelnames=modelnames + ["all", "none"],
+        rates=rates,
+    )
+
+    final_dca_df = _calc_more_stats(initial_stats_df=initial_stats_df, nper=nper)
+
+    return final_dca_df
@@ -0,0 +1,465 @@
+"""
+This module houses the functions used to run binary DCA over chunks of a
+cohort, reducing each chunk to per-threshold bin counts that can be summed
+across chunks (and across workers, see DCAAccumulator) so that peak memory is
+bounded by the chunk size rather than the cohort size.
+"""
+
+import sys
+from typing import Iterable, Optional, Tuple, Union
+import io
+import json
+import numpy as np
+import pandas as pd
+
+from .engines import (
+    _calc_bin_counts_at_or_above,
+    _calc_bin_counts_matrix,
+    _calc_rates_from_counts,
+)
+from .stats import _calc_stats_from_rates
+
+
+def _calc_chunk_bin_counts(
+    chunk: pd.DataFrame,
+    outcome: str,
+    modelnames: list,
+    sorted_thresholds: np.ndarray,
+    weights: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count all rows, events and non-events in each threshold bin for one chunk
+    of data. Risk scores of 0 and 1 are first moved to 0 - e and 1 + e, as in
+    _rectify_model_risk_boundaries.
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        Chunk of the cohort containing risk scores (scores ranging from 0 to 1)
+        and outcome of interest
+    outcome : str
+        Column name of outcome of interest in chunk
+    modelnames : list[str]
+        Column names from chunk that contain model risk scores
+    sorted_thresholds : np.ndarray
+        Ascending threshold values
+    weights : str
+        Column name in chunk containing sample weights
+
+    Returns
+    -------
+    tuple[np.ndarray]
+        Bin counts of shape (3, models, thresholds + 1) and the totals (number or
+        total weight) of all rows, events and non-events in the chunk
+    """
+
+    machine_epsilon = sys.float_info.epsilon
+    score_matrix = chunk[modelnames].to_numpy(dtype=float)
+    score_matrix = np.where(score_matrix == 0, 0 - machine_epsilon, score_matrix)
+    score_matrix = np.where(score_matrix == 1, 1 + machine_epsilon, score_matrix)
+
+    events = chunk[outcome].isin([True]).to_numpy()
+    nonevents = chunk[outcome].isin([False]).to_numpy()
+    if weights is None:
+        row_weights = None
+        totals = np.array([len(chunk.index), events.sum(), nonevents.sum()])
+    else:
+        row_weights = chunk[weights].to_numpy(dtype=float)
+        totals = np.array(
+            [row_weights.sum(), row_weights[events].sum(), row_weights[nonevents].sum()]
+        )
+
+    bin_counts = _calc_bin_counts_matrix(
+        score_matrix=score_matrix,
+        events=events,
+        nonevents=nonevents,
+        sorted_thresholds=sorted_thresholds,
+        weights=row_weights,
+    )
+
+    return bin_counts, totals
+
+
+def _calc_bin_count_rates(
+    bin_counts: np.ndarray,
+    totals: np.ndarray,
+    thresholds: Iterable,
+    prevalence: Optional[Union[float, int]] = None,
+) -> Tuple[np.ndarray, float]:
+    """
+    Calculate test positive, true positive and false positive rates per threshold
+    value for each model and the 'all'/'none' references in the binary DCA case
+    from accumulated bin counts.
+
+    Parameters
+    ----------
+    bin_counts : np.ndarray
+        Bin counts of shape (3, models, thresholds + 1) for all rows, events and
+        non-events, summed over chunks
+    totals : np.ndarray
+        Totals (number or total weight) of all rows, events and non-events,
+        summed over chunks
+    thresholds : Iterable
+        Threshold values (x values) at which rates will be calculated
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+
+    Returns
+    -------
+    tuple
+        Rates of shape (3, models + 2, thresholds) ordered as test positive, true
+        positive and false positive rate with models followed by 'all' and
+        'none', and the prevalence value
+    """
+
+    thresholds = np.asarray(list(thresholds), dtype=float)
+    total_weight, num_events = totals[:2]
+    if total_weight == 0:
+        raise ValueError("no rows have been accumulated")
+
+    prevalence_value = (
+        float(prevalence) if prevalence is not None else float(num_events / total_weight)
+    )
+
+    rates = _calc_rates_from_counts(
+        model_counts=_calc_bin_counts_at_or_above(bin_counts, thresholds),
+        totals=totals,
+        thresholds=thresholds,
+        prevalence_value=prevalence_value,
+    )
+
+    return rates, prevalence_value
+
+
+class DCAAccumulator:
+    """
+    Mergeable, serializable counts for binary decision curve analysis. Each
+    update reduces a chunk of data to event and non-event counts per model and
+    threshold bin (integers, or sums of weights when weights are given), which
+    are never normalized, so accumulators built on separate shards of a cohort,
+    in other processes or on other machines, can be merged exactly and
+    finalized into the same table dca() gives for the whole cohort.
+
+    Parameters
+    ----------
+    outcome : str
+        Column name of outcome of interest in each chunk
+    modelnames : list[str]
+        Column names that contain model risk scores (scores ranging from 0 to 1)
+    thresholds : Iterable
+        Threshold values (x values) at which net benefit and net interventions
+        avoided will be calculated
+    weights : str
+        Column name in each chunk containing sample weights
+
+    Attributes
+    ----------
+    bin_counts : np.ndarray
+        Counts of shape (3, models, thresholds + 1) of all rows, events and
+        non-events in each bin between consecutive threshold values
+    totals : np.ndarray
+        Totals (number or total weight) of all rows, events and non-events
+    num_rows : int
+        Number of rows accumulated
+    settings : dict
+        Outcome, modelnames, thresholds and weights, which accumulators must
+        share to be merged
+
+    Examples
+    --------
+    from dcurves import DCAAccumulator
+
+    |
+
+    accumulator = DCAAccumulator(outcome='cancer', modelnames=['cancerpredmarker'])
+    for chunk in shard_chunks:
+        accumulator.update(chunk)
+    payload = accumulator.to_bytes()
+
+    |
+
+    combined = DCAAccumulator.from_bytes(payloads[0])
+    for payload in payloads[1:]:
+        combined.merge(DCAAccumulator.from_bytes(payload))
+    dca_results = combined.finalize()
+
+    """
+
+    outcome: str
+    modelnames: list
+    thresholds: list
+    weights: Optional[str]
+    bin_counts: np.ndarray
+    totals: np.ndarray
+    num_rows: int
+    _sorted_thresholds: np.ndarray
+
+    def __init__(
+        self,
+        outcome: str,
+        modelnames: list,
+        thresholds: Iterable = [i / 100 for i in range(0, 100)],
+        weights: Optional[str] = None,
+    ):
+        """
+        Start an accumulator without counts; see the class docstring for the
+        parameters.
+        """
+
+        if isinstance(thresholds, str):
+            raise ValueError("DCAAccumulator needs threshold values, not 'all'")
+
+        self.outcome = outcome
+        self.modelnames = list(modelnames)
+        self.thresholds = [float(threshold) for threshold in thresholds]
+        self.weights = weights
+
+        dtype = np.int64 if weights is None else float
+        self.bin_counts = np.zeros(
+            (3, len(self.modelnames), len(self.thresholds) + 1), dtype=dtype
+        )
+        self.totals = np.zeros(3, dtype=dtype)
+        self.num_rows = 0
+        self._sorted_thresholds = np.sort(self.thresholds)
+
+    @property
+    def settings(self) -> dict:
+        """
+        Outcome, modelnames, thresholds and weights: the settings another
+        accumulator must share to be merged with this one.
+        """
+
+        return {
+            "outcome": self.outcome,
+            "modelnames": self.modelnames,
+            "thresholds": self.thresholds,
+            "weights": self.weights,
+        }
+
+    def update(self, chunk: pd.DataFrame) -> "DCAAccumulator":
+        """
+        Add the counts of a chunk of data.
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            Chunk of the cohort containing risk scores (scores ranging from 0 to
+            1) and the outcome of interest
+
+        Returns
+        -------
+        DCAAccumulator
+            This accumulator, updated in place
+        """
+
+        bin_counts, totals = _calc_chunk_bin_counts(
+            chunk=chunk,
+            outcome=self.outcome,
+            modelnames=self.modelnames,
+            sorted_thresholds=self._sorted_thresholds,
+            weights=self.weights,
+        )
+        self.bin_counts += bin_counts
+        self.totals += totals
+        self.num_rows += len(chunk.index)
+
+        return self
+
+    def merge(self, other: "DCAAccumulator") -> "DCAAccumulator":
+        """
+        Add the counts of another accumulator with the same settings.
+
+        Parameters
+        ----------
+        other : DCAAccumulator
+            Accumulator built on another part of the cohort
+
+        Returns
+        -------
+        DCAAccumulator
+            This accumulator, updated in place
+        """
+
+        if self.settings != other.settings:
+            raise ValueError(
+                "Only accumulators with the same outcome, modelnames, thresholds "
+                "and weights can be merged"
+            )
+
+        self.bin_counts += other.bin_counts
+        self.totals += other.totals
+        self.num_rows += other.num_rows
+
+        return self
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the accumulator, e.g. to send it to another process.
+
+        Returns
+        -------
+        bytes
+            Settings and counts in the .npz format, readable with from_bytes
+        """
+
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            settings=np.array(json.dumps(self.settings)),
+            bin_counts=self.bin_counts,
+            totals=self.totals,
+            num_rows=np.array(self.num_rows),
+        )
+
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DCAAccumulator":
+        """
+        Rebuild an accumulator serialized with to_bytes.
+
+        Parameters
+        ----------
+        data : bytes
+            Output of to_bytes
+
+        Returns
+        -------
+        DCAAccumulator
+            Accumulator with the serialized settings and counts
+        """
+
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            # pylint mistakes the arrays of the NpzFile for np.array
+            # pylint: disable=no-member
+            accumulator = cls(**json.loads(str(arrays["settings"])))
+            if arrays["bin_counts"].shape != accumulator.bin_counts.shape:
+                raise ValueError("Serialized counts do not match their settings")
+            accumulator.bin_counts = arrays["bin_counts"].astype(
+                accumulator.bin_counts.dtype
+            )
+            accumulator.totals = arrays["totals"].astype(accumulator.totals.dtype)
+            accumulator.num_rows = int(arrays["num_rows"])
+
+        return accumulator
+
+    def finalize(
+        self,
+        harm: Optional[dict] = None,
+        prevalence: Optional[Union[float, int]] = None,
+        nper: Optional[int] = 1,
+    ) -> pd.DataFrame:
+        """
+        Calculate net benefit and interventions avoided from the accumulated
+        counts.
+
+        Parameters
+        ----------
+        harm : dict[float]
+            Models with their associated harm values
+        prevalence : int or float
+            Value that indicates the prevalence among the population, only to be
+            specified in case-control situations
+        nper : int
+            Total number of interventions, multiplies proportion of interventions
+            avoided to get scaled plots
+
+        Returns
+        -------
+        pd.DataFrame
+            Data containing net benefit and interventions avoided scores to be
+            plotted against threshold values
+        """
+
+        rates, prevalence_value = _calc_bin_count_rates(
+            bin_counts=self.bin_counts,
+            totals=self.totals,
+            thresholds=self.thresholds,
+            prevalence=prevalence,
+        )
+
+        return _calc_stats_from_rates(
+            rates=rates,
+            modelnames=self.modelnames,
+            thresholds=self.thresholds,
+            input_df_rownum=self.num_rows,
+            prevalence_value=prevalence_value,
+            harm=harm,
+            nper=nper,
+        )
+
+
+def dca_stream(
+    chunks: Iterable[pd.DataFrame],
+    outcome: str,
+    modelnames: list,
+    thresholds: Iterable = [i / 100 for i in range(0, 100)],
+    harm: Optional[dict] = None,
+    prevalence: Optional[Union[float, int]] = None,
+    nper: Optional[int] = 1,
+    weights: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Perform binary decision curve analysis over an iterator of DataFrame chunks,
+    such as pd.read_csv(..., chunksize=) or Parquet row groups, for cohorts too
+    large to hold in memory. Each chunk is reduced to event and non-event counts
+    per threshold bin and model before the next is read, so peak memory is
+    bounded by the chunk size. Results are identical to running dca() on the
+    concatenated chunks.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        Chunks of the cohort, each containing risk scores (scores ranging from 0
+        to 1) and the outcome of interest
+    outcome : str
+        Column name of outcome of interest in each chunk
+    modelnames : list[str]
+        Column names that contain model risk scores
+    thresholds : Iterable
+        Threshold values (x values) at which net benefit and net interventions
+        avoided will be calculated
+    harm : dict[float]
+        Models with their associated harm values
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    weights : str
+        Column name in each chunk containing sample weights
+
+    Returns
+    -------
+    pd.DataFrame
+        Data containing net benefit and interventions avoided scores to be plotted
+        against threshold values
+
+    Examples
+    --------
+    from dcurves import dca_stream
+
+    import pandas as pd
+
+    |
+
+    dca_results = \
+        dca_stream(
+            chunks=pd.read_csv('cohort.csv', chunksize=1_000_000),
+            outcome='cancer',
+            modelnames=['cancerpredmarker']
+        )
+
+    """
+
+    accumulator = DCAAccumulator(
+        outcome=outcome, modelnames=modelnames, thresholds=thresholds, weights=weights
+    )
+    for chunk in chunks:
+        accumulator.update(chunk)
+    if accumulator.num_rows == 0:
+        raise ValueError("chunks must contain at least one row")
+
+    return accumulator.finalize(harm=harm, prevalence=prevalence, nper=nper)
@@ -0,0 +1,284 @@
+"""
+This module houses the functions used to run binary DCA on random subsamples of
+a cohort: all events and a random fraction of non-events, weighting sampled
+non-events by the inverse of the sampling fraction, or a simple random sample
+of rows as in dca_progressive(), along with the standard error each adds to net
+benefit.
+"""
+
+from typing import Optional, Union, Iterable, Iterator
+import time as timer
+import numpy as np
+import pandas as pd
+
+from .streaming import DCAAccumulator
+
+# Column added to the subsampled data to hold inverse sampling weights
+SAMPLING_WEIGHTS = "_sampling_weight"
+
+
+def _subsample_nonevents(
+    data: pd.DataFrame,
+    outcome: str,
+    nonevent_fraction: float,
+    random_state: Optional[Union[int, np.random.Generator]] = None,
+) -> pd.DataFrame:
+    """
+    Keep every event (and every row with a missing outcome) and each non-event
+    independently with probability nonevent_fraction.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Initial raw data containing risk scores and outcome of interest
+    outcome : str
+        Column name of outcome of interest in data
+    nonevent_fraction : float
+        Probability of keeping each non-event, in (0, 1]
+    random_state : int or np.random.Generator
+        Seed or generator used to draw the sample
+
+    Returns
+    -------
+    pd.DataFrame
+        Sampled rows with a SAMPLING_WEIGHTS column of 1 for kept events and
+        1 / nonevent_fraction for kept non-events
+    """
+
+    if not 0 < nonevent_fraction <= 1:
+        raise ValueError("nonevent_fraction must be in (0, 1]")
+
+    nonevents = data[outcome].isin([False]).to_numpy()
+    rng = np.random.default_rng(random_state)
+    keep = ~nonevents | (rng.random(len(data.index)) < nonevent_fraction)
+
+    sampled_data = data.loc[keep].reset_index(drop=True)
+    sampled_data[SAMPLING_WEIGHTS] = np.where(
+        nonevents[keep], 1 / nonevent_fraction, 1.0
+    )
+
+    return sampled_data
+
+
+def _calc_subsample_se(
+    dca_df: pd.DataFrame,
+    nonevent_fraction: float,
+    num_nonevents: float,
+    prevalence: Optional[Union[float, int]] = None,
+) -> pd.Series:
+    """
+    Estimate the standard error that non-event subsampling adds to net benefit,
+    by the delta method. Each non-event is kept independently with probability
+    f and weighted 1 / f, so a weighted count C of non-events has variance
+    C * (1 - f) / f. Net benefit depends on the weighted count of non-events at
+    or above the threshold (F) and on that of all non-events (N), through
+    (TP - odds * F) / (E + N), or through the ratio F / N when prevalence is
+    supplied.
+
+    Parameters
+    ----------
+    dca_df : pd.DataFrame
+        Output of dca() run on the subsampled data
+    nonevent_fraction : float
+        Probability with which each non-event was kept
+    num_nonevents : float
+        Weighted number of non-events in the subsampled data (N)
+    prevalence : int or float
+        Prevalence supplied to dca(), if any
+
+    Returns
+    -------
+    pd.Series
+        Estimated standard error of net benefit for each row of dca_df
+    """
+
+    f = nonevent_fraction
+    odds = dca_df["threshold"] / (1 - dca_df["threshold"])
+    neg_rate = 1 - dca_df["prevalence"]
+
+    if prevalence is None:
+        gross_net_benefit = dca_df["net_benefit"] + dca_df["harm"]
+        num_rows = num_nonevents / neg_rate
+        variance = (
+            (1 - f) / f / num_rows
+            * (
+                (odds + gross_net_benefit) ** 2 * dca_df["fp_rate"]
+                + gross_net_benefit ** 2 * (neg_rate - dca_df["fp_rate"])
+            )
+        )
+    else:
+        fp_share = dca_df["fp_rate"] / neg_rate
+        variance = (
+            (odds * neg_rate) ** 2
+            * (1 - f) / f
+            * fp_share * (1 - fp_share) / num_nonevents
+        )
+
+    return np.sqrt(variance.clip(lower=0))
+
+
+def _calc_sample_se(
+    dca_df: pd.DataFrame,
+    num_sampled: int,
+    num_rows: int,
+    num_events: int,
+    num_nonevents: int,
+    prevalence: Optional[Union[float, int]] = None,
+) -> pd.Series:
+    """
+    Estimate the standard error of net benefit calculated on a simple random
+    sample of num_sampled of num_rows rows, drawn without replacement. Net
+    benefit is the mean over sampled rows of 1 for a test positive event and
+    -odds for a test positive non-event (or, when prevalence is supplied, a
+    weighted difference of the test positive shares of events and
+    non-events), so its variance follows from the rates themselves with a
+    finite population correction, which is 0 once every row is sampled.
+
+    Parameters
+    ----------
+    dca_df : pd.DataFrame
+        Output of dca() style calculations on the sample
+    num_sampled : int
+        Number of rows sampled
+    num_rows : int
+        Number of rows in the full data
+    num_events : int
+        Number of events sampled
+    num_nonevents : int
+        Number of non-events sampled
+    prevalence : int or float
+        Prevalence supplied, if any
+
+    Returns
+    -------
+    pd.Series
+        Estimated standard error of net benefit for each row of dca_df
+    """
+
+    if num_sampled < 2:
+        return pd.Series(np.inf, index=dca_df.index)
+
+    finite_population_correction = 1 - num_sampled / num_rows
+    odds = dca_df["threshold"] / (1 - dca_df["threshold"])
+
+    if prevalence is None:
+        gross_net_benefit = dca_df["net_benefit"] + dca_df["harm"]
+        variance = (
+            finite_population_correction
+            * (dca_df["tp_rate"] + odds ** 2 * dca_df["fp_rate"] - gross_net_benefit ** 2)
+            / (num_sampled - 1)
+        )
+    else:
+        tp_share = dca_df["tp_rate"] / dca_df["prevalence"]
+        fp_share = dca_df["fp_rate"] / (1 - dca_df["prevalence"])
+        variance = finite_population_correction * (
+            dca_df["prevalence"] ** 2 * tp_share * (1 - tp_share) / max(num_events, 1)
+            + (odds * (1 - dca_df["prevalence"])) ** 2
+            * fp_share * (1 - fp_share) / max(num_nonevents, 1)
+        )
+
+    return np.sqrt(variance.clip(lower=0))
+
+
+def dca_progressive(
+    data: pd.DataFrame,
+    outcome: str,
+    modelnames: list,
+    thresholds: Iterable = [i / 100 for i in range(0, 100)],
+    harm: Optional[dict] = None,
+    prevalence: Optional[Union[float, int]] = None,
+    nper: Optional[int] = 1,
+    initial_rows: int = 1000,
+    growth: float = 4,
+    time_budget: Optional[float] = None,
+    random_state: Optional[Union[int, np.random.Generator]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield binary decision curves on progressively larger random subsamples of
+    data, for interactive exploration. The first curve comes from initial_rows
+    rows; each later one adds rows to the same shuffled sample, reusing the
+    counts already accumulated (see DCAAccumulator), until the full data or
+    the time budget is reached. The last curve on the full data equals dca().
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Data containing risk scores (scores ranging from 0 to 1) and outcome of
+        interest
+    outcome : str
+        Column name of outcome of interest in data
+    modelnames : list[str]
+        Column names from data that contain model risk scores
+    thresholds : Iterable
+        Threshold values (x values) at which net benefit and net interventions
+        avoided will be calculated
+    harm : dict[float]
+        Models with their associated harm values
+    prevalence : int or float
+        Value that indicates the prevalence among the population, only to be
+        specified in case-control situations
+    nper : int
+        Total number of interventions, multiplies proportion of interventions
+        avoided to get scaled plots
+    initial_rows : int
+        Number of rows in the first subsample
+    growth : float
+        Factor by which the subsample grows between curves
+    time_budget : float
+        Seconds after which no further curves are started
+    random_state : int or np.random.Generator
+        Seed or generator used to shuffle the rows
+
+    Yields
+    ------
+    pd.DataFrame
+        Data containing net benefit and interventions avoided scores, with n
+        set to the rows sampled so far, a net_benefit_se column estimating the
+        sampling error and a 95% band in net_benefit_lower/net_benefit_upper
+
+    Examples
+    --------
+    from dcurves import dca_progressive, plot_graphs
+
+    |
+
+    for dca_results in dca_progressive(data=df, outcome='cancer',
+                                       modelnames=['cancerpredmarker'],
+                                       time_budget=2):
+        plot_graphs(plot_df=dca_results, graph_type='net_benefit')
+
+    """
+
+    if initial_rows < 1 or growth <= 1:
+        raise ValueError("initial_rows must be at least 1 and growth above 1")
+
+    num_rows = len(data.index)
+    order = np.random.default_rng(random_state).permutation(num_rows)
+    accumulator = DCAAccumulator(
+        outcome=outcome, modelnames=modelnames, thresholds=thresholds
+    )
+    start_time = timer.perf_counter()
+
+    num_sampled = 0
+    stop = min(int(initial_rows), num_rows)
+    while num_sampled < num_rows:
+        accumulator.update(data.iloc[order[num_sampled:stop]])
+        num_sampled = stop
+
+        dca_df = accumulator.finalize(harm=harm, prevalence=prevalence, nper=nper)
+        dca_df["net_benefit_se"] = _calc_sample_se(
+            dca_df=dca_df,
+            num_sampled=num_sampled,
+            num_rows=num_rows,
+            num_events=int(accumulator.totals[1]),
+            num_nonevents=int(accumulator.totals[2]),
+            prevalence=prevalence,
+        )
+        band = 1.96 * dca_df["net_benefit_se"]
+        dca_df["net_benefit_lower"] = dca_df["net_benefit"] - band
+        dca_df["net_benefit_upper"] = dca_df["net_benefit"] + band
+        yield dca_df
+
+        if time_budget is not None and timer.perf_counter() - start_time > time_budget:
+            return
+        stop = min(int(np.ceil(num_sampled * growth)), num_rows)
@@ -0,0 +1,59 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.benefit import (
+    _calc_net_benefit,
+    _calc_net_intervention_avoided,
+    _calc_threshold_odds,
+)
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import warnings
+import numpy as np
+
+
+def test_net_benefit_kernels_write_in_place():
+
+    odds = _calc_threshold_odds([0.1, 0.2, 0.5])
+    tp_rate = np.array([[0.2, 0.15, 0.1], [0.3, 0.3, 0.3]])
+    fp_rate = np.array([[0.3, 0.2, 0.05], [0.7, 0.7, 0.7]])
+    harm = np.array([[0.01], [0.0]])
+
+    stats = np.empty((2, 2, 3))
+    net_benefit = _calc_net_benefit(tp_rate=tp_rate, fp_rate=fp_rate, harm=harm, odds=odds, out=stats[0])
+    net_intervention_avoided = \
+        _calc_net_intervention_avoided(
+            net_benefit=net_benefit,
+            net_benefit_all=net_benefit[1],
+            odds=odds,
+            nper=100,
+            out=stats[1]
+        )
+
+    assert np.shares_memory(net_benefit, stats[0]) and np.shares_memory(net_intervention_avoided, stats[1])
+    np.testing.assert_array_equal(net_benefit, tp_rate - odds * fp_rate - harm)
+    np.testing.assert_array_equal(net_intervention_avoided, (net_benefit - net_benefit[1]) / odds * 100)
+
+
+def test_net_benefit_grid_endpoints():
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        dca_df = \
+            dca(
+                data=load_binary_df(),
+                outcome='cancer',
+                modelnames=['cancerpredmarker'],
+                thresholds=[0, 0.5, 1]
+            )
+
+    at_zero = dca_df[dca_df['threshold'] == 0].set_index('model')
+    assert at_zero['net_intervention_avoided'].isna().all()
+    assert (at_zero['net_benefit'] == at_zero['tp_rate']).all()
+
+    at_one = dca_df[dca_df['threshold'] == 1].set_index('model')
+    assert at_one.loc['none', 'net_benefit'] == 0
+    assert at_one.loc['cancerpredmarker', 'net_benefit'] == 0
+    assert at_one.loc['all', 'net_benefit'] == -np.inf
@@ -1,10 +1,12 @@
 
 # Load Functions To Test/Needed For Testing
-from dcurves.dca import _calc_tp_rate, _calc_fp_rate, dca
+from dcurves.dca import dca
+from dcurves.rates import _calc_tp_rate, _calc_fp_rate
 from dcurves.risks import _create_risks_df
-from dcurves.dca import _calc_prevalence, _create_initial_df, _calc_initial_stats
-from dcurves.dca import _calc_more_stats
-from dcurves.dca import _rectify_model_risk_boundaries
+from dcurves.dca import _calc_prevalence
+from dcurves.stats import _create_initial_df, _calc_initial_stats
+from dcurves.stats import _calc_more_stats
+from dcurves.risks import _rectify_model_risk_boundaries
 
 # Load Data for Testing
 from .load_test_data import load_r_case1_results
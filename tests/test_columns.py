@@ -0,0 +1,121 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca, dca_iter
+from dcurves.columns import _select_columns
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+import pytest
+
+MODELNAMES = ['famhistory', 'cancerpredmarker', 'marker']
+
+
+def test_dca_dict_of_arrays():
+
+    data = load_binary_df()
+    arrays = {column: data[column].to_numpy() for column in data.columns}
+
+    selected_df = _select_columns(data=arrays, columns=['cancer', 'marker'])
+    assert np.shares_memory(selected_df['marker'].to_numpy(), arrays['marker'])
+
+    pd.testing.assert_frame_equal(
+        dca(data=arrays, outcome='cancer', modelnames=MODELNAMES,
+            models_to_prob=['marker']),
+        dca(data=data, outcome='cancer', modelnames=MODELNAMES,
+            models_to_prob=['marker'])
+    )
+
+
+def test_dca_structured_array():
+
+    data = load_survival_df()
+    columns = ['cancer', 'ttcancer', 'famhistory', 'cancerpredmarker']
+    records = data[columns].to_records(index=False)
+
+    selected_df = _select_columns(data=records, columns=columns)
+    assert np.shares_memory(selected_df['ttcancer'].to_numpy(), records)
+
+    pd.testing.assert_frame_equal(
+        dca(data=records, outcome='cancer', modelnames=columns[2:],
+            thresholds=[0.1, 0.2, 0.3], time=1, time_to_outcome_col='ttcancer'),
+        dca(data=data, outcome='cancer', modelnames=columns[2:],
+            thresholds=[0.1, 0.2, 0.3], time=1, time_to_outcome_col='ttcancer')
+    )
+
+
+def test_dca_arrow_inputs():
+
+    pa = pytest.importorskip('pyarrow')
+
+    data = load_binary_df()
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    arrow_df = table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    expected_df = dca(data=data, outcome='cancer', modelnames=MODELNAMES,
+                      thresholds='all')
+    for arrow_data in [table, arrow_df]:
+        selected_df = _select_columns(data=arrow_data, columns=['cancer', 'marker'])
+        assert selected_df['marker'].dtype == np.float64
+        assert np.shares_memory(
+            selected_df['marker'].to_numpy(),
+            np.frombuffer(table.column('marker').chunk(0).buffers()[1])
+        )
+
+        pd.testing.assert_frame_equal(
+            dca(data=arrow_data, outcome='cancer', modelnames=MODELNAMES,
+                thresholds='all'),
+            expected_df
+        )
+
+
+def test_select_columns_errors():
+
+    arrays = {'cancer': np.array([True, False]), 'marker': np.array([0.1, 0.2])}
+
+    with pytest.raises(ValueError, match='not found'):
+        _select_columns(data=arrays, columns=['cancer', 'famhistory'])
+    with pytest.raises(ValueError, match='same length'):
+        _select_columns(data={**arrays, 'famhistory': np.array([0])},
+                        columns=['cancer', 'famhistory'])
+    with pytest.raises(ValueError, match='1-dimensional'):
+        _select_columns(data={'marker': np.zeros((2, 2))}, columns=['marker'])
+    with pytest.raises(ValueError, match='data must be'):
+        _select_columns(data=[[0.1, 0.2]], columns=['marker'])
+
+
+def test_dca_polars_inputs():
+
+    pl = pytest.importorskip('polars')
+
+    data = load_binary_df()
+    polars_df = pl.DataFrame({column: data[column].to_numpy() for column in data.columns})
+
+    expected_df = dca(data=data, outcome='cancer', modelnames=MODELNAMES,
+                      models_to_prob=['marker'])
+    for polars_data in [polars_df, polars_df.lazy()]:
+        selected_df = _select_columns(data=polars_data, columns=['cancer', 'marker'])
+        assert list(selected_df.columns) == ['cancer', 'marker']
+
+        dca_df = dca(data=polars_data, outcome='cancer', modelnames=MODELNAMES,
+                     models_to_prob=['marker'])
+        assert isinstance(dca_df, pl.DataFrame)
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(dca_df.to_dict(as_series=False)),
+            expected_df
+        )
+
+    assert np.shares_memory(
+        _select_columns(data=polars_df, columns=['marker'])['marker'].to_numpy(),
+        polars_df.get_column('marker').to_numpy()
+    )
+
+    iter_dfs = list(dca_iter(data=polars_df.lazy(), outcome='cancer',
+                             modelnames=MODELNAMES, models_to_prob=['marker']))
+    assert all(isinstance(iter_df, pl.DataFrame) for iter_df in iter_dfs)
+    assert pl.concat(iter_dfs).equals(
+        dca(data=polars_df, outcome='cancer', modelnames=MODELNAMES,
+            models_to_prob=['marker'])
+    )
@@ -0,0 +1,112 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves import compact
+from dcurves.compact import _pack_outcome, _unpack_outcome_block
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_pack_outcome_roundtrip(monkeypatch):
+
+    monkeypatch.setattr(compact, 'COMPACT_BLOCK_ROWS', 16)
+    outcome_values = pd.Series([True, False, None, True] * 10 + [False])
+
+    packed_events, packed_nonevents, num_events, num_nonevents = \
+        _pack_outcome(outcome_values)
+
+    assert num_events == 20
+    assert num_nonevents == 11
+    assert np.array_equal(
+        _unpack_outcome_block(packed_events, 16, 41),
+        outcome_values.iloc[16:41].isin([True]).to_numpy()
+    )
+    assert np.array_equal(
+        _unpack_outcome_block(packed_nonevents, 0, 41),
+        outcome_values.isin([False]).to_numpy()
+    )
+
+
+def test_compact_matches_float64(monkeypatch):
+
+    monkeypatch.setattr(compact, 'COMPACT_BLOCK_ROWS', 96)
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker', 'marker']
+
+    default_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            models_to_prob=['marker'],
+            harm={'marker': 0.0333}
+        )
+
+    quantized_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            models_to_prob=['marker'],
+            harm={'marker': 0.0333},
+            compact='quantized'
+        )
+
+    float32_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            models_to_prob=['marker'],
+            harm={'marker': 0.0333},
+            compact='float32'
+        )
+
+    pd.testing.assert_frame_equal(quantized_df, default_df, check_exact=True)
+    pd.testing.assert_frame_equal(float32_df, default_df, rtol=0, atol=1 / len(data))
+
+
+def test_float32_scores_on_threshold_grid():
+
+    # Scores with 2 decimals sit exactly on the threshold grid, including 0 and 1
+    rng = np.random.default_rng(seed=3)
+    data = pd.DataFrame({'score': rng.integers(0, 101, size=5000) / 100})
+    data['outcome'] = rng.random(5000) < data['score']
+    thresholds = [i / 100 for i in range(0, 101)]
+
+    default_df = \
+        dca(
+            data=data,
+            outcome='outcome',
+            modelnames=['score'],
+            thresholds=thresholds
+        )
+
+    float32_df = \
+        dca(
+            data=data,
+            outcome='outcome',
+            modelnames=['score'],
+            thresholds=thresholds,
+            compact='float32'
+        )
+
+    pd.testing.assert_frame_equal(float32_df, default_df, check_exact=True)
+
+
+def test_compact_requires_binary_outcome():
+
+    with pytest.raises(ValueError, match="compact is only available for binary outcomes"):
+        dca(
+            data=load_survival_df(),
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            time=1,
+            time_to_outcome_col='ttcancer',
+            compact='float32'
+        )
@@ -1,9 +1,9 @@
 
 # load risk functions
-from dcurves.dca import _create_initial_df
+from dcurves.stats import _create_initial_df
 from dcurves.dca import _calc_prevalence
 from dcurves.risks import _create_risks_df
-from dcurves.dca import _rectify_model_risk_boundaries
+from dcurves.risks import _rectify_model_risk_boundaries
 # load tools
 import pandas as pd
 import pytest
@@ -0,0 +1,84 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.counts import dca_from_counts
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import pandas as pd
+import pytest
+
+
+def _aggregate_rows(data, modelnames, outcome):
+
+    return \
+        data.assign(
+            n_events=data[outcome] == 1,
+            n_nonevents=data[outcome] == 0
+        ).groupby(modelnames, dropna=False)[['n_events', 'n_nonevents']] \
+        .sum().reset_index()
+
+
+def test_dca_from_counts_matches_row_level_dca():
+
+    data = load_binary_df()
+
+    for modelnames, thresholds in [(['famhistory'], [i/100 for i in range(0, 100)]),
+                                   (['cancerpredmarker', 'famhistory'], 'all')]:
+        counts = _aggregate_rows(data, modelnames, 'cancer')
+
+        counts_df = \
+            dca_from_counts(
+                counts=counts,
+                modelnames=modelnames,
+                thresholds=thresholds,
+                harm={'famhistory': 0.01}
+            )
+
+        row_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                thresholds=thresholds,
+                harm={'famhistory': 0.01}
+            )
+
+        pd.testing.assert_frame_equal(counts_df, row_df, check_exact=True)
+
+
+def test_dca_from_counts_prevalence_override():
+
+    counts = \
+        pd.DataFrame(
+            {
+                'score': [0.0, 0.1, 0.3, 1.0],
+                'n_events': [5, 20, 30, 15],
+                'n_nonevents': [50, 20, 10, 0]
+            }
+        )
+
+    dca_df = \
+        dca_from_counts(
+            counts=counts,
+            modelnames=['score'],
+            thresholds=[0.05, 0.2],
+            prevalence=0.2
+        )
+
+    assert (dca_df.n == 150).all()
+    assert (dca_df.prevalence == 0.2).all()
+    assert dca_df.test_pos_rate.tolist()[:2] == [95/150, 55/150]
+    assert dca_df.tp_rate.tolist()[:2] == [65/70 * 0.2, 45/70 * 0.2]
+
+
+def test_dca_from_counts_rejects_bad_tables():
+
+    counts = pd.DataFrame({'score': [0.1, 0.2], 'n_events': [1, -1], 'n_nonevents': [3, 4]})
+
+    with pytest.raises(ValueError, match="non-negative"):
+        dca_from_counts(counts=counts, modelnames=['score'])
+
+    with pytest.raises(ValueError, match="missing columns: marker"):
+        dca_from_counts(counts=counts, modelnames=['marker'])
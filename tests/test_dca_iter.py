@@ -0,0 +1,75 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca, dca_iter
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import pandas as pd
+import pytest
+
+
+def test_dca_iter_matches_dca():
+
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    for engine in ['sort', 'binned', 'loop']:
+        model_dfs = \
+            list(
+                dca_iter(
+                    data=data,
+                    outcome='cancer',
+                    modelnames=modelnames,
+                    harm={'famhistory': 0.01},
+                    engine=engine
+                )
+            )
+
+        dca_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                harm={'famhistory': 0.01},
+                engine=engine
+            )
+
+        assert [model_df['model'].iloc[0] for model_df in model_dfs] == modelnames + ['all', 'none']
+        pd.testing.assert_frame_equal(pd.concat(model_dfs, ignore_index=True), dca_df)
+
+
+def test_dca_iter_matches_survival_dca():
+
+    data = load_survival_df()
+
+    iter_df = \
+        pd.concat(
+            dca_iter(
+                data=data,
+                outcome='cancer',
+                modelnames=['cancerpredmarker'],
+                thresholds=[i / 100 for i in range(0, 50, 5)],
+                time=1,
+                time_to_outcome_col='ttcancer'
+            ),
+            ignore_index=True
+        )
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            thresholds=[i / 100 for i in range(0, 50, 5)],
+            time=1,
+            time_to_outcome_col='ttcancer'
+        )
+
+    pd.testing.assert_frame_equal(iter_df, dca_df)
+
+
+def test_dca_iter_rejects_bad_engine():
+
+    with pytest.raises(ValueError, match="engine"):
+        next(dca_iter(data=load_binary_df(), outcome='cancer', modelnames=['famhistory'], engine='fast'))
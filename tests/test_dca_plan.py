@@ -0,0 +1,114 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.fused import DCAPlan
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_dca_plan_matches_dca():
+
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    plan_df = \
+        DCAPlan(data=data, outcome='cancer') \
+        .models(['famhistory'], harm={'famhistory': 0.01}) \
+        .models(['famhistory', 'cancerpredmarker']) \
+        .collect()
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            harm={'famhistory': 0.01}
+        )
+
+    pd.testing.assert_frame_equal(plan_df, dca_df)
+
+
+def test_dca_plan_subgroups_match_dca():
+
+    data = load_binary_df()
+    modelnames = ['cancerpredmarker', 'marker']
+
+    plan_df = \
+        DCAPlan(data=data, outcome='cancer', thresholds='all') \
+        .models(modelnames) \
+        .by('famhistory') \
+        .collect()
+
+    for famhistory, group_data in data.groupby('famhistory'):
+        dca_df = \
+            dca(
+                data=group_data,
+                outcome='cancer',
+                modelnames=modelnames,
+                thresholds=sorted(plan_df['threshold'].unique())
+            )
+        group_df = \
+            plan_df[plan_df['famhistory'] == famhistory] \
+            .drop(columns='famhistory') \
+            .reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(group_df, dca_df, check_dtype=False)
+
+
+def test_dca_plan_bootstrap_and_smooth():
+
+    data = load_binary_df()
+
+    plan_df = \
+        DCAPlan(data=data, outcome='cancer', thresholds=np.arange(0, 0.5, 0.05)) \
+        .models(['cancerpredmarker']) \
+        .by('famhistory') \
+        .bootstrap(n_boot=50, random_state=3) \
+        .smooth(window=3) \
+        .collect()
+
+    assert (plan_df['net_benefit_lower'] <= plan_df['net_benefit'] + 1e-12).all()
+    assert (plan_df['net_benefit_upper'] >= plan_df['net_benefit'] - 1e-12).all()
+    assert (plan_df['net_benefit_upper'] > plan_df['net_benefit_lower']).any()
+
+    none_df = plan_df[plan_df['model'] == 'none']
+    assert (none_df['net_benefit_lower'] == 0).all() and (none_df['net_benefit_upper'] == 0).all()
+
+    curve = plan_df[(plan_df['model'] == 'cancerpredmarker') & (plan_df['famhistory'] == 0)]
+    expected = curve['net_benefit'].rolling(3, center=True, min_periods=1).mean()
+    np.testing.assert_allclose(curve['net_benefit_smooth'], expected)
+
+
+def test_dca_plan_rejects_bad_input():
+
+    data = load_binary_df()
+
+    with pytest.raises(ValueError, match="at least one model"):
+        DCAPlan(data=data, outcome='cancer').collect()
+
+    with pytest.raises(ValueError, match="not found"):
+        DCAPlan(data=data, outcome='cancer').by('nonexistent')
+
+
+def test_dca_plan_dict_of_arrays():
+
+    data = load_binary_df()
+    arrays = {column: data[column].to_numpy() for column in data.columns}
+
+    plan_dfs = [
+        DCAPlan(data=plan_data, outcome='cancer')
+        .models(['cancerpredmarker', 'marker'], models_to_prob=['marker'])
+        .by('famhistory')
+        .collect()
+        for plan_data in [arrays, data]
+    ]
+
+    pd.testing.assert_frame_equal(plan_dfs[0], plan_dfs[1])
+
+    with pytest.raises(ValueError, match="not found"):
+        DCAPlan(data=arrays, outcome='cancer').models(['nonexistent'])
@@ -0,0 +1,90 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.subsample import dca_progressive
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+
+
+def test_progressive_curves_refine_to_dca():
+
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    progressive_dfs = \
+        list(
+            dca_progressive(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                initial_rows=100,
+                growth=3,
+                random_state=12
+            )
+        )
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames
+        )
+
+    assert [df.n.iloc[0] for df in progressive_dfs] == [100, 300, 750]
+    assert (progressive_dfs[-1].net_benefit_se == 0).all()
+    pd.testing.assert_frame_equal(
+        progressive_dfs[-1].drop(
+            columns=['net_benefit_se', 'net_benefit_lower', 'net_benefit_upper']
+        ),
+        dca_df,
+        check_exact=True
+    )
+
+
+def test_progressive_band_covers_full_data_curve():
+
+    rng = np.random.default_rng(seed=13)
+    data = pd.DataFrame({'score': rng.beta(2, 8, size=40000)})
+    data['outcome'] = rng.random(40000) < data['score']
+    thresholds = [i/20 for i in range(1, 10)]
+
+    full_df = dca(data=data, outcome='outcome', modelnames=['score'], thresholds=thresholds)
+
+    first_df = \
+        next(
+            dca_progressive(
+                data=data,
+                outcome='outcome',
+                modelnames=['score'],
+                thresholds=thresholds,
+                random_state=14
+            )
+        )
+
+    assert (first_df.n == 1000).all()
+    model_rows = first_df.model != 'none'
+    assert (first_df.net_benefit_se[model_rows] > 0).all()
+    assert (
+        (first_df.net_benefit - full_df.net_benefit).abs()
+        <= 4 * first_df.net_benefit_se + 1e-12
+    ).all()
+
+
+def test_progressive_stops_at_time_budget():
+
+    progressive_dfs = \
+        list(
+            dca_progressive(
+                data=load_binary_df(),
+                outcome='cancer',
+                modelnames=['famhistory'],
+                initial_rows=10,
+                time_budget=0
+            )
+        )
+
+    assert len(progressive_dfs) == 1
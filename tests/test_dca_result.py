@@ -0,0 +1,105 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.result import DCAResult
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+
+
+def test_dca_result_to_frame_matches_dca():
+
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    for kwargs in [{'engine': 'sort'}, {'engine': 'loop'}, {'compact': 'quantized'},
+                   {'thresholds': 'all'}, {'nonevent_fraction': 0.5, 'random_state': 1}]:
+        dca_result = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                harm={'famhistory': 0.01},
+                as_result=True,
+                **kwargs
+            )
+
+        dca_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                harm={'famhistory': 0.01},
+                **kwargs
+            )
+
+        assert isinstance(dca_result, DCAResult)
+        assert dca_result['net_benefit'].shape == (4, len(dca_df.index) // 4)
+        pd.testing.assert_frame_equal(dca_result.to_frame(), dca_df)
+
+
+def test_dca_result_survival_matches_dca():
+
+    data = load_survival_df()
+    thresholds = [i / 100 for i in range(0, 50, 5)]
+
+    dca_result = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            thresholds=thresholds,
+            time=1,
+            time_to_outcome_col='ttcancer',
+            as_result=True
+        )
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            thresholds=thresholds,
+            time=1,
+            time_to_outcome_col='ttcancer'
+        )
+
+    pd.testing.assert_frame_equal(dca_result.to_frame(), dca_df)
+
+
+def test_dca_result_from_frame_round_trips():
+
+    dca_df = dca(data=load_binary_df(), outcome='cancer', modelnames=['cancerpredmarker'])
+
+    dca_result = DCAResult.from_frame(dca_df)
+
+    assert list(dca_result.model_index) == ['cancerpredmarker', 'all', 'none']
+    np.testing.assert_array_equal(dca_result.thresholds, dca_df['threshold'].unique())
+    pd.testing.assert_frame_equal(dca_result.to_frame(), dca_df)
+
+
+def test_dca_result_compact_frame():
+
+    dca_result = \
+        dca(
+            data=load_binary_df(),
+            outcome='cancer',
+            modelnames=['famhistory', 'cancerpredmarker'],
+            as_result=True
+        )
+
+    dca_df = dca_result.to_frame()
+    compact_df = dca_result.to_frame(compact=True, dtype='float32')
+
+    assert isinstance(compact_df['model'].dtype, pd.CategoricalDtype)
+    assert list(compact_df['model'].cat.categories) == ['famhistory', 'cancerpredmarker', 'all', 'none']
+    assert 'n' not in compact_df.columns and 'prevalence' not in compact_df.columns
+    assert compact_df.attrs == {'n': dca_df['n'].iloc[0], 'prevalence': dca_df['prevalence'].iloc[0]}
+    assert compact_df['net_benefit'].dtype == np.float32
+    assert compact_df.memory_usage(deep=True).sum() < dca_df.memory_usage(deep=True).sum() / 2
+
+    np.testing.assert_allclose(compact_df['net_benefit'], dca_df['net_benefit'], rtol=1e-6, atol=1e-7)
+    pd.testing.assert_frame_equal(DCAResult.from_frame(dca_result.to_frame(compact=True)).to_frame(), dca_df)
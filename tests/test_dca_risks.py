@@ -4,15 +4,18 @@ from .load_test_data import load_binary_df, load_survival_df
 from .load_test_data import load_tutorial_bin_marker_risks_list
 
 import dcurves
-from dcurves.risks import _rectify_model_risk_boundaries
+from dcurves.risks import _rectify_model_risk_boundaries, _rectify_thresholds
+from dcurves.risks import _select_risk_columns
 
 # load risk functions
 from dcurves.risks import _calc_binary_risks, _calc_surv_risks
 from dcurves.risks import _create_risks_df
 
 # load tools
+import numpy as np
 import pandas as pd
 import sys
+import tracemalloc
 
 def test_bin_dca_risks_calc():
     r_marker_risks_df = load_tutorial_bin_marker_risks_list().copy()
@@ -68,7 +71,91 @@ def test_rectify_model_risk_boundaries():
     # machine_epsilon = np.finfo(float).eps
     machine_epsilon = sys.float_info.epsilon
 
-    assert rectified_risks_df['all'][0] == 1 + machine_epsilon
-    assert not rectified_risks_df['all'][0] == 1
-    assert rectified_risks_df['none'][0] == 0 - machine_epsilon
-    assert not rectified_risks_df['none'][0] == 0
\ No newline at end of file
+    # 'all'/'none' references are calculated in closed form, not as columns
+    assert 'all' not in rectified_risks_df.columns
+    assert 'none' not in rectified_risks_df.columns
+
+    famhistory = data['famhistory']
+    assert (rectified_risks_df.loc[famhistory == 1, 'famhistory'] == 1 + machine_epsilon).all()
+    assert not (rectified_risks_df['famhistory'] == 1).any()
+    assert (rectified_risks_df.loc[famhistory == 0, 'famhistory'] == 0 - machine_epsilon).all()
+    assert not (rectified_risks_df['famhistory'] == 0).any()
+
+def test_risks_preprocessing_leaves_data_unchanged():
+
+    data = load_binary_df()
+    original_data = data.copy()
+
+    risks_df = \
+        _create_risks_df(
+            data=_select_risk_columns(
+                data=data,
+                outcome='cancer',
+                modelnames=['famhistory', 'marker'],
+                models_to_prob=['marker']
+            ),
+            outcome='cancer',
+            models_to_prob=['marker']
+        )
+    _rectify_model_risk_boundaries(
+        risks_df=risks_df,
+        modelnames=['famhistory', 'marker']
+    )
+    dcurves.dca(
+        data=data,
+        outcome='cancer',
+        modelnames=['famhistory', 'marker'],
+        models_to_prob=['marker']
+    )
+
+    assert list(risks_df.columns) == ['cancer', 'famhistory', 'marker']
+    assert (risks_df['famhistory'] == data['famhistory']).all()
+    pd.testing.assert_frame_equal(data, original_data)
+
+
+def test_rectify_thresholds_matches_rectified_scores():
+
+    machine_epsilon = sys.float_info.epsilon
+    risks_df = pd.DataFrame({'model': [0, 0.5, 1, 1e-300, 0.2, 1.5, np.nan]})
+    thresholds = [-1, -machine_epsilon, -0.0, 0, 1e-300, 0.2, 0.99, 1,
+                  1 + machine_epsilon, 1.5]
+
+    rectified_risks = \
+        _rectify_model_risk_boundaries(
+            risks_df=risks_df,
+            modelnames=['model']
+        )['model'].to_numpy()
+    comparison_thresholds = _rectify_thresholds(thresholds)
+
+    risks = risks_df['model'].to_numpy()
+    for threshold, comparison_threshold in zip(thresholds, comparison_thresholds):
+        assert ((risks >= comparison_threshold) == (rectified_risks >= threshold)).all()
+        assert (
+            (rectified_risks >= comparison_threshold)
+            == (rectified_risks >= threshold)
+        ).all()
+
+
+def test_dca_memory_on_wide_data():
+
+    # Peak memory should follow the selected columns, not the whole frame
+    rng = np.random.default_rng(0)
+    num_rows = 20000
+    wide_df = pd.DataFrame(rng.random((num_rows, 200)),
+                           columns=['x' + str(i) for i in range(200)])
+    wide_df['cancer'] = rng.random(num_rows) < 0.2
+    wide_df['model'] = rng.random(num_rows)
+
+    for engine in ['sort', 'loop']:
+        tracemalloc.start()
+        dcurves.dca(
+            data=wide_df,
+            outcome='cancer',
+            modelnames=['model'],
+            thresholds=np.arange(0, 1, 0.1),
+            engine=engine
+        )
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert peak_bytes < wide_df.memory_usage().sum() / 10
@@ -0,0 +1,85 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.streaming import dca_stream, DCAAccumulator
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_dca_stream_matches_dca():
+
+    data = load_binary_df()
+    data['wt'] = np.random.default_rng(seed=9).integers(1, 4, size=len(data))
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    for weights in [None, 'wt']:
+        stream_df = \
+            dca_stream(
+                chunks=(data.iloc[start:start + 128] for start in range(0, len(data), 128)),
+                outcome='cancer',
+                modelnames=modelnames,
+                harm={'famhistory': 0.01},
+                weights=weights
+            )
+
+        dca_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                harm={'famhistory': 0.01},
+                weights=weights
+            )
+
+        pd.testing.assert_frame_equal(stream_df, dca_df, check_exact=weights is None)
+
+
+def test_dca_stream_rejects_empty_input():
+
+    with pytest.raises(ValueError, match="at least one row"):
+        dca_stream(chunks=iter([]), outcome='cancer', modelnames=['famhistory'])
+
+
+def test_merged_accumulators_match_dca():
+
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    payloads = []
+    for shard in np.array_split(data.index, 3):
+        accumulator = DCAAccumulator(outcome='cancer', modelnames=modelnames)
+        for chunk in np.array_split(shard, 2):
+            accumulator.update(data.loc[chunk])
+        payloads.append(accumulator.to_bytes())
+
+    combined = DCAAccumulator.from_bytes(payloads[0])
+    for payload in payloads[1:]:
+        combined.merge(DCAAccumulator.from_bytes(payload))
+
+    assert combined.bin_counts.dtype == np.int64
+    assert combined.num_rows == len(data)
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            prevalence=0.2
+        )
+
+    pd.testing.assert_frame_equal(combined.finalize(prevalence=0.2), dca_df, check_exact=True)
+
+
+def test_accumulator_merge_requires_same_settings():
+
+    accumulator = DCAAccumulator(outcome='cancer', modelnames=['famhistory'])
+
+    with pytest.raises(ValueError, match="same outcome, modelnames, thresholds"):
+        accumulator.merge(
+            DCAAccumulator(outcome='cancer', modelnames=['famhistory'], thresholds=[0.1])
+        )
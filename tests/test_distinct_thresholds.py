@@ -0,0 +1,49 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_all_thresholds_match_explicit_distinct_risks():
+
+    data = load_binary_df()
+    modelnames = ['cancerpredmarker', 'famhistory']
+
+    risks = np.unique(data[modelnames].to_numpy(dtype=float))
+    distinct_risks = [0.0] + [risk for risk in risks if 0 < risk < 1]
+
+    all_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            thresholds='all'
+        )
+
+    explicit_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            thresholds=distinct_risks
+        )
+
+    assert all_df[all_df.model == 'cancerpredmarker'].threshold.tolist() == distinct_risks
+    pd.testing.assert_frame_equal(all_df, explicit_df, check_exact=True)
+
+
+def test_unknown_thresholds_string():
+
+    with pytest.raises(ValueError, match="thresholds must be an iterable"):
+        dca(
+            data=load_binary_df(),
+            outcome='cancer',
+            modelnames=['famhistory'],
+            thresholds='every'
+        )
@@ -0,0 +1,198 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.engines import _calc_binary_counts_matrix
+from dcurves.engines import _calc_level_table, _calc_level_counts
+from dcurves.engines import _calc_binned_counts_matrix, _calc_reference_rates
+from dcurves.rates import _calc_test_pos_rate, _calc_tp_rate, _calc_fp_rate
+from dcurves.prevalence import _calc_prevalence
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+
+
+def test_binary_counts_match_threshold_loop():
+
+    rng = np.random.default_rng(seed=1)
+    scores = rng.integers(0, 20, size=500) / 20
+    scores[::37] = np.nan
+    events = rng.random(500) < 0.3
+    thresholds = [i/100 for i in range(0, 100)]
+
+    test_pos, tp, fp = (
+        counts[0] for counts in
+        _calc_binary_counts_matrix(
+            score_matrix=scores[:, None],
+            events=events,
+            nonevents=~events,
+            thresholds=thresholds
+        )
+    )
+
+    for i, threshold in enumerate(thresholds):
+        above = scores >= threshold
+        assert test_pos[i] == above.sum()
+        assert tp[i] == (above & events).sum()
+        assert fp[i] == (above & ~events).sum()
+
+
+def test_binary_counts_matrix_matches_threshold_loop_per_model():
+
+    rng = np.random.default_rng(seed=2)
+    score_matrix = rng.integers(0, 50, size=(400, 4)) / 50
+    score_matrix[::23, 1] = np.nan
+    events = rng.random(400) < 0.2
+    nonevents = ~events
+    nonevents[::31] = False
+    thresholds = [0.5, 0.1, 0.1, 0.98, 0.0, 0.34]
+
+    matrix_counts = \
+        _calc_binary_counts_matrix(
+            score_matrix=score_matrix,
+            events=events,
+            nonevents=nonevents,
+            thresholds=thresholds
+        )
+
+    test_pos, tp, fp = matrix_counts
+    for col in range(score_matrix.shape[1]):
+        for i, threshold in enumerate(thresholds):
+            above = score_matrix[:, col] >= threshold
+            assert test_pos[col, i] == above.sum()
+            assert tp[col, i] == (above & events).sum()
+            assert fp[col, i] == (above & nonevents).sum()
+
+
+def test_level_counts_match_sorted_counts():
+
+    rng = np.random.default_rng(seed=3)
+    scores = rng.choice([0.0, 0.25, 0.5, 1.0, np.nan], size=1000)
+    events = rng.random(1000) < 0.4
+    thresholds = [i/100 for i in range(0, 100)] + [1.5, -0.5]
+
+    level_table = \
+        _calc_level_table(
+            scores=scores,
+            events=events,
+            nonevents=~events
+        )
+
+    assert np.array_equal(level_table[0], [0.0, 0.25, 0.5, 1.0])
+    assert level_table[1].sum() == (~np.isnan(scores)).sum()
+
+    level_counts = _calc_level_counts(*level_table, thresholds=thresholds)
+    sorted_counts = \
+        _calc_binary_counts_matrix(
+            score_matrix=scores[:, None],
+            events=events,
+            nonevents=~events,
+            thresholds=thresholds
+        )
+
+    for level_count, sorted_count in zip(level_counts, sorted_counts):
+        assert np.array_equal(level_count, sorted_count[0])
+
+
+def test_level_table_skips_high_cardinality_scores():
+
+    rng = np.random.default_rng(seed=4)
+    scores = rng.random(5000)
+    events = rng.random(5000) < 0.4
+
+    assert _calc_level_table(scores=scores, events=events, nonevents=~events) is None
+    assert _calc_level_table(
+        scores=np.round(scores, 1), events=events, nonevents=~events
+    ) is not None
+
+
+def test_binned_counts_match_sorted_counts():
+
+    rng = np.random.default_rng(seed=5)
+    score_matrix = rng.integers(0, 200, size=(600, 3)) / 200
+    score_matrix[::41, 2] = np.nan
+    events = rng.random(600) < 0.25
+    nonevents = ~events
+    thresholds = [0.3, 0.05, 0.05, 0.99, 0.0, 0.5, 1.2]
+
+    binned_counts = \
+        _calc_binned_counts_matrix(
+            score_matrix=score_matrix,
+            events=events,
+            nonevents=nonevents,
+            thresholds=thresholds
+        )
+    sorted_counts = \
+        _calc_binary_counts_matrix(
+            score_matrix=score_matrix,
+            events=events,
+            nonevents=nonevents,
+            thresholds=thresholds
+        )
+
+    for binned_count, sorted_count in zip(binned_counts, sorted_counts):
+        assert np.array_equal(binned_count, sorted_count)
+
+
+def test_sort_engine_matches_loop_engine():
+
+    data = load_binary_df()
+
+    for modelnames in [['famhistory'], ['marker', 'cancerpredmarker']]:
+        sort_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                engine='sort'
+            )
+
+        loop_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                engine='loop'
+            )
+
+        binned_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                engine='binned'
+            )
+
+        pd.testing.assert_frame_equal(sort_df, loop_df, check_exact=True)
+        pd.testing.assert_frame_equal(binned_df, loop_df, check_exact=True)
+
+
+def test_reference_rates_match_constant_score_columns():
+
+    thresholds = [-0.01, 0, 0.5, 1, 1.01]
+
+    for data, survival_args in [
+        (load_binary_df(), {}),
+        (load_survival_df(), {'time': 1, 'time_to_outcome_col': 'ttcancer'})
+    ]:
+        prevalence_value = _calc_prevalence(risks_df=data, outcome='cancer', **survival_args)
+        reference_rates = _calc_reference_rates(thresholds, prevalence_value)
+
+        for i, model in enumerate(['all', 'none']):
+            test_pos_rate = _calc_test_pos_rate(risks_df=data, thresholds=thresholds, model=model)
+            rate_args = \
+                dict(
+                    risks_df=data,
+                    thresholds=thresholds,
+                    model=model,
+                    outcome='cancer',
+                    test_pos_rate=test_pos_rate,
+                    prevalence_value=prevalence_value,
+                    **survival_args
+                )
+
+            np.testing.assert_array_equal(reference_rates[0, i], test_pos_rate)
+            np.testing.assert_array_equal(reference_rates[1, i], _calc_tp_rate(**rate_args))
+            np.testing.assert_array_equal(reference_rates[2, i], _calc_fp_rate(**rate_args))
@@ -0,0 +1,38 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.external import dca_external
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+
+
+def test_external_sort_matches_all_thresholds(tmp_path):
+
+    data = load_binary_df()
+    data.loc[::50, 'cancerpredmarker'] = np.nan
+
+    external_df = \
+        dca_external(
+            chunks=(data.iloc[start:start + 100] for start in range(0, len(data), 100)),
+            outcome='cancer',
+            modelnames=['cancerpredmarker', 'famhistory'],
+            harm={'famhistory': 0.01},
+            memory_limit=48 * 3 * 64,
+            temp_dir=tmp_path
+        )
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker', 'famhistory'],
+            thresholds='all',
+            harm={'famhistory': 0.01}
+        )
+
+    assert list(tmp_path.iterdir()) == []
+    pd.testing.assert_frame_equal(external_df, dca_df, check_exact=True)
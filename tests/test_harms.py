@@ -1,10 +1,17 @@
-from dcurves import dca, plot_graphs
-from .load_test_data import load_r_case3_results
+from dcurves import dca, dca_iter, plot_graphs
+from .load_test_data import load_binary_df, load_r_case3_results
+import numpy as np
 import pandas as pd
+import pytest
 
 def test_simple_binary_harms_1():
 
     r_case3_benchmark_results = load_r_case3_results()
+    # dca() leaves net interventions avoided undefined (NaN) at threshold 0,
+    # where the R package divides by 0
+    r_case3_benchmark_results.loc[
+        r_case3_benchmark_results.threshold == 0, 'net_intervention_avoided'
+    ] = np.nan
     df_cancer_dx = pd.read_csv('https://raw.githubusercontent.com/ddsjoberg/dca-tutorial/main/data/df_cancer_dx.csv')
 
     dca_harm_simple_df = \
@@ -37,4 +44,43 @@ def test_simple_binary_harms_1():
             r_model_stat_df = r_model_stat_df.round(decimals=6)
             r_model_stat_df = r_model_stat_df.reset_index(drop=True)
 
-            assert p_model_stat_df.equals(r_model_stat_df)
\ No newline at end of file
+            assert p_model_stat_df.equals(r_model_stat_df)
+
+
+def test_per_threshold_harms():
+
+    data = load_binary_df()
+    thresholds = [i / 100 for i in range(0, 50)]
+    marker_harm = np.linspace(0, 0.05, len(thresholds))
+
+    no_harm_df = dca(data=data, outcome='cancer', modelnames=['cancerpredmarker'], thresholds=thresholds)
+    harm_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            thresholds=thresholds,
+            harm={'cancerpredmarker': marker_harm}
+        )
+
+    marker_rows = harm_df['model'] == 'cancerpredmarker'
+    np.testing.assert_array_equal(harm_df.loc[marker_rows, 'harm'], marker_harm)
+    np.testing.assert_allclose(
+        no_harm_df.loc[marker_rows, 'net_benefit'] - harm_df.loc[marker_rows, 'net_benefit'],
+        marker_harm,
+        atol=1e-15
+    )
+    assert (harm_df.loc[~marker_rows, 'harm'] == 0).all()
+
+    for other_df in [
+        dca(data=data, outcome='cancer', modelnames=['cancerpredmarker'], thresholds=thresholds,
+            harm={'cancerpredmarker': marker_harm}, as_result=True).to_frame(),
+        pd.concat(dca_iter(data=data, outcome='cancer', modelnames=['cancerpredmarker'],
+                           thresholds=thresholds, harm={'cancerpredmarker': marker_harm}),
+                  ignore_index=True)
+    ]:
+        pd.testing.assert_frame_equal(other_df, harm_df)
+
+    with pytest.raises(ValueError, match="one value per threshold"):
+        dca(data=data, outcome='cancer', modelnames=['cancerpredmarker'], thresholds=thresholds,
+            harm={'cancerpredmarker': [0.01, 0.02]})
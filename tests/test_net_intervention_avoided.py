@@ -4,6 +4,8 @@ from dcurves.dca import dca
 from .load_test_data import load_binary_df, load_survival_df
 from .load_test_data import load_r_case1_results, load_r_case2_results
 
+import numpy as np
+
 
 def test_case1_binary_net_interventions_avoided():
 
@@ -20,6 +22,9 @@ def test_case1_binary_net_interventions_avoided():
 
     r_results_df = \
         load_r_case1_results()
+    # dca() leaves net interventions avoided undefined (NaN) at threshold 0,
+    # where the R package divides by 0
+    r_results_df.loc[r_results_df.threshold == 0, 'net_intervention_avoided'] = np.nan
 
     for model in ['all', 'none', 'famhistory']:
         dca_model_nia = dca_results_df[dca_results_df.model == model][
@@ -48,6 +53,9 @@ def test_case2_surv_net_interventions_avoided():
 
     r_results_df = \
         load_r_case2_results()
+    # dca() leaves net interventions avoided undefined (NaN) at threshold 0,
+    # where the R package divides by 0
+    r_results_df.loc[r_results_df.threshold == 0, 'net_intervention_avoided'] = np.nan
 
     for model in ['all', 'none', 'cancerpredmarker']:
         dca_model_nia = dca_results_df[dca_results_df.model == model][
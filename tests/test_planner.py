@@ -0,0 +1,140 @@
+# Load Functions To Test/Needed For Testing
+from dcurves import planner
+from dcurves.dca import dca
+from dcurves.planner import _plan_dca, _chosen_strategy
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import pandas as pd
+
+
+def test_plan_respects_memory_limit_and_outcome_type():
+
+    plan = \
+        _plan_dca(
+            num_rows=10_000_000,
+            num_models=2,
+            num_thresholds=100,
+            memory_limit=100 * 2**20
+        )
+
+    chosen = plan[plan.chosen]
+    assert set(chosen.stage) == {'prepare', 'count', 'output'}
+    assert chosen.est_memory_bytes.sum() <= 100 * 2**20
+    assert _chosen_strategy(plan) in ['compact', 'chunked']
+
+    survival_plan = \
+        _plan_dca(
+            num_rows=10_000,
+            num_models=1,
+            num_thresholds=100,
+            survival=True
+        )
+
+    assert _chosen_strategy(survival_plan) == 'loop'
+    assert set(survival_plan[survival_plan.supported].strategy) == {'loop'}
+
+
+def test_plan_for_all_thresholds_without_fitting_strategy():
+
+    plan = \
+        _plan_dca(
+            num_rows=1_000_000,
+            num_models=2,
+            num_thresholds=None,
+            memory_limit=10**6
+        )
+
+    assert not plan.fits_memory.any()
+    assert _chosen_strategy(plan) == 'external'
+
+    models_to_prob_plan = \
+        _plan_dca(
+            num_rows=1_000_000,
+            num_models=2,
+            num_thresholds=None,
+            memory_limit=10**6,
+            models_to_prob=True
+        )
+
+    assert _chosen_strategy(models_to_prob_plan) in ['sort', 'binned']
+
+    survival_plan = \
+        _plan_dca(
+            num_rows=1_000_000,
+            num_models=2,
+            num_thresholds=None,
+            survival=True,
+            memory_limit=10**6
+        )
+
+    assert _chosen_strategy(survival_plan) == 'loop'
+
+
+def test_auto_engine_matches_default_dca():
+
+    data = load_binary_df()
+
+    for thresholds, memory_limit in [([i/100 for i in range(0, 100)], None),
+                                     ([i/100 for i in range(0, 100)], 2**16),
+                                     ('all', 2**16)]:
+        auto_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=['cancerpredmarker', 'famhistory'],
+                thresholds=thresholds,
+                engine='auto',
+                memory_limit=memory_limit
+            )
+
+        dca_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=['cancerpredmarker', 'famhistory'],
+                thresholds=thresholds
+            )
+
+        pd.testing.assert_frame_equal(auto_df, dca_df, check_exact=True)
+
+
+def test_explain_returns_plan_without_running():
+
+    plan = \
+        dca(
+            data=load_survival_df(),
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            time=1,
+            time_to_outcome_col='ttcancer',
+            engine='auto',
+            explain=True
+        )
+
+    assert list(plan.columns) == [
+        'strategy', 'stage', 'est_seconds', 'est_memory_bytes',
+        'supported', 'fits_memory', 'chosen'
+    ]
+    assert set(plan[plan.chosen].strategy) == {'loop'}
+
+    sort_plan = \
+        dca(
+            data=load_binary_df(),
+            outcome='cancer',
+            modelnames=['famhistory'],
+            explain=True
+        )
+
+    assert set(sort_plan[sort_plan.chosen].strategy) == {'sort'}
+
+
+def test_plan_uses_recalibrated_costs(monkeypatch):
+
+    assert _chosen_strategy(_plan_dca(num_rows=10**6, num_models=3, num_thresholds=100)) == 'binned'
+
+    monkeypatch.setattr(planner, 'SECONDS_PER_BINNED_SCORE', 1e-5)
+
+    assert _chosen_strategy(_plan_dca(num_rows=10**6, num_models=3, num_thresholds=100)) == 'chunked'
@@ -0,0 +1,81 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.sketch import DCASketch
+
+# Load Data for Testing
+from .load_test_data import load_binary_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+
+
+def test_uncompacted_sketch_matches_dca():
+
+    data = load_binary_df()
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    sketch = DCASketch(outcome='cancer', modelnames=modelnames)
+    for start in range(0, len(data), 200):
+        sketch.update(data.iloc[start:start + 200])
+
+    sketch_df = sketch.finalize(harm={'famhistory': 0.01})
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=modelnames,
+            harm={'famhistory': 0.01}
+        )
+
+    assert (sketch_df.net_benefit_error == 0).all()
+    pd.testing.assert_frame_equal(
+        sketch_df.drop(columns='net_benefit_error'), dca_df, check_exact=True
+    )
+
+
+def test_merged_sketch_net_benefit_within_error_bound():
+
+    rng = np.random.default_rng(seed=10)
+    data = pd.DataFrame({'score': rng.beta(2, 8, size=40000)})
+    data['outcome'] = rng.random(40000) < data['score']
+    thresholds = np.linspace(0.01, 0.6, 60)
+
+    payloads = []
+    for shard in np.array_split(data.index, 4):
+        sketch = DCASketch(outcome='outcome', modelnames=['score'], capacity=128)
+        for chunk in np.array_split(shard, 5):
+            sketch.update(data.loc[chunk])
+        payloads.append(sketch.to_bytes())
+
+    combined = DCASketch.from_bytes(payloads[0])
+    for payload in payloads[1:]:
+        combined.merge(DCASketch.from_bytes(payload))
+
+    sketch_df = combined.finalize(thresholds=thresholds)
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='outcome',
+            modelnames=['score'],
+            thresholds=thresholds
+        )
+
+    assert (combined.count_errors()[['events', 'nonevents']] > 0).all(axis=None)
+    assert (sketch_df.net_benefit_error < 0.05).all()
+    assert (
+        (sketch_df.net_benefit - dca_df.net_benefit).abs()
+        <= sketch_df.net_benefit_error + 1e-12
+    ).all()
+
+
+def test_sketch_error_bound_at_threshold_one():
+
+    sketch = DCASketch(outcome='cancer', modelnames=['cancerpredmarker'])
+    sketch.update(load_binary_df())
+
+    sketch_df = sketch.finalize(thresholds=[0.5, 1])
+
+    assert (sketch_df.net_benefit_error == 0).all()
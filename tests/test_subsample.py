@@ -0,0 +1,148 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+from dcurves.risks import _calc_binary_risks
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_full_nonevent_fraction_matches_dca():
+
+    data = load_binary_df()
+
+    subsample_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            nonevent_fraction=1
+        )
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker']
+        )
+
+    assert (subsample_df.net_benefit_se == 0).all()
+    pd.testing.assert_frame_equal(
+        subsample_df.drop(columns='net_benefit_se'), dca_df, check_exact=True
+    )
+
+
+def test_subsample_se_matches_monte_carlo_spread():
+
+    rng = np.random.default_rng(seed=11)
+    data = pd.DataFrame({'score': rng.beta(1, 30, size=50000)})
+    data['outcome'] = rng.random(50000) < 2 * data['score']
+    thresholds = [0.01, 0.02, 0.05]
+
+    dca_df = \
+        dca(
+            data=data,
+            outcome='outcome',
+            modelnames=['score'],
+            thresholds=thresholds
+        )
+
+    net_benefits = []
+    net_benefit_ses = []
+    for seed in range(60):
+        subsample_df = \
+            dca(
+                data=data,
+                outcome='outcome',
+                modelnames=['score'],
+                thresholds=thresholds,
+                nonevent_fraction=0.1,
+                random_state=seed
+            )
+        assert (subsample_df.n == len(data)).all()
+        net_benefits.append(subsample_df.net_benefit.to_numpy())
+        net_benefit_ses.append(subsample_df.net_benefit_se.to_numpy())
+
+    spread = np.std(net_benefits, axis=0)[:6]
+    reported_se = np.mean(net_benefit_ses, axis=0)[:6]
+    bias = np.mean(net_benefits, axis=0)[:6] - dca_df.net_benefit.to_numpy()[:6]
+
+    assert np.all(np.abs(bias) < 3 * reported_se / np.sqrt(60) + 1e-12)
+    assert np.all((spread > 0.7 * reported_se) & (spread < 1.4 * reported_se))
+
+
+def test_nonevent_fraction_rejects_survival_and_bad_fractions():
+
+    with pytest.raises(ValueError, match="only available for binary outcomes"):
+        dca(
+            data=load_survival_df(),
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            time=1,
+            time_to_outcome_col='ttcancer',
+            nonevent_fraction=0.5
+        )
+
+    with pytest.raises(ValueError, match=r"nonevent_fraction must be in \(0, 1\]"):
+        dca(
+            data=load_binary_df(),
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            nonevent_fraction=0
+        )
+
+
+def test_nonevent_fraction_converts_models_on_full_data():
+
+    data = load_binary_df()
+
+    # Risks fitted on all rows, as dca() without subsampling would use
+    risks_df = data.copy()
+    risks_df['marker'] = _calc_binary_risks(data=data, outcome='cancer', model='marker')
+
+    for seed in range(3):
+        converted_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=['marker'],
+                models_to_prob=['marker'],
+                nonevent_fraction=0.5,
+                random_state=seed
+            )
+        precomputed_df = \
+            dca(
+                data=risks_df,
+                outcome='cancer',
+                modelnames=['marker'],
+                nonevent_fraction=0.5,
+                random_state=seed
+            )
+        pd.testing.assert_frame_equal(converted_df, precomputed_df, check_exact=True)
+
+    full_net_benefit = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['marker'],
+            models_to_prob=['marker'],
+            thresholds=[0.2]
+        ).query("model == 'marker'")['net_benefit'].iloc[0]
+    subsample_net_benefits = [
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['marker'],
+            models_to_prob=['marker'],
+            thresholds=[0.2],
+            nonevent_fraction=0.5,
+            random_state=seed
+        ).query("model == 'marker'")['net_benefit'].iloc[0]
+        for seed in range(20)
+    ]
+    assert abs(np.mean(subsample_net_benefits) - full_net_benefit) \
+        < 3 * np.std(subsample_net_benefits) / np.sqrt(20)
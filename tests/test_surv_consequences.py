@@ -1,9 +1,10 @@
 
 # Load Functions To Test/Needed For Testing
-from dcurves.dca import _calc_risk_rate_among_test_pos
+from dcurves.rates import _calc_risk_rate_among_test_pos
 from dcurves.risks import _create_risks_df
-from dcurves.dca import _calc_prevalence, _create_initial_df, _calc_initial_stats, _calc_more_stats
-from dcurves.dca import _rectify_model_risk_boundaries
+from dcurves.dca import _calc_prevalence
+from dcurves.stats import _create_initial_df, _calc_initial_stats, _calc_more_stats
+from dcurves.risks import _rectify_model_risk_boundaries
 
 # Load Data for Testing
 from .load_test_data import load_r_case2_results
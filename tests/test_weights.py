@@ -0,0 +1,85 @@
+# Load Functions To Test/Needed For Testing
+from dcurves.dca import dca
+
+# Load Data for Testing
+from .load_test_data import load_binary_df, load_survival_df
+
+# Load Tools
+import numpy as np
+import pandas as pd
+
+
+def _replicate_rows(data, weights):
+
+    return data.loc[data.index.repeat(data[weights])].reset_index(drop=True)
+
+
+def test_integer_weights_match_replicated_rows():
+
+    data = load_binary_df()
+    data['wt'] = np.random.default_rng(seed=7).integers(1, 4, size=len(data))
+    replicated_data = _replicate_rows(data, 'wt')
+    modelnames = ['famhistory', 'cancerpredmarker']
+
+    for engine, compact in [('sort', None), ('binned', None), ('loop', None),
+                            ('sort', 'quantized')]:
+        weighted_df = \
+            dca(
+                data=data,
+                outcome='cancer',
+                modelnames=modelnames,
+                engine=engine,
+                compact=compact,
+                weights='wt'
+            )
+
+        replicated_df = \
+            dca(
+                data=replicated_data,
+                outcome='cancer',
+                modelnames=modelnames,
+                engine=engine,
+                compact=compact
+            )
+
+        assert (weighted_df.n == len(data)).all()
+        pd.testing.assert_frame_equal(
+            weighted_df.drop(columns='n'),
+            replicated_df.drop(columns='n'),
+            rtol=1e-12
+        )
+
+
+def test_survival_weights_match_replicated_rows():
+
+    data = load_survival_df()
+    data['wt'] = np.random.default_rng(seed=8).integers(1, 3, size=len(data))
+    replicated_data = _replicate_rows(data, 'wt')
+    thresholds = [i/10 for i in range(0, 10)]
+
+    weighted_df = \
+        dca(
+            data=data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            thresholds=thresholds,
+            time=1,
+            time_to_outcome_col='ttcancer',
+            weights='wt'
+        )
+
+    replicated_df = \
+        dca(
+            data=replicated_data,
+            outcome='cancer',
+            modelnames=['cancerpredmarker'],
+            thresholds=thresholds,
+            time=1,
+            time_to_outcome_col='ttcancer'
+        )
+
+    pd.testing.assert_frame_equal(
+        weighted_df.drop(columns='n'),
+        replicated_df.drop(columns='n'),
+        rtol=1e-6
+    )